@@ -0,0 +1,270 @@
+"""Rendering animations: a scene and a timeline of keyframes, into numbered images.
+
+A timeline is a JSON file such as:
+
+    {
+        "frames": 48,
+        "camera": [
+            {"frame": 0, "position": [0, 1, -5], "look_at": [0, 0, 0]},
+            {"frame": 47, "position": [5, 1, 0], "look_at": [0, 0, 0]}
+        ],
+        "objects": {
+            "2": [
+                {"frame": 0},
+                {"frame": 47, "translation": [0, 2, 0], "axis": [0, 1, 0], "degrees": 90}
+            ]
+        }
+    }
+
+Between keyframes, every value is interpolated linearly. Objects are referred to by
+their index in the scene, and are placed by scaling, rotating around the origin and
+then translating the object of the scene.
+
+Every frame is rendered by the same pool of processes. The scene is only prepared
+again, and sent to the workers, on the frames where objects move.
+"""
+
+import dataclasses
+import json
+import math
+from argparse import ArgumentParser
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, TypeVar
+
+from src.components.camera import Camera
+from src.components.point import Point
+from src.components.scene import Scene
+from src.components.transformations import Transform
+from src.components.vector import Vector
+from src.rendering_engine import DEFAULT_TILE_SIZE, RenderPool
+from src.scene_file import load_scene
+from src.scene_preparation import PreparedScene, prepare
+
+Triple = tuple[float, float, float]
+
+
+@dataclass
+class CameraKeyframe:
+    """Where the camera is and what it looks at, on a frame."""
+
+    frame: int
+    position: Triple
+    look_at: Triple
+
+
+@dataclass
+class ObjectKeyframe:
+    """How an object is scaled, rotated by `degrees` around `axis`, and translated."""
+
+    frame: int
+    translation: Triple = (0, 0, 0)
+    axis: Triple = (0, 1, 0)
+    degrees: float = 0
+    scale: Triple = (1, 1, 1)
+
+    def to_transform(self) -> Transform:
+        rotation = Transform.rotation(
+            Point(0, 0, 0), Vector(*self.axis), math.radians(self.degrees)
+        )
+        return (
+            Transform.scaling(Vector(*self.scale))
+            .then(rotation)
+            .then(Transform.translation(Vector(*self.translation)))
+        )
+
+
+K = TypeVar("K", CameraKeyframe, ObjectKeyframe)
+
+
+def _interpolate(a, b, t: float):
+    if isinstance(a, (tuple, list)):
+        return tuple(_interpolate(x, y, t) for x, y in zip(a, b))
+    return a + (b - a) * t
+
+
+def keyframe_at(keyframes: list[K], frame: int) -> K:
+    """The keyframe on `frame`, interpolated from a list of keyframes sorted by frame."""
+    if frame <= keyframes[0].frame:
+        return keyframes[0]
+
+    for before, after in zip(keyframes, keyframes[1:]):
+        if frame <= after.frame:
+            t = (frame - before.frame) / (after.frame - before.frame)
+            values = {
+                value.name: _interpolate(
+                    getattr(before, value.name), getattr(after, value.name), t
+                )
+                for value in dataclasses.fields(before)
+                if value.name != "frame"
+            }
+            return type(before)(frame=frame, **values)
+
+    return keyframes[-1]
+
+
+@dataclass
+class Timeline:
+    """Keyframes of the camera and of the placement of objects, by object index."""
+
+    frames: int
+    camera: list[CameraKeyframe] = field(default_factory=list)
+    objects: dict[int, list[ObjectKeyframe]] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, description: dict) -> "Timeline":
+        def keyframes(kind: type[K], entries: list[dict]) -> list[K]:
+            parsed = []
+            for entry in entries:
+                values = {
+                    name: tuple(value) if isinstance(value, list) else value
+                    for name, value in entry.items()
+                }
+                parsed.append(kind(**values))
+            return sorted(parsed, key=lambda keyframe: keyframe.frame)
+
+        return cls(
+            frames=description["frames"],
+            camera=keyframes(CameraKeyframe, description.get("camera", [])),
+            objects={
+                int(index): keyframes(ObjectKeyframe, entries)
+                for index, entries in description.get("objects", {}).items()
+                if entries
+            },
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "Timeline":
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    def camera_at(self, camera: Camera, frame: int) -> Camera:
+        """The camera on a frame, which is `camera` moved to the camera keyframes."""
+        if not self.camera:
+            return camera
+        keyframe = keyframe_at(self.camera, frame)
+        return Camera(
+            position=Point(*keyframe.position),
+            look_at=Point(*keyframe.look_at),
+            v_up=camera.v_up,
+            distance_from_screen=camera.distance_from_screen,
+            vertical_resolution=camera.vertical_resolution,
+            horizontal_resolution=camera.horizontal_resolution,
+        )
+
+    def transforms_at(self, frame: int) -> dict[int, Transform]:
+        """The transforms of the animated objects on a frame, by object index."""
+        return {
+            index: keyframe_at(keyframes, frame).to_transform()
+            for index, keyframes in self.objects.items()
+        }
+
+
+def frame_scenes(
+    scene: Scene, timeline: Timeline, vectorized: bool = False
+) -> Iterator[tuple[int, PreparedScene]]:
+    """Yield every frame of an animation with its prepared scene.
+
+    While no object moves, the same prepared scene is yielded again with another
+    camera; it must be rendered before moving on to the next frame.
+    """
+    prepared: PreparedScene | None = None
+    placements: dict[int, bytes] | None = None
+    for frame in range(timeline.frames):
+        transforms = timeline.transforms_at(frame)
+        frame_placements = {
+            index: transform.matrix.tobytes() for index, transform in transforms.items()
+        }
+        if prepared is None or frame_placements != placements:
+            objects = [
+                obj.transform(transforms[index]) if index in transforms else obj
+                for index, obj in enumerate(scene.objects)
+            ]
+            prepared = prepare(dataclasses.replace(scene, objects=objects), vectorized)
+            placements = frame_placements
+
+        prepared.camera = timeline.camera_at(scene.camera, frame)
+        yield frame, prepared
+
+
+def render_animation(
+    scene: Scene,
+    timeline: Timeline,
+    destination: str,
+    workers: int | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    vectorized: bool = False,
+    max_samples: int = 1,
+) -> list[Path]:
+    """Render every frame of an animation to a file, and return the files.
+
+    `destination` is formatted with the frame number, e.g. `frames/%04d.png`; files
+    are PNG or PPM as in `render_scene_to_file`, whose arguments are the same.
+    """
+    files = []
+    with RenderPool(workers, vectorized, max_samples) as pool:
+        for frame, prepared in frame_scenes(scene, timeline, vectorized):
+            file = Path(destination % frame)
+            file.parent.mkdir(parents=True, exist_ok=True)
+            pool.render_to_file(prepared, file, tile_size)
+            files.append(file)
+
+    return files
+
+
+def main():
+    ap = ArgumentParser()
+
+    ap.add_argument("scene", help="The scene file", type=Path)
+    ap.add_argument("timeline", help="The timeline file", type=Path)
+    ap.add_argument(
+        "destination",
+        help="The image files, with the frame number as %%d, e.g. frames/%%04d.png",
+    )
+    ap.add_argument(
+        "--vectorized",
+        help="Render with the batched NumPy engine",
+        action="store_true",
+    )
+    ap.add_argument(
+        "-w",
+        "--workers",
+        help="Number of worker processes (default: number of CPUs)",
+        type=int,
+        default=None,
+    )
+    ap.add_argument(
+        "-t",
+        "--tile-size",
+        help="Side of the square tiles rendered by each worker task",
+        type=int,
+        default=DEFAULT_TILE_SIZE,
+    )
+    ap.add_argument(
+        "-s",
+        "--samples",
+        help="Maximum number of samples per pixel; above 1, edges are anti-aliased",
+        type=int,
+        default=1,
+    )
+
+    args = ap.parse_args()
+
+    try:
+        args.destination % 0
+    except TypeError:
+        ap.error("destination must contain the frame number, e.g. frames/%04d.png")
+
+    render_animation(
+        scene=load_scene(args.scene),
+        timeline=Timeline.load(args.timeline),
+        destination=args.destination,
+        workers=args.workers,
+        tile_size=args.tile_size,
+        vectorized=args.vectorized,
+        max_samples=args.samples,
+    )
+
+
+if __name__ == "__main__":
+    main()
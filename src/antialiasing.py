@@ -0,0 +1,117 @@
+"""Adaptive anti-aliasing, shared by both engines.
+
+Every pixel is first sampled by a single ray through its corner, as in a render
+without anti-aliasing. Only the pixels that differ from one of their neighbours by
+more than `CONTRAST_THRESHOLD` are sampled again: first with `FIRST_ROUND_SAMPLES`
+rays, then, if those samples disagree as much, up to the maximum number of samples.
+Flat regions are therefore traced once per pixel, and edges are supersampled.
+
+Engines provide a function that traces rays through arbitrary, fractional pixel
+coordinates and returns their colors.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+# Traces rays through the (x, y) pixel coordinates in two arrays, returning an
+# (n, 3) array of colors.
+SampleRenderer = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+# Largest difference between two channels, out of 255, that is not considered an edge.
+CONTRAST_THRESHOLD = 16
+FIRST_ROUND_SAMPLES = 4
+
+
+def _radical_inverse(index: int, base: int) -> float:
+    inverse, scale = 0.0, 1.0 / base
+    while index:
+        index, digit = divmod(index, base)
+        inverse += digit * scale
+        scale /= base
+    return inverse
+
+
+def sample_offsets(count: int) -> np.ndarray:
+    """Return (count, 2) offsets of the samples of a pixel from its first sample.
+
+    Offsets follow the Halton sequence, so that any number of samples is well
+    spread over the pixel, wrapped to [-0.5, 0.5) so that the first one is (0, 0).
+    """
+    points = np.array(
+        [(_radical_inverse(i, 2), _radical_inverse(i, 3)) for i in range(count)]
+    ).reshape(-1, 2)
+    return (points + 0.5) % 1 - 0.5
+
+
+def _spread(samples: np.ndarray) -> np.ndarray:
+    """Largest difference between samples of each pixel, over all the channels."""
+    return (samples.max(axis=1) - samples.min(axis=1)).max(axis=-1)
+
+
+def find_edges(colors: np.ndarray, threshold: float = CONTRAST_THRESHOLD) -> np.ndarray:
+    """Return a (height, width) mask of the pixels that contrast with a neighbour."""
+    edges = np.zeros(colors.shape[:2], dtype=bool)
+    vertical = np.abs(colors[1:] - colors[:-1]).max(axis=-1) > threshold
+    horizontal = np.abs(colors[:, 1:] - colors[:, :-1]).max(axis=-1) > threshold
+    edges[1:] |= vertical
+    edges[:-1] |= vertical
+    edges[:, 1:] |= horizontal
+    edges[:, :-1] |= horizontal
+    return edges
+
+
+def render_antialiased(
+    render_samples: SampleRenderer,
+    x_start: int,
+    y_start: int,
+    x_end: int,
+    y_end: int,
+    width: int,
+    height: int,
+    max_samples: int,
+) -> np.ndarray:
+    """Render a tile of a width x height image with adaptive anti-aliasing.
+
+    Pixels get at most `max_samples` samples. Returns the colors of the tile as a
+    (y_end - y_start, x_end - x_start, 3) array.
+    """
+    # The pixels around the tile are needed to find the edges along its border.
+    left, top = max(x_start - 1, 0), max(y_start - 1, 0)
+    right, bottom = min(x_end + 1, width), min(y_end + 1, height)
+    ys, xs = np.mgrid[top:bottom, left:right].astype(np.float64)
+    colors = render_samples(xs.ravel(), ys.ravel()).reshape(*xs.shape, 3)
+    edges = find_edges(colors)
+
+    inside = (slice(y_start - top, y_end - top), slice(x_start - left, x_end - left))
+    colors = colors[inside]
+    rows, columns = np.nonzero(edges[inside])
+    if not len(rows):
+        return colors
+    offsets = sample_offsets(max_samples)
+
+    def sample(pixels: np.ndarray, round_offsets: np.ndarray) -> np.ndarray:
+        # Returns (len(pixels), len(round_offsets), 3) colors.
+        x = x_start + columns[pixels, None] + round_offsets[:, 0]
+        y = y_start + rows[pixels, None] + round_offsets[:, 1]
+        samples = render_samples(x.ravel(), y.ravel())
+        return samples.reshape(len(pixels), len(round_offsets), 3)
+
+    first_round = min(FIRST_ROUND_SAMPLES, max_samples)
+    refined = np.arange(len(rows))
+    samples = np.concatenate(
+        (colors[rows, columns][:, None], sample(refined, offsets[1:first_round])),
+        axis=1,
+    )
+    sums = samples.sum(axis=1)
+
+    # Only pixels whose first samples disagree get the rest of them.
+    again = refined[_spread(samples) > CONTRAST_THRESHOLD]
+    if len(again) and max_samples > first_round:
+        sums[again] += sample(again, offsets[first_round:]).sum(axis=1)
+
+    counts = np.full(len(rows), first_round)
+    counts[again] = max_samples
+    colors = colors.copy()
+    colors[rows, columns] = sums / counts[:, None]
+    return colors
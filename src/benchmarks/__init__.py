@@ -0,0 +1 @@
+"""Throughput benchmarks of the renderers, run with `python -m src.benchmarks`."""
@@ -0,0 +1,117 @@
+import json
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+from src.benchmarks.runner import MODES, run_benchmarks, run_case
+from src.benchmarks.scenes import DEFAULT_SPHERES, DEFAULT_TRIANGLES, all_scenes
+from src.benchmarks.vector_ops import run_vector_benchmarks
+
+
+def main():
+    ap = ArgumentParser(
+        prog="python -m src.benchmarks",
+        description="Render the demo and synthetic scenes and report their throughput "
+        "as JSON",
+    )
+
+    ap.add_argument(
+        "-s",
+        "--scenes",
+        help="The scenes to render (default: all)",
+        nargs="+",
+    )
+    ap.add_argument(
+        "-m",
+        "--modes",
+        help="The rendering modes (default: all)",
+        nargs="+",
+        choices=MODES,
+        default=list(MODES),
+    )
+    ap.add_argument(
+        "--scale",
+        help="Divide the resolution of every scene by this factor (default: 4)",
+        type=float,
+        default=4,
+    )
+    ap.add_argument(
+        "-w",
+        "--workers",
+        help="Number of worker processes of the multi mode (default: number of CPUs)",
+        type=int,
+        default=None,
+    )
+    ap.add_argument(
+        "--spheres",
+        help="Number of spheres of the synthetic sphere scene",
+        type=int,
+        default=DEFAULT_SPHERES,
+    )
+    ap.add_argument(
+        "--triangles",
+        help="Number of triangles of the synthetic mesh scene",
+        type=int,
+        default=DEFAULT_TRIANGLES,
+    )
+    ap.add_argument(
+        "--phase-times",
+        help="Also time the intersection, shadow and shading phases (slows renders)",
+        action="store_true",
+    )
+    ap.add_argument(
+        "-o",
+        "--output",
+        help="Write the report to this file instead of the standard output",
+        type=Path,
+    )
+    ap.add_argument(
+        "--vector-ops",
+        help="Time the vector, point and color operations instead of rendering",
+        action="store_true",
+    )
+    ap.add_argument(
+        "--case",
+        help="Run a single case in this process and print its result (used internally)",
+        nargs=2,
+        metavar=("SCENE", "MODE"),
+    )
+
+    args = ap.parse_args()
+
+    if args.case:
+        result = run_case(
+            *args.case,
+            scale=args.scale,
+            workers=args.workers,
+            spheres=args.spheres,
+            triangles=args.triangles,
+            phase_times=args.phase_times,
+        )
+        print(json.dumps(result))
+        return
+
+    if args.vector_ops:
+        report = {"ns_per_operation": run_vector_benchmarks()}
+    else:
+        scene_names = args.scenes or list(all_scenes(args.spheres, args.triangles))
+        report = run_benchmarks(
+            scene_names,
+            args.modes,
+            scale=args.scale,
+            workers=args.workers,
+            spheres=args.spheres,
+            triangles=args.triangles,
+            phase_times=args.phase_times,
+            progress=True,
+        )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Running benchmark cases, each in its own process so that peak memory is its own."""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any
+
+from src.benchmarks.scenes import DEFAULT_SPHERES, DEFAULT_TRIANGLES, all_scenes
+from src.instrumentation import RenderStats, collecting
+from src.rendering_engine import render_scene
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+# single: scalar engine in this process. multi: scalar engine on a process pool.
+# vectorized: batched NumPy engine in this process.
+MODES = ("single", "multi", "vectorized")
+
+
+def _peak_memory_kib(children: bool = False) -> int | None:
+    """Peak resident memory of this process, or of its largest finished child."""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kibibytes, but macOS reports bytes.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(
+    scene_name: str,
+    mode: str,
+    scale: float = 1,
+    workers: int | None = None,
+    spheres: int = DEFAULT_SPHERES,
+    triangles: int = DEFAULT_TRIANGLES,
+    phase_times: bool = False,
+) -> dict[str, Any]:
+    """Render a benchmark scene in the current process and return the measurements.
+
+    Rays and intersection tests are always counted. The phases of the render are only
+    timed if `phase_times` is set, since timing them slows the render down.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+
+    scenes = all_scenes(spheres, triangles)
+    if scene_name not in scenes:
+        raise ValueError(
+            f"Unknown scene {scene_name!r}, expected one of {list(scenes)}"
+        )
+
+    scene = scenes[scene_name]()
+    if scale != 1:
+        scene.camera = scene.camera.scaled(scale)
+
+    with collecting(RenderStats(timing=phase_times)) as stats:
+        start = time.perf_counter()
+        render_scene(
+            scene,
+            multithread=mode == "multi",
+            vectorized=mode == "vectorized",
+            workers=workers,
+        )
+        wall_time = time.perf_counter() - start
+    summary = stats.as_dict()
+
+    return {
+        "scene": scene_name,
+        "mode": mode,
+        "width": scene.camera.horizontal_resolution,
+        "height": scene.camera.vertical_resolution,
+        "objects": len(scene.objects),
+        "primitives": len(scene.bvh),
+        "wall_time": wall_time,
+        "rays": summary["rays"],
+        "rays_per_second": summary["rays"]["total"] / wall_time,
+        "stats": summary,
+        "peak_memory_kib": _peak_memory_kib(),
+        "peak_worker_memory_kib": (
+            _peak_memory_kib(children=True) if mode == "multi" else None
+        ),
+    }
+
+
+def run_case_in_subprocess(
+    scene_name: str,
+    mode: str,
+    scale: float = 1,
+    workers: int | None = None,
+    spheres: int = DEFAULT_SPHERES,
+    triangles: int = DEFAULT_TRIANGLES,
+    phase_times: bool = False,
+) -> dict[str, Any]:
+    """Like `run_case`, but in a fresh interpreter."""
+    command = [
+        sys.executable,
+        "-m",
+        "src.benchmarks",
+        "--case",
+        scene_name,
+        mode,
+        "--scale",
+        str(scale),
+        "--spheres",
+        str(spheres),
+        "--triangles",
+        str(triangles),
+    ]
+    if workers is not None:
+        command += ["--workers", str(workers)]
+    if phase_times:
+        command.append("--phase-times")
+
+    output = subprocess.run(command, capture_output=True, text=True)
+    if output.returncode != 0:
+        raise RuntimeError(f"The {mode} case of {scene_name} failed:\n{output.stderr}")
+    return json.loads(output.stdout)
+
+
+def run_benchmarks(
+    scene_names: list[str],
+    modes: list[str],
+    scale: float = 1,
+    workers: int | None = None,
+    spheres: int = DEFAULT_SPHERES,
+    triangles: int = DEFAULT_TRIANGLES,
+    phase_times: bool = False,
+    progress: bool = False,
+) -> dict[str, Any]:
+    """Run every scene in every mode and return a report of the measurements."""
+    results = []
+    for scene_name in scene_names:
+        for mode in modes:
+            if progress:
+                print(f"{scene_name} ({mode})...", file=sys.stderr, flush=True)
+            results.append(
+                run_case_in_subprocess(
+                    scene_name, mode, scale, workers, spheres, triangles, phase_times
+                )
+            )
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "scale": scale,
+        "results": results,
+    }
@@ -0,0 +1,141 @@
+"""Scenes rendered by the benchmarks: the demo scenes and synthetic stress scenes."""
+
+import math
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from src.components.camera import Camera
+from src.components.color import Color
+from src.components.light import Light
+from src.components.material import Material
+from src.components.objects_in_space import PackedTriangleMesh, Plane, Sphere
+from src.components.point import Point
+from src.components.scene import Scene
+from src.components.vector import Vector
+from src.scene_file import load_scene
+
+DEMO_DIRECTORY = Path(__file__).resolve().parents[2] / "demo"
+
+DEFAULT_SPHERES = 100
+DEFAULT_TRIANGLES = 20_000
+
+
+def _material(color: Color, reflection: float = 0, transmission: float = 0) -> Material:
+    return Material(
+        color=color,
+        diffusion_coefficient=0.7,
+        specular_coefficient=0.5,
+        ambient_coefficient=0.2,
+        reflection_coefficient=reflection,
+        transmission_coefficient=transmission,
+        rugosity_coefficient=50,
+    )
+
+
+def _scene(objects: list, camera: Camera, lights: list[Light]) -> Scene:
+    return Scene(
+        camera=camera,
+        objects=objects,
+        lights=lights,
+        ambient_color=Color(40, 40, 40),
+        background_color=Color(10, 10, 30),
+    )
+
+
+def _camera(position: Point, look_at: Point) -> Camera:
+    # 500x500 like the demo scenes, with a 90 degree field of view.
+    return Camera(position, look_at, Vector(0, 1, 0), 250, 500, 500)
+
+
+def spheres_scene(count: int = DEFAULT_SPHERES) -> Scene:
+    """A grid of `count` matte spheres over a plane, lit by two lights."""
+    side = math.ceil(math.sqrt(count))
+    objects: list = [
+        Sphere(
+            _material(Color((i % 3) / 2, (i % 5) / 4, (i % 7) / 6)),
+            0.4,
+            Point(i % side - (side - 1) / 2, 0.4, 4 + i // side),
+        )
+        for i in range(count)
+    ]
+    objects.append(
+        Plane(_material(Color(0.8, 0.8, 0.8)), Vector(0, 1, 0), Point(0, 0, 0))
+    )
+
+    return _scene(
+        objects,
+        _camera(Point(0, side / 2, 0), Point(0, 0, 4 + side / 2)),
+        [
+            Light(Point(-side, 2 * side, 0), Color(120, 120, 120)),
+            Light(Point(side, side, 4 + side), Color(80, 80, 80)),
+        ],
+    )
+
+
+def mesh_scene(triangles: int = DEFAULT_TRIANGLES) -> Scene:
+    """A wavy height field of about `triangles` triangles, lit by one light."""
+    side = max(1, round(math.sqrt(triangles / 2)))
+    xs, zs = np.meshgrid(np.linspace(-5, 5, side + 1), np.linspace(3, 13, side + 1))
+    ys = 0.5 * np.sin(2 * xs) * np.cos(1.5 * zs)
+    vertices = np.stack((xs, ys, zs), axis=-1).reshape(-1, 3)
+
+    corners = np.arange((side + 1) * side).reshape(side, side + 1)[:, :side].ravel()
+    indices = np.concatenate(
+        (
+            np.stack((corners, corners + side + 1, corners + 1), axis=1),
+            np.stack((corners + 1, corners + side + 1, corners + side + 2), axis=1),
+        )
+    )
+
+    mesh = PackedTriangleMesh(_material(Color(0.3, 0.8, 0.4)), vertices, indices)
+    return _scene(
+        [mesh],
+        _camera(Point(0, 6, -2), Point(0, 0, 8)),
+        [Light(Point(3, 10, 0), Color(200, 200, 200))],
+    )
+
+
+def deep_scene() -> Scene:
+    """Glass and mirror spheres between two mirrors, so most rays reach the maximum depth."""
+    glass = _material(Color(0.9, 0.9, 1), reflection=0.2, transmission=1.5)
+    mirror = _material(Color(1, 1, 1), reflection=0.9)
+
+    objects: list = [
+        Sphere(glass, 1, Point(-1.2, 1, 6)),
+        Sphere(glass, 0.7, Point(1.2, 0.7, 5)),
+        Sphere(mirror, 1, Point(0.5, 1, 9)),
+        Sphere(glass, 0.5, Point(-0.3, 0.5, 3.5)),
+        Plane(mirror, Vector(1, 0, 0), Point(-4, 0, 0)),
+        Plane(mirror, Vector(-1, 0, 0), Point(4, 0, 0)),
+        Plane(_material(Color(0.8, 0.5, 0.3)), Vector(0, 1, 0), Point(0, 0, 0)),
+    ]
+    return _scene(
+        objects,
+        _camera(Point(0, 2, 0), Point(0, 1, 6)),
+        [
+            Light(Point(0, 8, 2), Color(150, 150, 150)),
+            Light(Point(-3, 4, 10), Color(100, 100, 100)),
+        ],
+    )
+
+
+def demo_scenes() -> dict[str, Callable[[], Scene]]:
+    """Loaders of the scenes in the demo directory, by file name."""
+    return {
+        path.stem: lambda path=path: load_scene(path)
+        for path in sorted(DEMO_DIRECTORY.glob("*.json"))
+    }
+
+
+def all_scenes(
+    spheres: int = DEFAULT_SPHERES, triangles: int = DEFAULT_TRIANGLES
+) -> dict[str, Callable[[], Scene]]:
+    """Loaders of every benchmark scene, by name."""
+    return {
+        **demo_scenes(),
+        f"spheres-{spheres}": lambda: spheres_scene(spheres),
+        f"mesh-{triangles}": lambda: mesh_scene(triangles),
+        "deep": deep_scene,
+    }
@@ -0,0 +1,54 @@
+"""Micro-benchmarks of the vector, point and color operations the scalar engine uses."""
+
+import timeit
+from typing import Callable
+
+from src.components.color import Color
+from src.components.point import Point
+from src.components.ray import Ray
+from src.components.vector import Vector
+
+DEFAULT_NUMBER = 200_000
+
+
+def _operations() -> dict[str, Callable[[], object]]:
+    a = Vector(0.3, -1.2, 2.5)
+    b = Vector(1.1, 0.4, -0.7)
+    p = Point(1, 2, 3)
+    q = Point(-2, 0.5, 4)
+    c = Color(120, 80, 40)
+    d = Color(200, 30, 90)
+
+    return {
+        "vector + vector": lambda: a + b,
+        "vector - vector": lambda: a - b,
+        "vector * scalar": lambda: a * 0.5,
+        "scalar * vector": lambda: 0.5 * a,
+        "vector / scalar": lambda: a / 3,
+        "-vector": lambda: -a,
+        "dot_product": lambda: a.dot_product(b),
+        "cross_product": lambda: a.cross_product(b),
+        "norm": lambda: a.norm(),
+        "normalized": lambda: a.normalized(),
+        "reflect_vec": lambda: a.reflect_vec(b),
+        "point + vector": lambda: p + a,
+        "vector + point": lambda: a + p,
+        "point - point": lambda: p - q,
+        "point + vector * t": lambda: p + a * 1.5,
+        "point.along": lambda: p.along(a, 1.5),
+        "(point - point).dot_product": lambda: (p - q).dot_product(a),
+        "point.difference_dot": lambda: p.difference_dot(q, a),
+        "color + color": lambda: c + d,
+        "color * scalar": lambda: c * 0.5,
+        "color * color": lambda: c * d,
+        "Color()": lambda: Color(300, 20, 10),
+        "Ray()": lambda: Ray(p, a),
+    }
+
+
+def run_vector_benchmarks(number: int = DEFAULT_NUMBER) -> dict[str, float]:
+    """Time every operation `number` times and return nanoseconds per operation."""
+    return {
+        name: timeit.timeit(operation, number=number) / number * 1e9
+        for name, operation in _operations().items()
+    }
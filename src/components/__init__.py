@@ -1,3 +1,5 @@
+from .bounding_box import BoundingBox
+from .bvh import BVH
 from .camera import Camera
 from .color import Color
 from .image import Image
@@ -7,4 +9,5 @@ from .objects_in_space import *
 from .point import Point
 from .ray import Ray
 from .scene import Scene
+from .transformations import Transform
 from .vector import Vector
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+from src.components.point import Point
+from src.components.ray import Ray
+
+
+class BoundingBox:
+    """An axis-aligned bounding box."""
+
+    def __init__(self, minimum: Point, maximum: Point):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __repr__(self) -> str:
+        return f"BoundingBox(Min:{self.minimum}, Max:{self.maximum})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BoundingBox):
+            return False
+        return self.minimum == other.minimum and self.maximum == other.maximum
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point]) -> BoundingBox:
+        """Returns the smallest box containing all the given points."""
+        xs, ys, zs = zip(*((point.x, point.y, point.z) for point in points))
+        return cls(Point(min(xs), min(ys), min(zs)), Point(max(xs), max(ys), max(zs)))
+
+    def union(self, other: BoundingBox) -> BoundingBox:
+        """Returns the smallest box containing both boxes."""
+        return BoundingBox(
+            Point(
+                min(self.minimum.x, other.minimum.x),
+                min(self.minimum.y, other.minimum.y),
+                min(self.minimum.z, other.minimum.z),
+            ),
+            Point(
+                max(self.maximum.x, other.maximum.x),
+                max(self.maximum.y, other.maximum.y),
+                max(self.maximum.z, other.maximum.z),
+            ),
+        )
+
+    @property
+    def centroid(self) -> Point:
+        return Point(
+            (self.minimum.x + self.maximum.x) / 2,
+            (self.minimum.y + self.maximum.y) / 2,
+            (self.minimum.z + self.maximum.z) / 2,
+        )
+
+    def as_tuple(self) -> tuple[float, float, float, float, float, float]:
+        """Returns the box as (min_x, min_y, min_z, max_x, max_y, max_z)."""
+        return (
+            self.minimum.x,
+            self.minimum.y,
+            self.minimum.z,
+            self.maximum.x,
+            self.maximum.y,
+            self.maximum.z,
+        )
+
+    def intersects(self, ray: Ray, max_distance: float = math.inf) -> bool:
+        """Checks whether the ray enters the box before max_distance."""
+        return slab_entry_distance(self.as_tuple(), ray, max_distance) is not None
+
+
+def slab_entry_distance(
+    bounds: tuple[float, float, float, float, float, float],
+    ray: Ray,
+    max_distance: float = math.inf,
+) -> float | None:
+    """Returns the distance at which the ray enters the box, or None if it misses.
+
+    A ray starting inside the box has an entry distance of 0.
+    """
+    t_near = 0.0
+    t_far = max_distance
+    for axis, origin, direction in (
+        (0, ray.origin.x, ray.direction.x),
+        (1, ray.origin.y, ray.direction.y),
+        (2, ray.origin.z, ray.direction.z),
+    ):
+        low = bounds[axis]
+        high = bounds[axis + 3]
+        if direction == 0:
+            if origin < low or origin > high:
+                return None
+            continue
+
+        inverse = 1 / direction
+        t0 = (low - origin) * inverse
+        t1 = (high - origin) * inverse
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_near:
+            t_near = t0
+        if t1 < t_far:
+            t_far = t1
+        if t_near > t_far:
+            return None
+
+    return t_near
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import TYPE_CHECKING, Callable, Sequence
+
+import numpy as np
+
+from src import instrumentation
+from src.components.ray import Ray
+from src.components.vector import Vector
+
+if TYPE_CHECKING:
+    from src.components.objects_in_space import Object
+
+Bounds = tuple[float, float, float, float, float, float]
+
+
+class Hierarchy:
+    """A flat bounding volume tree over a set of axis-aligned boxes.
+
+    The tree only knows about box indices; what is stored in the leaves, and how it
+    is intersected, is up to the users of `traverse`. Nodes are kept in typed arrays,
+    which are compact, fast to index from pure Python and cheap to pickle.
+    """
+
+    def __init__(self, bounds: np.ndarray | Sequence[Bounds], leaf_size: int = 4):
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 6)
+        self.leaf_size = leaf_size
+
+        # Six floats per node: (min_x, min_y, min_z, max_x, max_y, max_z).
+        self.node_bounds = array("d")
+        self.node_left = array("q")  # -1 for leaves
+        self.node_right = array("q")
+        self.node_start = array("q")
+        self.node_end = array("q")
+        # Box indices, grouped by leaf: a leaf holds leaf_items[start:end].
+        self.leaf_items = array("q")
+
+        if len(bounds):
+            self._build(bounds)
+
+    def _new_node(self) -> int:
+        self.node_bounds.extend((0, 0, 0, 0, 0, 0))
+        self.node_left.append(-1)
+        self.node_right.append(-1)
+        self.node_start.append(0)
+        self.node_end.append(0)
+        return len(self.node_left) - 1
+
+    def _build(self, bounds: np.ndarray) -> None:
+        """Builds the tree top-down, splitting at the median centroid of the widest axis."""
+        centroids = (bounds[:, :3] + bounds[:, 3:]) / 2
+
+        stack = [(self._new_node(), np.arange(len(bounds)))]
+        while stack:
+            node, items = stack.pop()
+            node_bounds = bounds[items]
+            self.node_bounds[6 * node : 6 * node + 6] = array(
+                "d",
+                node_bounds[:, :3].min(axis=0).tolist()
+                + node_bounds[:, 3:].max(axis=0).tolist(),
+            )
+
+            if len(items) <= self.leaf_size:
+                self.node_start[node] = len(self.leaf_items)
+                self.leaf_items.extend(np.sort(items).tolist())
+                self.node_end[node] = len(self.leaf_items)
+                continue
+
+            item_centroids = centroids[items]
+            extents = item_centroids.max(axis=0) - item_centroids.min(axis=0)
+            axis = int(np.argmax(extents))
+            middle = len(items) // 2
+            order = np.argpartition(item_centroids[:, axis], middle)
+
+            left, right = self._new_node(), self._new_node()
+            self.node_left[node], self.node_right[node] = left, right
+            stack.append((right, items[order[middle:]]))
+            stack.append((left, items[order[:middle]]))
+
+    def __bool__(self) -> bool:
+        return bool(self.node_left)
+
+    def _entry_distance(
+        self,
+        node: int,
+        origin: tuple[float, ...],
+        inverse: tuple[float, ...],
+        max_distance: float,
+    ) -> float | None:
+        """Slab test against a node, using the precomputed inverse ray direction."""
+        bounds = self.node_bounds
+        offset = 6 * node
+        t_near = 0.0
+        t_far = max_distance
+        for axis in range(3):
+            inv = inverse[axis]
+            low = bounds[offset + axis]
+            high = bounds[offset + axis + 3]
+            if inv is math.inf:
+                # The ray is parallel to this slab.
+                if origin[axis] < low or origin[axis] > high:
+                    return None
+                continue
+
+            t0 = (low - origin[axis]) * inv
+            t1 = (high - origin[axis]) * inv
+            if t0 > t1:
+                t0, t1 = t1, t0
+            if t0 > t_near:
+                t_near = t0
+            if t1 < t_far:
+                t_far = t1
+            if t_near > t_far:
+                return None
+
+        return t_near
+
+    def traverse(
+        self,
+        ray: Ray,
+        visit_leaf: Callable[[int, int], float | None],
+        max_distance: float = math.inf,
+    ) -> None:
+        """Visit the leaves entered by the ray before max_distance, nearest first.
+
+        `visit_leaf(start, end)` is called with the range of `leaf_items` held by the
+        leaf, and returns the new max distance (usually the closest hit so far), or
+        None to stop the traversal.
+        """
+        if not self.node_left:
+            return
+
+        origin = (ray.origin.x, ray.origin.y, ray.origin.z)
+        inverse = tuple(
+            math.inf if component == 0 else 1 / component
+            for component in (ray.direction.x, ray.direction.y, ray.direction.z)
+        )
+
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._entry_distance(node, origin, inverse, max_distance) is None:
+                continue
+
+            left = self.node_left[node]
+            if left == -1:
+                new_max_distance = visit_leaf(
+                    self.node_start[node], self.node_end[node]
+                )
+                if new_max_distance is None:
+                    return
+                max_distance = new_max_distance
+                continue
+
+            # Visit the nearer child first so that the far one can be culled.
+            right = self.node_right[node]
+            left_entry = self._entry_distance(left, origin, inverse, max_distance)
+            right_entry = self._entry_distance(right, origin, inverse, max_distance)
+            if left_entry is None:
+                if right_entry is not None:
+                    stack.append(right)
+            elif right_entry is None:
+                stack.append(left)
+            elif left_entry <= right_entry:
+                stack.append(right)
+                stack.append(left)
+            else:
+                stack.append(left)
+                stack.append(right)
+
+
+class BVH(Hierarchy):
+    """A bounding volume hierarchy over the primitives of a list of objects.
+
+    Objects are flattened into their primitives: a triangle mesh into its triangles,
+    each with its own leaf entry, and a bezier surface into its packed mesh. Packed
+    meshes and instances are a single leaf entry, searched by their own hierarchy.
+    Unbounded primitives (planes) can't be placed in the tree and are tested against
+    every ray.
+    """
+
+    def __init__(self, objects: Sequence[Object], leaf_size: int = 4):
+        # Every primitive remembers the object it belongs to and its position in the
+        # scene, so that ties are resolved the same way as a linear scan would.
+        self.primitives: list[Object] = []
+        self.owners: list[Object] = []
+        self.unbounded: list[int] = []
+
+        bounded: list[int] = []
+        bounds: list[Bounds] = []
+        for obj in objects:
+            for primitive in obj.get_primitives():
+                index = len(self.primitives)
+                self.primitives.append(primitive)
+                self.owners.append(obj)
+
+                box = primitive.get_bounding_box()
+                if box is None:
+                    self.unbounded.append(index)
+                else:
+                    bounded.append(index)
+                    bounds.append(box.as_tuple())
+
+        super().__init__(bounds, leaf_size)
+        # Map the tree's box indices back to primitive indices.
+        self.leaf_items = array("q", [bounded[item] for item in self.leaf_items])
+
+    def __len__(self) -> int:
+        return len(self.primitives)
+
+    def find_nearest(
+        self, ray: Ray
+    ) -> tuple[float, Vector, Object] | tuple[None, None, None]:
+        """Return the distance, normal and owning object of the nearest hit."""
+        stats = instrumentation.current
+        closest_distance = math.inf
+        closest_normal = None
+        closest_index = -1
+
+        for index in self.unbounded:
+            if stats is not None:
+                stats.count_tests(type(self.primitives[index]).__name__)
+            distance, normal = self.primitives[index].find_intersection(ray)
+            if distance is not None and distance < closest_distance:
+                closest_distance = distance
+                closest_normal = normal
+                closest_index = index
+
+        def visit_leaf(start: int, end: int) -> float:
+            nonlocal closest_distance, closest_normal, closest_index
+            for index in self.leaf_items[start:end]:
+                if stats is not None:
+                    stats.count_tests(type(self.primitives[index]).__name__)
+                distance, normal = self.primitives[index].find_intersection(ray)
+                if distance is None:
+                    continue
+                if distance < closest_distance or (
+                    distance == closest_distance and index < closest_index
+                ):
+                    closest_distance = distance
+                    closest_normal = normal
+                    closest_index = index
+            return closest_distance
+
+        self.traverse(ray, visit_leaf, closest_distance)
+
+        if closest_normal is None:
+            return None, None, None
+
+        return closest_distance, closest_normal, self.owners[closest_index]
+
+    def find_any(
+        self,
+        ray: Ray,
+        max_distance: float = math.inf,
+        ignore: Object | None = None,
+    ) -> Object | None:
+        """Return the owner of any primitive hit closer than max_distance.
+
+        Primitives belonging to `ignore` are skipped. The search stops at the first
+        hit found, so the returned object is not necessarily the nearest one.
+        """
+        stats = instrumentation.current
+        for index in self.unbounded:
+            if self.owners[index] is ignore:
+                continue
+            if stats is not None:
+                stats.count_tests(type(self.primitives[index]).__name__)
+            distance, _ = self.primitives[index].find_intersection(ray)
+            if distance is not None and distance < max_distance:
+                return self.owners[index]
+
+        blocker = None
+
+        def visit_leaf(start: int, end: int) -> float | None:
+            nonlocal blocker
+            for index in self.leaf_items[start:end]:
+                if self.owners[index] is ignore:
+                    continue
+                if stats is not None:
+                    stats.count_tests(type(self.primitives[index]).__name__)
+                distance, _ = self.primitives[index].find_intersection(ray)
+                if distance is not None and distance < max_distance:
+                    blocker = self.owners[index]
+                    return None
+            return max_distance
+
+        self.traverse(ray, visit_leaf, max_distance)
+        return blocker
@@ -1,28 +1,17 @@
 from __future__ import annotations
 
-from functools import lru_cache
+import math
+from functools import cached_property
+from typing import Iterator
+
+import numpy as np
 
 from src.components.point import *
 from src.components.ray import Ray
-from src.components.transformations import Transformable
+from src.components.transformations import Transform, Transformable
 from src.components.vector import *
 
 
-@lru_cache
-def _get_v_w(position: Point, look_at: Point) -> Vector:
-    return (look_at - position).normalized()
-
-
-@lru_cache
-def _get_v_u(v_up: Vector, v_w: Vector) -> Vector:
-    return v_up.cross_product(v_w).normalized()
-
-
-@lru_cache
-def _get_v_v(v_w: Vector, v_u: Vector) -> Vector:
-    return v_w.cross_product(v_u)
-
-
 class Camera(Transformable):
     """A movable camera that can be used to render a scene."""
 
@@ -45,17 +34,49 @@ class Camera(Transformable):
     def __repr__(self):
         return f"Camera(Pos: {self.position.__repr__}, look_at: {self.look_at.__repr__}, v_up: {self.v_up.__repr__}"
 
+    @cached_property
+    def _basis(self) -> tuple[Vector, Vector, Vector, Point]:
+        """The v_w, v_u and v_v vectors and the center of the screen.
+
+        Note: They are computed on first use, and not updated if the camera is
+        modified afterwards. Cameras are moved by creating new ones instead.
+        """
+        v_w = (self.look_at - self.position).normalized()
+        v_u = self.v_up.cross_product(v_w).normalized()
+        v_v = v_w.cross_product(v_u)
+        screen_center = (v_w * self.distance_from_screen) + self.position
+        return v_w, v_u, v_v, screen_center
+
+    @cached_property
+    def _basis_arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """The position, v_u, v_v and the center of the screen as arrays."""
+        _, v_u, v_v, screen_center = self._basis
+        return tuple(
+            np.array([vector.x, vector.y, vector.z], dtype=np.float64)
+            for vector in (self.position, v_u, v_v, screen_center)
+        )
+
+    def __getstate__(self) -> dict:
+        # The basis is derived data; it's not worth serializing.
+        state = self.__dict__.copy()
+        state.pop("_basis", None)
+        state.pop("_basis_arrays", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
     @property
     def v_w(self) -> Vector:
-        return _get_v_w(self.position, self.look_at)
+        return self._basis[0]
 
     @property
     def v_u(self) -> Vector:
-        return _get_v_u(self.v_up, self.v_w)
+        return self._basis[1]
 
     @property
     def v_v(self) -> Vector:
-        return _get_v_v(self.v_w, self.v_u)
+        return self._basis[2]
 
     def move_relative(self, x: float, y: float, z: float) -> Camera:
         """Moves the camera relative to its current position. Note that the look_at point is not changed."""
@@ -68,9 +89,24 @@ class Camera(Transformable):
             horizontal_resolution=self.horizontal_resolution,
         )
 
-    def _transform(self, matrix: list[list[float]]) -> Camera:
-        position = self.position.transform(matrix)
-        look_at = self.look_at.transform(matrix)
+    def scaled(self, factor: float) -> Camera:
+        """Returns a camera with the same view, but a resolution divided by factor.
+
+        The resolution is rounded up, and the screen is moved closer by the same
+        factor so that the field of view is kept.
+        """
+        return Camera(
+            position=self.position,
+            look_at=self.look_at,
+            v_up=self.v_up,
+            distance_from_screen=self.distance_from_screen / factor,
+            vertical_resolution=math.ceil(self.vertical_resolution / factor),
+            horizontal_resolution=math.ceil(self.horizontal_resolution / factor),
+        )
+
+    def _transform(self, transform: Transform) -> Camera:
+        position = self.position.transform(transform)
+        look_at = self.look_at.transform(transform)
 
         return Camera(
             position=position,
@@ -81,27 +117,60 @@ class Camera(Transformable):
             horizontal_resolution=self.horizontal_resolution,
         )
 
-    def get_ray(self, i: int, j: int) -> Ray:
+    def get_ray(self, i: float, j: float) -> Ray:
         """Returns a ray from the camera to the pixel (i, j)"""
-        j = self.vertical_resolution - j
-
-        screen_center = (self.v_w * self.distance_from_screen) + self.position
-
+        _, v_u, v_v, screen_center = self._basis
         relative_i = i - self.horizontal_resolution / 2
-        relative_j = j - self.vertical_resolution / 2
+        relative_j = (self.vertical_resolution - j) - self.vertical_resolution / 2
 
-        i_offset_vector = self.v_u * relative_i
-        j_offset_vector = self.v_v * relative_j
-
-        point = screen_center + i_offset_vector + j_offset_vector
-        direction = point - self.position
+        # The point on the screen, minus the position of the camera.
+        direction = Vector(
+            screen_center.x + v_u.x * relative_i + v_v.x * relative_j - self.position.x,
+            screen_center.y + v_u.y * relative_i + v_v.y * relative_j - self.position.y,
+            screen_center.z + v_u.z * relative_i + v_v.z * relative_j - self.position.z,
+        )
         return Ray(self.position, direction)
 
+    def get_ray_arrays(
+        self, i: np.ndarray, j: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the origins and directions of the rays to the pixels (i, j), as
+        (n, 3) arrays. Directions are normalized, like those of `get_ray`.
+        """
+        position, v_u, v_v, screen_center = self._basis_arrays
+        relative_i = (np.ravel(i) - self.horizontal_resolution / 2)[:, None]
+        relative_j = (
+            (self.vertical_resolution - np.ravel(j)) - self.vertical_resolution / 2
+        )[:, None]
+
+        directions = screen_center + v_u * relative_i + v_v * relative_j - position
+        norms = np.sqrt(
+            directions[:, 0] * directions[:, 0]
+            + directions[:, 1] * directions[:, 1]
+            + directions[:, 2] * directions[:, 2]
+        )
+        norms[norms == 0] = 1
+        directions /= norms[:, None]
+        return np.broadcast_to(position, directions.shape), directions
+
+    def get_tile_ray_arrays(
+        self, x_start: int, y_start: int, x_end: int, y_end: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the origins and directions of the rays of a tile, row by row."""
+        j, i = np.mgrid[y_start:y_end, x_start:x_end].astype(np.float64)
+        return self.get_ray_arrays(i, j)
+
+    def get_ray_rows(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Yields the origins and directions of the rays of every row, top to bottom."""
+        for y in range(self.vertical_resolution):
+            yield self.get_tile_ray_arrays(0, y, self.horizontal_resolution, y + 1)
+
     class CameraRayIterator:
-        """Iterator for Camera Rays"""
+        """Iterator for Camera Rays, column by column or, if row_major, row by row."""
 
-        def __init__(self, camera: Camera):
+        def __init__(self, camera: Camera, row_major: bool = False):
             self.camera = camera
+            self.row_major = row_major
             self.i = 0
             self.j = 0
 
@@ -109,6 +178,8 @@ class Camera(Transformable):
             return self
 
         def __next__(self):
+            if self.row_major:
+                return self._next_row_major()
             if self.i == self.camera.horizontal_resolution:
                 raise StopIteration
             ray = self.camera.get_ray(self.i, self.j)
@@ -118,5 +189,15 @@ class Camera(Transformable):
                 self.i += 1
             return ray
 
-    def get_rays(self):
-        return Camera.CameraRayIterator(self)
+        def _next_row_major(self):
+            if self.j == self.camera.vertical_resolution:
+                raise StopIteration
+            ray = self.camera.get_ray(self.i, self.j)
+            self.i += 1
+            if self.i == self.camera.horizontal_resolution:
+                self.i = 0
+                self.j += 1
+            return ray
+
+    def get_rays(self, row_major: bool = False):
+        return Camera.CameraRayIterator(self, row_major)
@@ -4,6 +4,8 @@ from src.components.vector import *
 class Color(Vector):
     """A color object that inherits from Vector"""
 
+    __slots__ = ()
+
     @property
     def r(self):
         return self.x
@@ -17,11 +19,11 @@ class Color(Vector):
         return self.z
 
     def __add__(self, other):
-        return Color(
-            min(self.r + other.r, 255),
-            min(self.g + other.g, 255),
-            min(self.b + other.b, 255),
-        )
+        # The constructor clamps the channels.
+        return Color(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def _add_to_vector(self, vector):
+        raise TypeError("Cannot add a color to a vector")
 
     def as_rgb(self) -> tuple[int, int, int]:
         """Returns the color as a tuple of ints"""
@@ -31,7 +33,10 @@ class Color(Vector):
         return f"Color({self.r}, {self.g}, {self.b})"
 
     def __init__(self, r: float, g: float, b: float):
-        super().__init__(min(r, 255), min(g, 255), min(b, 255))
+        # Same as min(channel, 255), without the function calls.
+        self.x = 255 if 255 < r else r
+        self.y = 255 if 255 < g else g
+        self.z = 255 if 255 < b else b
 
     @classmethod
     def from_hex(cls, hex: str):
@@ -1,46 +1,279 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from abc import ABC, abstractmethod
 from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO
+
+import numpy as np
 
 from src.components.color import Color
 
 
+def colors_to_array(rows: list[list[Color]]) -> np.ndarray:
+    """Convert rows of colors to a (height, width, 3) array of channels."""
+    height = len(rows)
+    width = len(rows[0]) if rows else 0
+    values = np.fromiter(
+        (
+            channel
+            for row in rows
+            for color in row
+            for channel in (color.x, color.y, color.z)
+        ),
+        dtype=np.float64,
+        count=3 * width * height,
+    )
+    return values.reshape(height, width, 3)
+
+
+def colors_to_rgb(rows: list[list[Color]]) -> np.ndarray:
+    """Convert rows of colors to a (height, width, 3) array of bytes.
+
+    Channels are truncated to integers, as in `Color.as_rgb`.
+    """
+    return rgb_to_bytes(colors_to_array(rows))
+
+
+def rgb_to_bytes(values: np.ndarray) -> np.ndarray:
+    """Truncate an array of color channels in [0, 255] to a contiguous uint8 array."""
+    return np.ascontiguousarray(np.clip(np.trunc(values), 0, 255), dtype=np.uint8)
+
+
+class ImageWriter(ABC):
+    """Writes an image to a file row by row, so the image is never fully in memory.
+
+    Use as a context manager, and call `write_rows` with consecutive bands of rows,
+    from top to bottom, until all the rows of the image have been written.
+    """
+
+    def __init__(self, filename: str | Path, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._file: BinaryIO = open(filename, "wb")
+        self._write_header()
+
+    def _write_header(self) -> None:
+        pass
+
+    @abstractmethod
+    def _write_band(self, rows: np.ndarray) -> None:
+        """Write a band of rows, already validated, to the file."""
+        pass
+
+    def _write_footer(self) -> None:
+        pass
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """Write a (rows, width, 3) array of bytes below the rows written so far."""
+        rows = np.ascontiguousarray(rows, dtype=np.uint8)
+        if rows.ndim != 3 or rows.shape[1:] != (self.width, 3):
+            raise ValueError(
+                f"Expected rows of shape (n, {self.width}, 3), got {rows.shape}"
+            )
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("More rows than the height of the image were written.")
+
+        self._write_band(rows)
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        """Finish the file. All the rows of the image must have been written."""
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(
+                    f"Only {self.rows_written} of {self.height} rows were written."
+                )
+            self._write_footer()
+        finally:
+            self._file.close()
+
+    def __enter__(self) -> ImageWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Don't hide the original error behind a missing rows one.
+            self._file.close()
+
+
+class PPMWriter(ImageWriter):
+    """Writes binary (P6) or ASCII (P3) PPM files."""
+
+    def __init__(
+        self, filename: str | Path, width: int, height: int, binary: bool = True
+    ):
+        self.binary = binary
+        super().__init__(filename, width, height)
+
+    def _write_header(self) -> None:
+        magic = "P6" if self.binary else "P3"
+        self._file.write(f"{magic} {self.width} {self.height} 255\n".encode())
+
+    def _write_band(self, rows: np.ndarray) -> None:
+        if self.binary:
+            self._file.write(rows.tobytes())
+        else:
+            self._file.write(
+                "".join(
+                    f"{r} {g} {b}\n" for r, g, b in rows.reshape(-1, 3).tolist()
+                ).encode()
+            )
+
+
+class PNGWriter(ImageWriter):
+    """Writes 8-bit RGB PNG files, compressing the rows as they arrive."""
+
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+    def __init__(
+        self,
+        filename: str | Path,
+        width: int,
+        height: int,
+        compression_level: int = 6,
+    ):
+        self._compressor = zlib.compressobj(compression_level)
+        super().__init__(filename, width, height)
+
+    def _write_chunk(self, kind: bytes, data: bytes) -> None:
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def _write_header(self) -> None:
+        self._file.write(self.SIGNATURE)
+        # 8 bits per channel, truecolor, no interlacing.
+        self._write_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        )
+
+    def _write_band(self, rows: np.ndarray) -> None:
+        # Every scanline starts with its filter type; 0 means no filtering.
+        scanlines = np.zeros((len(rows), 1 + 3 * self.width), dtype=np.uint8)
+        scanlines[:, 1:] = rows.reshape(len(rows), -1)
+        data = self._compressor.compress(scanlines.tobytes())
+        if data:
+            self._write_chunk(b"IDAT", data)
+
+    def _write_footer(self) -> None:
+        self._write_chunk(b"IDAT", self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+
+def open_image_writer(filename: str | Path, width: int, height: int) -> ImageWriter:
+    """Open a writer for the format given by the file suffix: PNG or binary PPM."""
+    if Path(filename).suffix.lower() == ".png":
+        return PNGWriter(filename, width, height)
+    return PPMWriter(filename, width, height)
+
+
 class Image:
-    """A class representing an image."""
+    """A class representing an image.
+
+    The pixels are stored in a single (height, width, 3) float32 array, 12 bytes per
+    pixel. `row`, `tile` and `channel` return views into it, so writing to them
+    changes the image.
+    """
+
+    DTYPE = np.float32
 
     def __init__(
         self,
         vertical_resolution: int,
         horizontal_resolution: int,
-        pixels: list[list[Color]] | None = None,
+        pixels: list[list[Color]] | np.ndarray | None = None,
     ):
         self.vertical_resolution = vertical_resolution
         self.horizontal_resolution = horizontal_resolution
         if pixels is None:
-            self._pixels = [
-                [Color(0, 0, 0) for _ in range(horizontal_resolution)]
-                for _ in range(vertical_resolution)
-            ]
+            self._pixels = np.zeros(
+                (vertical_resolution, horizontal_resolution, 3), dtype=self.DTYPE
+            )
         else:
-            self._pixels = pixels
+            self.set_pixels(pixels)
 
-    def set_pixels(self, pixels: list[list[Color]]) -> None:
-        """Set the pixels of the image."""
-        self._pixels = pixels
+    def set_pixels(self, pixels: list[list[Color]] | np.ndarray) -> None:
+        """Set the pixels of the image, from rows of colors or an array of channels."""
+        if not isinstance(pixels, np.ndarray):
+            pixels = colors_to_array(pixels)
+        shape = (self.vertical_resolution, self.horizontal_resolution, 3)
+        if pixels.shape != shape:
+            raise ValueError(f"Expected pixels of shape {shape}, got {pixels.shape}")
+        self._pixels = np.ascontiguousarray(pixels, dtype=self.DTYPE)
+
+    @property
+    def pixels(self) -> np.ndarray:
+        """The (height, width, 3) array of pixels."""
+        return self._pixels
 
     def get_pixel(self, x: int, y: int) -> Color:
         """Get the color of a pixel."""
-        return self._pixels[y][x]
+        r, g, b = self._pixels[y, x].tolist()
+        return Color(r, g, b)
 
     def set_pixel(self, x: int, y: int, color: Color) -> None:
         """Set the color of a pixel."""
-        self._pixels[y][x] = color
-
-    def write_ppm(self, filename: str | Path) -> None:
-        """Write the image to a PPM file located at the given path."""
-        with open(filename, "w") as f:
-            f.write(f"P3 {self.horizontal_resolution} {self.vertical_resolution} 255\n")
-
-            for row in self._pixels:
-                for color in row:
-                    rgb_color = color.as_rgb()
-                    f.write(f"{rgb_color[0]} {rgb_color[1]} {rgb_color[2]}")
-                    f.write("\n")
+        self._pixels[y, x] = (color.x, color.y, color.z)
+
+    def row(self, y: int) -> np.ndarray:
+        """A (width, 3) view of a row of the image."""
+        return self._pixels[y]
+
+    def tile(self, x_start: int, y_start: int, x_end: int, y_end: int) -> np.ndarray:
+        """A (y_end - y_start, x_end - x_start, 3) view of a region of the image."""
+        return self._pixels[y_start:y_end, x_start:x_end]
+
+    def channel(self, index: int) -> np.ndarray:
+        """A (height, width) view of the red (0), green (1) or blue (2) channel."""
+        return self._pixels[..., index]
+
+    def to_rgb(self) -> np.ndarray:
+        """Return the image as a (height, width, 3) array of bytes."""
+        return rgb_to_bytes(self._pixels)
+
+    def _write(self, writer: ImageWriter) -> None:
+        with writer:
+            writer.write_rows(self.to_rgb())
+
+    def write_ppm(self, filename: str | Path, binary: bool = False) -> None:
+        """Write the image to a PPM file located at the given path.
+
+        The file is plain text (P3) unless `binary` is set, in which case the much
+        smaller and faster binary format (P6) is used.
+        """
+        self._write(
+            PPMWriter(
+                filename,
+                self.horizontal_resolution,
+                self.vertical_resolution,
+                binary=binary,
+            )
+        )
+
+    def write_png(self, filename: str | Path) -> None:
+        """Write the image to a PNG file located at the given path."""
+        self._write(
+            PNGWriter(filename, self.horizontal_resolution, self.vertical_resolution)
+        )
+
+    def write(self, filename: str | Path) -> None:
+        """Write the image as a PNG or binary PPM file, depending on its suffix."""
+        self._write(
+            open_image_writer(
+                filename, self.horizontal_resolution, self.vertical_resolution
+            )
+        )
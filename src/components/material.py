@@ -60,3 +60,33 @@ class Material:
             * (max(reflection_vector.dot_product(to_spectator), 0))
             ** self.rugosity_coefficient
         )
+
+    def get_light_colors(self, light: Light) -> tuple[Color, Color]:
+        """Returns the color of the light times the diffusion and specular coefficients."""
+        return (
+            light.color * self.diffusion_coefficient,
+            light.color * self.specular_coefficient,
+        )
+
+    def get_light_components(
+        self,
+        light_colors: tuple[Color, Color],
+        normal_at_position: Vector,
+        to_light: Vector,
+        to_spectator: Vector,
+    ) -> tuple[Color, Color]:
+        """Returns the diffuse and specular components of a light at once.
+
+        The arguments are the light's `get_light_colors` and the normalized directions
+        from the hit position to the light and to the spectator, which don't depend on
+        the component and can be shared between them and the shadow test.
+        """
+        diffuse_color, specular_color = light_colors
+        light_dot = normal_at_position.dot_product(to_light)
+        reflection_vector = 2 * normal_at_position * light_dot - to_light
+        return (
+            diffuse_color * max(light_dot, 0),
+            specular_color
+            * (max(reflection_vector.dot_product(to_spectator), 0))
+            ** self.rugosity_coefficient,
+        )
@@ -1,11 +1,17 @@
 import math
 from abc import ABC, abstractmethod
+from functools import cached_property, lru_cache
 from typing import Self
 
+import numpy as np
+
+from src import instrumentation
+from src.components.bounding_box import BoundingBox
+from src.components.bvh import Hierarchy
 from src.components.material import Material
 from src.components.point import Point
 from src.components.ray import Ray
-from src.components.transformations import Transformable
+from src.components.transformations import Transform, Transformable
 from src.components.vector import Vector
 
 
@@ -29,6 +35,30 @@ class Object(ABC, Transformable):
         """Get the normal vector at a point on the object."""
         pass
 
+    def get_bounding_box(self) -> BoundingBox | None:
+        """Get the axis-aligned box enclosing the object, or None if it is unbounded."""
+        return None
+
+    def get_primitives(self) -> list["Object"]:
+        """Get the simplest objects this object is made of, for acceleration structures."""
+        return [self]
+
+    def precompute(self) -> None:
+        """Compute the data that intersections would otherwise derive on first use."""
+        pass
+
+    def derived_state(self) -> dict:
+        """The derived data computed so far, which pickling the object leaves out.
+
+        Prepared scenes pickle it along with their objects, and give it back to them
+        with `restore_derived_state`, so that it isn't computed again once loaded.
+        """
+        return {}
+
+    def restore_derived_state(self, state: dict) -> None:
+        """Restore derived data returned by `derived_state`, after unpickling."""
+        self.__dict__.update(state)
+
 
 class Sphere(Object):
     """Class for sphere objects."""
@@ -44,12 +74,25 @@ class Sphere(Object):
     def get_normal_at_point(self, point: Point) -> Vector:
         return (point - self.center).normalized()
 
+    def get_bounding_box(self) -> BoundingBox:
+        return BoundingBox(
+            Point(
+                self.center.x - self.radius,
+                self.center.y - self.radius,
+                self.center.z - self.radius,
+            ),
+            Point(
+                self.center.x + self.radius,
+                self.center.y + self.radius,
+                self.center.z + self.radius,
+            ),
+        )
+
     def find_intersection(self, ray: Ray) -> tuple[float, Vector] | tuple[None, None]:
+        center_to_origin = ray.origin - self.center
         a_coeff = ray.direction.dot_product(ray.direction)
-        b_coeff = 2 * ray.direction.dot_product(ray.origin - self.center)
-        c_coeff = (ray.origin - self.center).dot_product(
-            ray.origin - self.center
-        ) - self.radius**2
+        b_coeff = 2 * ray.direction.dot_product(center_to_origin)
+        c_coeff = center_to_origin.dot_product(center_to_origin) - self.radius**2
 
         discriminant = b_coeff**2 - 4 * a_coeff * c_coeff
 
@@ -58,19 +101,19 @@ class Sphere(Object):
             distance = (-b_coeff - math.sqrt(discriminant)) / (2 * a_coeff)
             if distance > EPSILON:
                 return distance, self.get_normal_at_point(
-                    ray.origin + distance * ray.direction
+                    ray.origin.along(ray.direction, distance)
                 )
 
             distance = (-b_coeff + math.sqrt(discriminant)) / (2 * a_coeff)
             if distance > EPSILON:
                 return distance, self.get_normal_at_point(
-                    ray.origin + distance * ray.direction
+                    ray.origin.along(ray.direction, distance)
                 )
 
         return None, None
 
-    def _transform(self, matrix: list[list[float]]) -> Self:
-        center = self.center.transform(matrix)
+    def _transform(self, transform: Transform) -> Self:
+        center = self.center.transform(transform)
         return self.__class__(self.material, self.radius, center)
 
 
@@ -90,17 +133,17 @@ class Plane(Object):
         if abs(ray.direction.dot_product(self.normal)) < EPSILON:
             return None, None
 
-        distance = self.normal.dot_product(
-            self.point - ray.origin
+        distance = self.point.difference_dot(
+            ray.origin, self.normal
         ) / ray.direction.dot_product(self.normal)
         if distance > EPSILON:
             return distance, self.normal
 
         return None, None
 
-    def _transform(self, matrix: list[list[float]]) -> Self:
-        point = self.point.transform(matrix)
-        normal = self.normal.transform(matrix)
+    def _transform(self, transform: Transform) -> Self:
+        point = self.point.transform(transform)
+        normal = transform.apply_to_normal(self.normal)
         return self.__class__(self.material, normal, point)
 
 
@@ -120,9 +163,33 @@ class Triangle(Object):
     def get_normal_at_point(self, point: Point) -> Vector:
         return self.normal
 
+    def get_bounding_box(self) -> BoundingBox:
+        return BoundingBox.from_points(self.points)
+
+    @cached_property
+    def edges(self) -> tuple[Vector, Vector]:
+        """The edges from the first vertex to the second and third ones."""
+        return self.points[1] - self.points[0], self.points[2] - self.points[0]
+
+    def precompute(self) -> None:
+        self.edges
+
+    def __getstate__(self) -> dict:
+        # The edges are derived data; they're not worth serializing.
+        state = self.__dict__.copy()
+        state.pop("edges", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
+    def derived_state(self) -> dict:
+        if "edges" not in self.__dict__:
+            return {}
+        return {"edges": self.edges}
+
     def find_intersection(self, ray: Ray) -> tuple[float, Vector] | tuple[None, None]:
-        edge1 = self.points[1] - self.points[0]
-        edge2 = self.points[2] - self.points[0]
+        edge1, edge2 = self.edges
 
         h = ray.direction.cross_product(edge2)
         a = edge1.dot_product(h)
@@ -150,18 +217,59 @@ class Triangle(Object):
 
         return None, None
 
-    def _transform(self, matrix: list[list[float]]) -> Self:
-        points = tuple(point.transform(matrix) for point in self.points)
-        normal = self.normal.transform(matrix)
+    def _transform(self, transform: Transform) -> Self:
+        points = tuple(point.transform(transform) for point in self.points)
+        normal = transform.apply_to_normal(self.normal)
         return self.__class__(self.material, points, normal)  # type: ignore
 
 
 class TriangleMesh(Object):
-    """Class for triangle mesh objects."""
+    """Class for triangle mesh objects.
+
+    Transforming a mesh is lazy: transforms are composed as they are applied, and the
+    triangles are only transformed on first use, all at once.
+    """
 
-    def __init__(self, material: Material, triangles: list[Triangle]):
+    def __init__(
+        self,
+        material: Material,
+        triangles: list[Triangle],
+        transform: Transform | None = None,
+    ):
         super().__init__(material)
-        self.triangles = triangles
+        if transform is None:
+            self.triangles = triangles
+        else:
+            self._pending = (triangles, transform)
+
+    @cached_property
+    def triangles(self) -> list[Triangle]:
+        """The triangles of the mesh, with its pending transform applied."""
+        triangles, transform = self.__dict__.pop("_pending")
+        points = np.array([[(p.x, p.y, p.z) for p in t.points] for t in triangles])
+        normals = np.array([(t.normal.x, t.normal.y, t.normal.z) for t in triangles])
+        points = transform.apply_to_points(points.reshape(-1, 3, 3))
+        normals = transform.apply_to_normals(normals.reshape(-1, 3))
+        return [
+            Triangle(
+                triangle.material, (Point(*a), Point(*b), Point(*c)), Vector(*normal)
+            )
+            for triangle, (a, b, c), normal in zip(
+                triangles, points.tolist(), normals.tolist()
+            )
+        ]
+
+    @cached_property
+    def packed(self) -> "PackedTriangleMesh":
+        """The mesh packed into arrays, built on first use, e.g. by instances."""
+        return PackedTriangleMesh.from_triangle_mesh(self)
+
+    def __getstate__(self) -> dict:
+        # Pending transforms are applied, so that meshes are always stored as triangles.
+        return {"material": self.material, "triangles": self.triangles}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
 
     def find_intersection(self, ray: Ray) -> tuple[float, Vector] | tuple[None, None]:
         distance = float("inf")
@@ -177,11 +285,20 @@ class TriangleMesh(Object):
 
         return distance, normal
 
+    def get_bounding_box(self) -> BoundingBox | None:
+        if not self.triangles:
+            return None
+        return BoundingBox.from_points(
+            point for triangle in self.triangles for point in triangle.points
+        )
+
+    def get_primitives(self) -> list[Object]:
+        return list(self.triangles)
+
     def find_triangle_at_point(self, point: Point) -> Triangle | None:
         EPSILON = 0.0001
         for triangle in self.triangles:
-            edge1 = triangle.points[1] - triangle.points[0]
-            edge2 = triangle.points[2] - triangle.points[0]
+            edge1, edge2 = triangle.edges
 
             h = edge2.cross_product(triangle.normal)
             a = edge1.dot_product(h)
@@ -213,79 +330,397 @@ class TriangleMesh(Object):
 
         return triangle.get_normal_at_point(point)
 
-    def _transform(self, matrix: list[list[float]]) -> Self:
-        triangles = [triangle.transform(matrix) for triangle in self.triangles]
-        return self.__class__(self.material, triangles)
+    def _transform(self, transform: Transform) -> Self:
+        if "_pending" in self.__dict__:
+            triangles, previous = self._pending
+            return self.__class__(self.material, triangles, previous.then(transform))
+        return self.__class__(self.material, self.triangles, transform)
+
+
+class PackedTriangleMesh(Object):
+    """Class for triangle meshes stored as contiguous vertex, index and normal arrays.
+
+    No per-triangle objects are created: a mesh of N triangles over V vertices is a
+    (V, 3) vertex array, a (N, 3) index array and a (N, 3) normal array, plus the
+    precomputed edges of every triangle. Triangles are intersected in bulk with NumPy.
+    """
+
+    LEAF_SIZE = 16
+
+    def __init__(
+        self,
+        material: Material,
+        vertices: np.ndarray,
+        indices: np.ndarray,
+        normals: np.ndarray | None = None,
+    ):
+        super().__init__(material)
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int32).reshape(-1, 3)
+
+        if normals is None:
+            corners = self.vertices[self.indices]
+            normals = np.cross(
+                corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+            )
+        normals = np.array(normals, dtype=np.float64).reshape(-1, 3)
+        lengths = np.linalg.norm(normals, axis=1)
+        lengths[lengths == 0] = 1
+        self.normals = normals / lengths[:, None]
+
+        self._prepare()
+
+    def _prepare(self) -> None:
+        """Reset the per-triangle data used by intersections, which is built lazily.
+
+        Nothing is read from the vertex and index arrays here, so memory-mapped
+        meshes are only paged in once they are rendered.
+        """
+        self._edges: tuple[np.ndarray, np.ndarray] | None = None
+        self._hierarchy: Hierarchy | None = None
+        self._leaf_faces: np.ndarray | None = None
+
+    def _get_edges(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._edges is None:
+            corners = self.vertices[self.indices]
+            self._edges = (corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        return self._edges
+
+    def precompute(self) -> None:
+        self._get_edges()
+        self.hierarchy
+
+    @property
+    def edge1(self) -> np.ndarray:
+        """The edge from the first to the second vertex of every triangle."""
+        return self._get_edges()[0]
+
+    @property
+    def edge2(self) -> np.ndarray:
+        """The edge from the first to the third vertex of every triangle."""
+        return self._get_edges()[1]
+
+    def __getstate__(self) -> dict:
+        # Only the arrays that define the mesh are serialized; the rest is derived.
+        return {
+            "material": self.material,
+            "vertices": self.vertices,
+            "indices": self.indices,
+            "normals": self.normals,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.material = state["material"]
+        self.vertices = state["vertices"]
+        self.indices = state["indices"]
+        self.normals = state["normals"]
+        self._prepare()
+
+    def derived_state(self) -> dict:
+        return {"edges": self._edges, "hierarchy": self._hierarchy}
+
+    def restore_derived_state(self, state: dict) -> None:
+        self._edges = state["edges"]
+        self._hierarchy = state["hierarchy"]
+        if self._hierarchy is not None:
+            # The leaf faces are a view of the hierarchy, as built by `hierarchy`.
+            self._leaf_faces = np.frombuffer(self._hierarchy.leaf_items, dtype=np.int64)
+
+    def __repr__(self) -> str:
+        return (
+            f"PackedTriangleMesh(Triangles:{len(self)}, Vertices:{len(self.vertices)})"
+        )
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    @property
+    def first_vertices(self) -> np.ndarray:
+        """The first vertex of every triangle, which the edges start from."""
+        return self.vertices[self.indices[:, 0]]
+
+    @classmethod
+    def from_triangle_mesh(cls, mesh: TriangleMesh) -> Self:
+        """Pack a triangle mesh, sharing the vertices that its triangles have in common."""
+        vertex_index: dict[tuple[float, float, float], int] = {}
+        indices = []
+        for triangle in mesh.triangles:
+            indices.append(
+                [
+                    vertex_index.setdefault(
+                        (point.x, point.y, point.z), len(vertex_index)
+                    )
+                    for point in triangle.points
+                ]
+            )
+
+        return cls(
+            mesh.material,
+            np.array(list(vertex_index), dtype=np.float64).reshape(-1, 3),
+            np.array(indices, dtype=np.int32).reshape(-1, 3),
+            np.array(
+                [[t.normal.x, t.normal.y, t.normal.z] for t in mesh.triangles],
+                dtype=np.float64,
+            ).reshape(-1, 3),
+        )
+
+    def to_triangle_mesh(self) -> TriangleMesh:
+        """Unpack the mesh into a TriangleMesh of individual Triangle objects."""
+        points = [Point(*vertex) for vertex in self.vertices.tolist()]
+        return TriangleMesh(
+            self.material,
+            [
+                Triangle(
+                    self.material, (points[a], points[b], points[c]), Vector(*normal)
+                )
+                for (a, b, c), normal in zip(
+                    self.indices.tolist(), self.normals.tolist()
+                )
+            ],
+        )
+
+    @property
+    def hierarchy(self) -> Hierarchy:
+        """Bounding volume tree over the triangles, built on first use."""
+        if self._hierarchy is None:
+            corners = self.vertices[self.indices]
+            bounds = np.concatenate((corners.min(axis=1), corners.max(axis=1)), axis=1)
+            self._hierarchy = Hierarchy(bounds, self.LEAF_SIZE)
+            self._leaf_faces = np.frombuffer(self._hierarchy.leaf_items, dtype=np.int64)
+        return self._hierarchy
+
+    def intersect_faces(
+        self, origin: np.ndarray, direction: np.ndarray, faces: np.ndarray | slice
+    ) -> np.ndarray:
+        """Return the distance from a ray to each of the given triangles (inf on a miss)."""
+        EPSILON = 0.0001
+        edge1 = self.edge1[faces]
+        edge2 = self.edge2[faces]
+
+        h = np.cross(direction, edge2)
+        a = np.einsum("ij,ij->i", edge1, h)
+        parallel = (a > -EPSILON) & (a < EPSILON)
+        f = 1 / np.where(parallel, 1, a)
+
+        s = origin - self.vertices[self.indices[faces, 0]]
+        u = f * np.einsum("ij,ij->i", s, h)
+        q = np.cross(s, edge1)
+        v = f * (q @ direction)
+        t = f * np.einsum("ij,ij->i", edge2, q)
+
+        hit = ~parallel & (u >= 0) & (u <= 1) & (v >= 0) & (u + v <= 1) & (t > EPSILON)
+        return np.where(hit, t, np.inf)
+
+    def find_intersections(
+        self, origins: np.ndarray, directions: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Intersect a batch of rays with every triangle.
+
+        Returns:
+            The distance to the nearest triangle hit by each ray (inf on a miss) and
+            the index of that triangle (-1 on a miss).
+        """
+        EPSILON = 0.0001
+        distances = np.full(len(origins), np.inf)
+        faces = np.full(len(origins), -1, dtype=np.int64)
+        if not len(origins) or not len(self):
+            return distances, faces
+
+        # Work on blocks of triangles, keeping the (rays, triangles) matrices small.
+        block = max(1, (1 << 18) // len(origins))
+        ox, oy, oz = (origins[:, axis, None] for axis in range(3))
+        dx, dy, dz = (directions[:, axis, None] for axis in range(3))
+        for start in range(0, len(self), block):
+            end = start + block
+            e1x, e1y, e1z = self.edge1[start:end].T
+            e2x, e2y, e2z = self.edge2[start:end].T
+            vx, vy, vz = self.vertices[self.indices[start:end, 0]].T
+
+            hx = dy * e2z - dz * e2y
+            hy = dz * e2x - dx * e2z
+            hz = dx * e2y - dy * e2x
+            a = e1x * hx + e1y * hy + e1z * hz
+            parallel = (a > -EPSILON) & (a < EPSILON)
+            f = 1 / np.where(parallel, 1, a)
+
+            sx, sy, sz = ox - vx, oy - vy, oz - vz
+            u = f * (sx * hx + sy * hy + sz * hz)
+            qx = sy * e1z - sz * e1y
+            qy = sz * e1x - sx * e1z
+            qz = sx * e1y - sy * e1x
+            v = f * (dx * qx + dy * qy + dz * qz)
+            t = f * (e2x * qx + e2y * qy + e2z * qz)
+
+            hit = (
+                ~parallel
+                & (u >= 0)
+                & (u <= 1)
+                & (v >= 0)
+                & (u + v <= 1)
+                & (t > EPSILON)
+            )
+            t = np.where(hit, t, np.inf)
+            nearest = np.argmin(t, axis=1)
+            block_distances = t[np.arange(len(origins)), nearest]
+            closer = block_distances < distances
+            distances[closer] = block_distances[closer]
+            faces[closer] = nearest[closer] + start
+
+        return distances, faces
+
+    def find_intersection(self, ray: Ray) -> tuple[float, Vector] | tuple[None, None]:
+        origin = np.array([ray.origin.x, ray.origin.y, ray.origin.z])
+        direction = np.array([ray.direction.x, ray.direction.y, ray.direction.z])
+
+        closest_distance = math.inf
+        closest_face = -1
+        stats = instrumentation.current
+
+        def visit_leaf(start: int, end: int) -> float:
+            nonlocal closest_distance, closest_face
+            faces = self._leaf_faces[start:end]  # type: ignore
+            if stats is not None:
+                # Every triangle of the leaf is tested, as an unpacked mesh would be.
+                stats.count_tests(Triangle.__name__, len(faces))
+            distances = self.intersect_faces(origin, direction, faces)
+            nearest = int(np.argmin(distances))
+            distance = float(distances[nearest])
+            face = int(faces[nearest])
+            if distance < closest_distance or (
+                distance == closest_distance and face < closest_face
+            ):
+                closest_distance = distance
+                closest_face = face
+            return closest_distance
+
+        self.hierarchy.traverse(ray, visit_leaf)
+
+        if closest_face == -1:
+            return None, None
+
+        return closest_distance, Vector(*self.normals[closest_face].tolist())
+
+    def get_bounding_box(self) -> BoundingBox | None:
+        if not len(self.vertices):
+            return None
+        return BoundingBox(
+            Point(*self.vertices.min(axis=0).tolist()),
+            Point(*self.vertices.max(axis=0).tolist()),
+        )
+
+    def get_normal_at_point(self, point: Point) -> Vector:
+        EPSILON = 0.0001
+        h = np.cross(self.edge2, self.normals)
+        a = np.einsum("ij,ij->i", self.edge1, h)
+        parallel = (a > -EPSILON) & (a < EPSILON)
+        f = 1 / np.where(parallel, 1, a)
+        s = np.array([point.x, point.y, point.z]) - self.first_vertices
+        u = f * np.einsum("ij,ij->i", s, h)
+        q = np.cross(s, self.edge1)
+        v = f * np.einsum("ij,ij->i", self.edge2, q)
+
+        inside = ~parallel & (u >= 0) & (u <= 1) & (v >= 0) & (u + v <= 1)
+        if not inside.any():
+            raise Exception("No triangle found at point")
+
+        return Vector(*self.normals[int(np.argmax(inside))].tolist())
+
+    def _transform(self, transform: Transform) -> Self:
+        vertices = transform.apply_to_points(self.vertices)
+        normals = transform.apply_to_normals(self.normals)
+        return self.__class__(self.material, vertices, self.indices, normals)
+
+
+def _bernstein_basis(count: int, samples: int) -> np.ndarray:
+    """The (samples, count) weights of `count` control points at evenly spaced parameters.
+
+    A curve goes from its last control point at t = 0 to its first one at t = 1,
+    which is the direction surfaces have always been sampled in.
+    """
+    degree = count - 1
+    t = np.arange(samples) / (samples - 1)
+    powers = np.arange(count)
+    binomials = np.array([math.comb(degree, k) for k in powers], dtype=np.float64)
+    return binomials * t[:, None] ** (degree - powers) * (1 - t[:, None]) ** powers
+
+
+@lru_cache(maxsize=32)
+def _tessellate(
+    points: tuple[tuple[tuple[float, float, float], ...], ...], K1: int, K2: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sample a bezier surface on a K1 x K2 grid and triangulate it.
+
+    Returns read-only vertex, index and normal arrays, as in `PackedTriangleMesh`.
+    """
+    # Cada lista de pontos é uma curva, avaliada em K1 parâmetros; depois cada coluna
+    # dessas curvas é avaliada em K2 parâmetros.
+    curves = np.stack(
+        [
+            _bernstein_basis(len(row), K1) @ np.array(row).reshape(-1, 3)
+            for row in points
+        ]
+    )
+    grid = np.einsum("ir,rjd->jid", _bernstein_basis(len(points), K2), curves)
+    vertices = np.ascontiguousarray(grid.reshape(-1, 3))
+
+    # Two triangles per cell of the grid p: (p[i][j+1], p[i][j], p[i+1][j]) and
+    # (p[i][j+1], p[i+1][j+1], p[i+1][j]).
+    index = np.arange(K1 * K2).reshape(K1, K2)
+    corner = index[:-1, :-1]
+    right, below, diagonal = corner + 1, corner + K2, corner + K2 + 1
+    indices = np.stack(
+        (
+            np.stack((right, corner, below), axis=-1),
+            np.stack((right, diagonal, below), axis=-1),
+        ),
+        axis=2,
+    ).reshape(-1, 3)
+
+    p00, p01, p10, p11 = grid[:-1, :-1], grid[:-1, 1:], grid[1:, :-1], grid[1:, 1:]
+    normals = np.stack(
+        (np.cross(p10 - p00, p01 - p00), np.cross(p01 - p11, p10 - p11)), axis=2
+    ).reshape(-1, 3)
+
+    indices = indices.astype(np.int32)
+    for array in (vertices, indices, normals):
+        array.flags.writeable = False
+    return vertices, indices, normals
 
 
 class BezierSurface(Object):
-    """Class for bezier surface objects."""
+    """Class for bezier surface objects.
+
+    The surface is sampled on a K1 x K2 grid into a packed triangle mesh on first
+    use. Surfaces with the same control points and grid share their tessellation.
+    """
 
-    def __init__(self, material: Material, points: list[list[Point]], K1: int, K2: int): # é uma lista de listas de pontos que formam, cada uma, uma curva de bezier
+    def __init__(
+        self, material: Material, points: list[list[Point]], K1: int, K2: int
+    ):  # é uma lista de listas de pontos que formam, cada uma, uma curva de bezier
         super().__init__(material)
         self.points = points
+        self.K1 = K1
+        self.K2 = K2
+
+    @cached_property
+    def malha(self) -> PackedTriangleMesh:
+        """The triangle mesh the surface is rendered as."""
+        key = tuple(tuple((p.x, p.y, p.z) for p in row) for row in self.points)
+        return PackedTriangleMesh(self.material, *_tessellate(key, self.K1, self.K2))
 
-        # Primeiro passo: Criar a matriz intermediaria com as iterações do deCasteljau com K1
-        new_matriz_k1 = []
-        for lista_pontos in points:
-            new_pontos = []
-            for i in range(K1):
-                new_ponto = self.deCasteljau(lista_pontos, i/(K1 - 1))
-                new_pontos.append(new_ponto)
-            new_matriz_k1.append(new_pontos)
-
-        # Segunda matriz
-        final_matriz_k2 = []
-        for j in range(K1): # Posição das colunas
-            coluna = [linha[j] for linha in new_matriz_k1]
-            new_pontos = []
-            for i in range(K2):
-                new_ponto = self.deCasteljau(coluna, i/(K2 - 1))
-                new_pontos.append(new_ponto)
-            final_matriz_k2.append(new_pontos)
-            # A matriz vai ficar transposta mas nao importa para a malha de trigulos
-
-        lista_triangulos = []
-        for i in range(K1-1):
-            for j in range(K2-1):
-                vector_11 = final_matriz_k2[i][j+1] - final_matriz_k2[i][j]
-                vector_12 = final_matriz_k2[i+1][j] - final_matriz_k2[i][j]
-                normal1 = vector_12.cross_product(vector_11).normalized()
-                T1 = Triangle(self.material, (final_matriz_k2[i][j+1], final_matriz_k2[i][j], final_matriz_k2[i+1][j]), normal1)
-
-                vector_21 = final_matriz_k2[i][j+1] - final_matriz_k2[i+1][j+1]
-                vector_22 = final_matriz_k2[i+1][j] - final_matriz_k2[i+1][j+1]
-                normal2 = vector_21.cross_product(vector_22).normalized()
-                T2 = Triangle(self.material, (final_matriz_k2[i][j+1], final_matriz_k2[i+1][j+1], final_matriz_k2[i+1][j]), normal2)
-
-                lista_triangulos.append(T1)
-
-                lista_triangulos.append(T2)
-
-        self.malha = TriangleMesh(material, lista_triangulos)
-        print(len(lista_triangulos))
-
-           
-    def interpolate(self, pointA: Point, pointB: Point, t: float):
-        mult1 = pointA.__mul__(t) 
-        mult2 = pointB.__mul__(1-t)
-        return mult1.__add__(mult2)
-    
-    def deCasteljau(self, points: list[Point], t):
-        grade = len(points) - 1
-        
-        if grade == 1:
-            return self.interpolate(points[0], points[1], t)
-        
-        newPoints = []
-        for i in range(grade):
-            pointA = points[i]
-            pointB = points[i + 1]
-            newPoint = self.interpolate(pointA, pointB, t)
-            
-            newPoints.append(newPoint)
-        
-        return self.deCasteljau(newPoints, t)
+    def __getstate__(self) -> dict:
+        # The mesh is derived from the control points; it's not worth serializing.
+        state = self.__dict__.copy()
+        state.pop("malha", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
+    def derived_state(self) -> dict:
+        if "malha" not in self.__dict__:
+            return {}
+        return {"malha": self.malha}
 
     def get_normal_at_point(self, point: Point) -> Vector:
         return self.malha.get_normal_at_point(point)
@@ -293,5 +728,85 @@ class BezierSurface(Object):
     def find_intersection(self, ray: Ray) -> tuple[float, Vector] | tuple[None, None]:
         return self.malha.find_intersection(ray)
 
-    def _transform(self, matrix: list[list[float]]) -> Self:
-        return self.malha._transform(matrix)
\ No newline at end of file
+    def get_bounding_box(self) -> BoundingBox | None:
+        return self.malha.get_bounding_box()
+
+    def get_primitives(self) -> list[Object]:
+        return self.malha.get_primitives()
+
+    def _transform(self, transform: Transform) -> Self:
+        return self.malha._transform(transform)
+
+
+class Instance(Object):
+    """Class for placements of a shared mesh or bezier surface by a transform.
+
+    Rays are transformed into the space of the mesh rather than the mesh into world
+    space, so any number of instances of a mesh only store it once. Meshes are
+    intersected in their packed form.
+    """
+
+    def __init__(
+        self,
+        geometry: TriangleMesh | PackedTriangleMesh | BezierSurface,
+        to_world: Transform,
+        material: Material | None = None,
+    ):
+        if not isinstance(geometry, (TriangleMesh, PackedTriangleMesh, BezierSurface)):
+            raise TypeError(f"{type(geometry).__name__} objects can't be instanced.")
+        super().__init__(geometry.material if material is None else material)
+        self.geometry = geometry
+        self.to_world = to_world
+
+    def __repr__(self) -> str:
+        return f"Instance({self.geometry!r}, {self.to_world!r})"
+
+    @property
+    def surface(self) -> PackedTriangleMesh:
+        """The mesh that rays are intersected with, in its own space."""
+        if isinstance(self.geometry, TriangleMesh):
+            return self.geometry.packed
+        if isinstance(self.geometry, BezierSurface):
+            return self.geometry.malha
+        return self.geometry
+
+    def find_intersection(self, ray: Ray) -> tuple[float, Vector] | tuple[None, None]:
+        to_object = self.to_world.inverse
+        # The direction is not normalized again, so that distances are the same along
+        # both rays.
+        local_ray = Ray.from_normalized(
+            ray.origin.transform(to_object), to_object.apply_to_direction(ray.direction)
+        )
+        distance, normal = self.surface.find_intersection(local_ray)
+        if distance is None:
+            return None, None
+
+        return distance, self.to_world.apply_to_normal(normal).normalized()
+
+    def get_normal_at_point(self, point: Point) -> Vector:
+        local_point = point.transform(self.to_world.inverse)
+        normal = self.surface.get_normal_at_point(local_point)
+        return self.to_world.apply_to_normal(normal).normalized()
+
+    def get_bounding_box(self) -> BoundingBox | None:
+        box = self.surface.get_bounding_box()
+        if box is None:
+            return None
+
+        low, high = box.minimum, box.maximum
+        return BoundingBox.from_points(
+            Point(x, y, z).transform(self.to_world)
+            for x in (low.x, high.x)
+            for y in (low.y, high.y)
+            for z in (low.z, high.z)
+        )
+
+    def to_mesh(self) -> PackedTriangleMesh:
+        """A copy of the mesh, transformed into world space."""
+        mesh = self.surface.transform(self.to_world)
+        mesh.material = self.material
+        return mesh
+
+    def _transform(self, transform: Transform) -> Self:
+        to_world = self.to_world.then(transform)
+        return self.__class__(self.geometry, to_world, self.material)
@@ -2,13 +2,15 @@ from __future__ import annotations
 
 from typing import Any
 
-from src.components.transformations import Transformable
+from src.components.transformations import Transform, Transformable
 from src.components.vector import Vector
 
 
 class Point(Transformable):
     """A point in 3D space."""
 
+    __slots__ = ("x", "y", "z")
+
     def __init__(self, x: float, y: float, z: float):
         self.x = x
         self.y = y
@@ -26,18 +28,8 @@ class Point(Transformable):
     def __sub__(self, other: Point | Vector) -> Vector:
         return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
 
-    Matrix = list[list[float]]
-
-    def _transform_3x3(self, matrix: Matrix) -> Point:
-        """Transforms the vector by a 3x3 matrix"""
-        return self.__class__(
-            self.x * matrix[0][0] + self.y * matrix[0][1] + self.z * matrix[0][2],
-            self.x * matrix[1][0] + self.y * matrix[1][1] + self.z * matrix[1][2],
-            self.x * matrix[2][0] + self.y * matrix[2][1] + self.z * matrix[2][2],
-        )
-
-    def _transform_4x4(self, matrix: Matrix) -> Point:
-        """Transforms the vector by a 4x4 matrix"""
+    def _transform(self, transform: Transform) -> Point:
+        matrix = transform.rows
         return self.__class__(
             self.x * matrix[0][0]
             + self.y * matrix[0][1]
@@ -53,15 +45,28 @@ class Point(Transformable):
             + matrix[2][3],
         )
 
-    def _transform(self, matrix: Matrix) -> Point:
-        if len(matrix) == 3:
-            return self._transform_3x3(matrix)
-
-        return self._transform_4x4(matrix)
-
     def __add__(self, other: Point | Vector) -> Point:
         return Point(self.x + other.x, self.y + other.y, self.z + other.z)
 
+    def _add_to_vector(self, vector: Vector) -> Point:
+        return Point(self.x + vector.x, self.y + vector.y, self.z + vector.z)
+
+    def along(self, direction: Vector, distance: float) -> Point:
+        """Returns the point at `distance` along `direction`: self + direction * distance"""
+        return Point(
+            self.x + direction.x * distance,
+            self.y + direction.y * distance,
+            self.z + direction.z * distance,
+        )
+
+    def difference_dot(self, other: Point | Vector, vector: Vector) -> float:
+        """Returns (self - other).dot_product(vector)"""
+        return (
+            (self.x - other.x) * vector.x
+            + (self.y - other.y) * vector.y
+            + (self.z - other.z) * vector.z
+        )
+
     def __eq__(self, other: Any) -> bool:
         if not isinstance(other, Point):
             return False
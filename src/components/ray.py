@@ -5,10 +5,20 @@ from src.components.vector import Vector
 class Ray:
     """A light ray. Has an origin point and a vector that indicates it's direction."""
 
+    __slots__ = ("origin", "direction")
+
     def __init__(self, origin: Point, direction: Vector):
         self.origin = origin
         self.direction = direction.normalized()
 
+    @classmethod
+    def from_normalized(cls, origin: Point, direction: Vector) -> "Ray":
+        """Returns a ray whose direction is already normalized, without normalizing it again."""
+        ray = cls.__new__(cls)
+        ray.origin = origin
+        ray.direction = direction
+        return ray
+
     def __repr__(self) -> str:
         return f"Ray(Origin:{self.origin}, Direction:{self.direction})"
 
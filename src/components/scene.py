@@ -1,8 +1,11 @@
 from dataclasses import dataclass
+from functools import cached_property
 
+from src.components.bvh import BVH
 from src.components.camera import Camera
 from src.components.color import Color
 from src.components.light import Light
+from src.components.material import Material
 from src.components.objects_in_space import Object
 
 
@@ -15,3 +18,49 @@ class Scene:
     lights: list[Light]
     ambient_color: Color
     background_color: Color
+
+    # Reflected and transmitted rays are traced up to `max_depth` bounces deep, and
+    # only while their weight, the product of the coefficients their color is scaled
+    # by on its way to the pixel, is at least `min_weight`. Light weighing less than
+    # 1/255 can't change a channel by a whole level.
+    max_depth: int = 5
+    min_weight: float = 1 / 255
+
+    @cached_property
+    def bvh(self) -> BVH:
+        """Acceleration structure over the scene objects, built on first use.
+
+        Note: The tree is not rebuilt if `objects` is modified afterwards.
+        """
+        return BVH(self.objects)
+
+    @cached_property
+    def _light_colors(self) -> dict[int, list[tuple[Color, Color]]]:
+        return {
+            id(obj.material): [
+                obj.material.get_light_colors(light) for light in self.lights
+            ]
+            for obj in self.objects
+        }
+
+    def get_light_colors(self, material: Material) -> list[tuple[Color, Color]]:
+        """The `Material.get_light_colors` of every light, for a material.
+
+        They are computed once for the materials of all the objects, on first use.
+        Note: They are not recomputed if `objects` or `lights` are modified afterwards.
+        """
+        light_colors = self._light_colors.get(id(material))
+        if light_colors is None:
+            light_colors = [material.get_light_colors(light) for light in self.lights]
+        return light_colors
+
+    def __getstate__(self) -> dict:
+        # The acceleration structure and the light colors are derived data; they're
+        # not worth serializing.
+        state = self.__dict__.copy()
+        state.pop("bvh", None)
+        state.pop("_light_colors", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
@@ -2,47 +2,44 @@ from __future__ import annotations
 
 import math
 from abc import abstractmethod
+from functools import cached_property
 from typing import Self
 
+import numpy as np
+
 import src.components
 
+Matrix = list[list[float]]
 
-class Transformable:
-    """An object that can suffer linear transformations."""
 
-    def _check_matrix(self, matrix: list[list[float]]) -> bool:
-        """Checks if the given matrix is a 3x3 or 4x4 matrix"""
-        if len(matrix) == 3:
-            for i in range(3):
-                if len(matrix[i]) != 3:
-                    return False
-            return True
-        elif len(matrix) == 4:
-            for i in range(4):
-                if len(matrix[i]) != 4:
-                    return False
-            return True
-        else:
-            return False
+class Transform:
+    """An affine transformation, stored as a 4x4 matrix.
 
-    @abstractmethod
-    def _transform(self, matrix: list[list[float]]) -> Self:
-        """Transforms the object by a matrix"""
-        pass
+    Transforms compose like their matrices, so `a @ b` applies `b` first, and a chain
+    of transformations is reduced to a single matrix before being applied. Arrays of
+    points or normals are transformed with one matrix multiply.
+    """
 
-    def transform(self, matrix: list[list[float]]) -> Self:
-        """
-        Returns the object transformed by the given matrix.
-        Note: The matrix must be either a 3x3 or 4x4 matrix.
-        """
-        if not self._check_matrix(matrix):
-            raise ValueError("The given matrix is not a 3x3 or 4x4 matrix.")
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = np.asarray(matrix, dtype=np.float64)
+
+    @classmethod
+    def from_matrix(cls, matrix: Matrix) -> Transform:
+        """A transform from a 3x3 linear or a 4x4 affine matrix."""
+        array = np.identity(4)
+        if len(matrix) == 3:
+            array[:3, :3] = matrix
+        else:
+            array[:] = matrix
+        return cls(array)
 
-        return self._transform(matrix)
+    @classmethod
+    def identity(cls) -> Transform:
+        return cls(np.identity(4))
 
-    def translate(self, vector: src.components.vector.Vector) -> Self:
-        """Returns the object translated by the given vector."""
-        return self.transform(
+    @classmethod
+    def translation(cls, vector: src.components.vector.Vector) -> Transform:
+        return cls.from_matrix(
             [
                 [1, 0, 0, vector.x],
                 [0, 1, 0, vector.y],
@@ -51,9 +48,9 @@ class Transformable:
             ]
         )
 
-    def scale(self, vector: src.components.vector.Vector) -> Self:
-        """Returns the object scaled by the given vector."""
-        return self.transform(
+    @classmethod
+    def scaling(cls, vector: src.components.vector.Vector) -> Transform:
+        return cls.from_matrix(
             [
                 [vector.x, 0, 0, 0],
                 [0, vector.y, 0, 0],
@@ -62,11 +59,11 @@ class Transformable:
             ]
         )
 
-    def reflect(
-        self, point: src.components.point.Point, normal: src.components.vector.Vector
-    ) -> Self:
-        """Returns the object reflected by the given point and normal vector."""
-        return self.transform(
+    @classmethod
+    def reflection(
+        cls, point: src.components.point.Point, normal: src.components.vector.Vector
+    ) -> Transform:
+        return cls.from_matrix(
             [
                 [
                     1 - 2 * normal.x * normal.x,
@@ -90,6 +87,182 @@ class Transformable:
             ]
         )
 
+    @classmethod
+    def rotation(
+        cls,
+        point: src.components.point.Point,
+        vector: src.components.vector.Vector,
+        angle_radians: float,
+    ) -> Transform:
+        """A rotation by an angle around the axis through a point along a vector."""
+        axis = vector.normalized()
+
+        cos_a = math.cos(angle_radians)
+        sin_a = math.sin(angle_radians)
+        ux = axis.x
+        uy = axis.y
+        uz = axis.z
+        rotation = cls.from_matrix(
+            [
+                [
+                    cos_a + ux**2 * (1 - cos_a),
+                    ux * uy * (1 - cos_a) - uz * sin_a,
+                    ux * uz * (1 - cos_a) + uy * sin_a,
+                ],
+                [
+                    uy * ux * (1 - cos_a) + uz * sin_a,
+                    cos_a + uy**2 * (1 - cos_a),
+                    uy * uz * (1 - cos_a) - ux * sin_a,
+                ],
+                [
+                    uz * ux * (1 - cos_a) - uy * sin_a,
+                    uz * uy * (1 - cos_a) + ux * sin_a,
+                    cos_a + uz**2 * (1 - cos_a),
+                ],
+            ]
+        )
+        offset = src.components.vector.Vector(point.x, point.y, point.z)
+        return cls.translation(offset) @ rotation @ cls.translation(-offset)
+
+    def __matmul__(self, other: Transform) -> Transform:
+        return Transform(self.matrix @ other.matrix)
+
+    def then(self, other: Transform) -> Transform:
+        """The transform that applies this one, then `other`."""
+        return other @ self
+
+    def __repr__(self) -> str:
+        return f"Transform({self.matrix.tolist()})"
+
+    def __getstate__(self) -> dict:
+        # Only the matrix is serialized; the rest is derived from it.
+        return {"matrix": self.matrix}
+
+    def __setstate__(self, state: dict) -> None:
+        self.matrix = state["matrix"]
+
+    @cached_property
+    def rows(self) -> Matrix:
+        """The matrix as lists of floats, for transforming single points."""
+        return self.matrix.tolist()
+
+    @cached_property
+    def inverse(self) -> Transform:
+        """The transform that undoes this one.
+
+        Singular transforms, such as scalings by 0, can't be undone; their
+        pseudo-inverse is used instead.
+        """
+        try:
+            return Transform(np.linalg.inv(self.matrix))
+        except np.linalg.LinAlgError:
+            return Transform(np.linalg.pinv(self.matrix))
+
+    @cached_property
+    def normal_matrix(self) -> np.ndarray:
+        """The inverse transpose of the linear part, which normals are transformed by.
+
+        Normals transformed by it stay orthogonal to the surface, even under
+        non-uniform scaling. Singular transforms, which flatten surfaces, have no
+        inverse; their cofactor matrix, which is the inverse transpose up to a scale
+        when there is one, is used instead. It keeps the normals of surfaces that
+        are flattened onto themselves, and zeroes the others.
+        """
+        linear = self.matrix[:3, :3]
+        try:
+            return np.linalg.inv(linear).T
+        except np.linalg.LinAlgError:
+            a, b, c = linear.T
+            return np.column_stack((np.cross(b, c), np.cross(c, a), np.cross(a, b)))
+
+    def apply_to_points(self, points: np.ndarray) -> np.ndarray:
+        """Transform an (..., 3) array of points."""
+        return points @ self.matrix[:3, :3].T + self.matrix[:3, 3]
+
+    def apply_to_normals(self, normals: np.ndarray) -> np.ndarray:
+        """Transform an (..., 3) array of normals. They are not normalized again."""
+        return normals @ self.normal_matrix.T
+
+    @cached_property
+    def _normal_rows(self) -> Matrix:
+        return self.normal_matrix.tolist()
+
+    def apply_to_direction(
+        self, vector: src.components.vector.Vector
+    ) -> src.components.vector.Vector:
+        """Transform a direction, which unlike a point is not translated."""
+        m = self.rows
+        return src.components.vector.Vector(
+            vector.x * m[0][0] + vector.y * m[0][1] + vector.z * m[0][2],
+            vector.x * m[1][0] + vector.y * m[1][1] + vector.z * m[1][2],
+            vector.x * m[2][0] + vector.y * m[2][1] + vector.z * m[2][2],
+        )
+
+    def apply_to_normal(
+        self, normal: src.components.vector.Vector
+    ) -> src.components.vector.Vector:
+        """Transform a normal vector. It is not normalized again."""
+        m = self._normal_rows
+        return src.components.vector.Vector(
+            normal.x * m[0][0] + normal.y * m[0][1] + normal.z * m[0][2],
+            normal.x * m[1][0] + normal.y * m[1][1] + normal.z * m[1][2],
+            normal.x * m[2][0] + normal.y * m[2][1] + normal.z * m[2][2],
+        )
+
+
+class Transformable:
+    """An object that can suffer linear transformations."""
+
+    # Lets subclasses such as vectors and points do without an instance __dict__.
+    __slots__ = ()
+
+    def _check_matrix(self, matrix: Matrix) -> bool:
+        """Checks if the given matrix is a 3x3 or 4x4 matrix"""
+        if len(matrix) == 3:
+            for i in range(3):
+                if len(matrix[i]) != 3:
+                    return False
+            return True
+        elif len(matrix) == 4:
+            for i in range(4):
+                if len(matrix[i]) != 4:
+                    return False
+            return True
+        else:
+            return False
+
+    @abstractmethod
+    def _transform(self, transform: Transform) -> Self:
+        """Transforms the object"""
+        pass
+
+    def transform(self, matrix: Matrix | Transform) -> Self:
+        """
+        Returns the object transformed by the given matrix or transform.
+        Note: The matrix must be either a 3x3 or 4x4 matrix.
+        """
+        if isinstance(matrix, Transform):
+            return self._transform(matrix)
+
+        if not self._check_matrix(matrix):
+            raise ValueError("The given matrix is not a 3x3 or 4x4 matrix.")
+
+        return self._transform(Transform.from_matrix(matrix))
+
+    def translate(self, vector: src.components.vector.Vector) -> Self:
+        """Returns the object translated by the given vector."""
+        return self.transform(Transform.translation(vector))
+
+    def scale(self, vector: src.components.vector.Vector) -> Self:
+        """Returns the object scaled by the given vector."""
+        return self.transform(Transform.scaling(vector))
+
+    def reflect(
+        self, point: src.components.point.Point, normal: src.components.vector.Vector
+    ) -> Self:
+        """Returns the object reflected by the given point and normal vector."""
+        return self.transform(Transform.reflection(point, normal))
+
     def rotate(
         self,
         point: src.components.point.Point,
@@ -110,65 +283,4 @@ class Transformable:
             else:
                 angle_radians = math.radians(angle_degrees)
 
-        axis = vector.normalized()
-
-        cos_a = math.cos(angle_radians)
-        sin_a = math.sin(angle_radians)
-        ux = axis.x
-        uy = axis.y
-        uz = axis.z
-        rot_matrix = [
-            [
-                cos_a + ux**2 * (1 - cos_a),
-                ux * uy * (1 - cos_a) - uz * sin_a,
-                ux * uz * (1 - cos_a) + uy * sin_a,
-                0,
-            ],
-            [
-                uy * ux * (1 - cos_a) + uz * sin_a,
-                cos_a + uy**2 * (1 - cos_a),
-                uy * uz * (1 - cos_a) - ux * sin_a,
-                0,
-            ],
-            [
-                uz * ux * (1 - cos_a) - uy * sin_a,
-                uz * uy * (1 - cos_a) + ux * sin_a,
-                cos_a + uz**2 * (1 - cos_a),
-                0,
-            ],
-            [0, 0, 0, 1],
-        ]
-
-        to_origin_matrix = [
-            [1, 0, 0, -point.x],
-            [0, 1, 0, -point.y],
-            [0, 0, 1, -point.z],
-            [0, 0, 0, 1],
-        ]
-
-        back_from_origin_matrix = [
-            [1, 0, 0, point.x],
-            [0, 1, 0, point.y],
-            [0, 0, 1, point.z],
-            [0, 0, 0, 1],
-        ]
-
-        def matrix_multiply(A, B):
-            m = len(A)
-            n = len(B[0])
-            product = []
-            for i in range(m):
-                row = []
-                for j in range(n):
-                    element = 0
-                    for k in range(len(B)):
-                        element += A[i][k] * B[k][j]
-                    row.append(element)
-                product.append(row)
-            return product
-
-        final_matrix = matrix_multiply(
-            back_from_origin_matrix, matrix_multiply(rot_matrix, to_origin_matrix)
-        )
-
-        return self.transform(final_matrix)
+        return self.transform(Transform.rotation(point, vector, angle_radians))
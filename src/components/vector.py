@@ -4,12 +4,14 @@ import math
 from typing import Any, Self, Type, TypeVar, Union
 
 import src.components
-from src.components.transformations import Transformable
+from src.components.transformations import Transform, Transformable
 
 
 class Vector(Transformable):
     """A 3D vector"""
 
+    __slots__ = ("x", "y", "z")
+
     U = TypeVar("U", "Vector", "src.components.Color", "src.components.point.Point")
 
     def __init__(self, x: float, y: float, z: float):
@@ -33,17 +35,13 @@ class Vector(Transformable):
         return self.x == other.x and self.y == other.y and self.z == other.z
 
     def __add__(self, other: U) -> U:
-        if isinstance(other, src.components.Point):
-            return other + self
-
-        if isinstance(other, src.components.Color):
-            if isinstance(self, src.components.Color):
-                return self.__class__(
-                    self.r + other.r, self.g + other.g, self.b + other.b
-                )
-            raise TypeError("Cannot add a color to a vector")
+        if other.__class__ is Vector:
+            return self.__class__(self.x + other.x, self.y + other.y, self.z + other.z)
+        # Points and colors decide what adding them to a vector gives.
+        return other._add_to_vector(self)
 
-        return self.__class__(self.x + other.x, self.y + other.y, self.z + other.z)
+    def _add_to_vector(self, vector: Vector) -> Vector:
+        return vector.__class__(vector.x + self.x, vector.y + self.y, vector.z + self.z)
 
     def __sub__(self, other: Self | "src.components.point.Point") -> Self:
         return self.__class__(self.x - other.x, self.y - other.y, self.z - other.z)
@@ -53,8 +51,7 @@ class Vector(Transformable):
             return self.__class__(self.x * other.x, self.y * other.y, self.z * other.z)
         return self.__class__(self.x * other, self.y * other, self.z * other)
 
-    def __rmul__(self, other: float) -> Self:
-        return self.__mul__(other)
+    __rmul__ = __mul__
 
     def __neg__(self) -> Self:
         return self.__class__(-self.x, -self.y, -self.z)
@@ -67,9 +64,8 @@ class Vector(Transformable):
                 self.z / (other.z or 1),
             )
         else:
-            return self.__class__(
-                self.x / (other or 1), self.y / (other or 1), self.z / (other or 1)
-            )
+            other = other or 1
+            return self.__class__(self.x / other, self.y / other, self.z / other)
 
     def __pow__(self, power: int) -> Self:
         return self.__class__(self.x**power, self.y**power, self.z**power)
@@ -79,24 +75,15 @@ class Vector(Transformable):
 
     def norm(self) -> float:
         """Returns the norm of the vector"""
-        return abs(self)
+        return math.sqrt(self.x**2 + self.y**2 + self.z**2)
 
     def normalized(self) -> Self:
         """Returns the normalized vector"""
-        return self / abs(self)
-
-    Matrix = list[list[float]]
+        norm = math.sqrt(self.x**2 + self.y**2 + self.z**2) or 1
+        return self.__class__(self.x / norm, self.y / norm, self.z / norm)
 
-    def _transform_3x3(self, matrix: Matrix) -> Self:
-        """Transforms the vector by a 3x3 matrix"""
-        return self.__class__(
-            self.x * matrix[0][0] + self.y * matrix[0][1] + self.z * matrix[0][2],
-            self.x * matrix[1][0] + self.y * matrix[1][1] + self.z * matrix[1][2],
-            self.x * matrix[2][0] + self.y * matrix[2][1] + self.z * matrix[2][2],
-        )
-
-    def _transform_4x4(self, matrix: Matrix) -> Self:
-        """Transforms the vector by a 4x4 matrix"""
+    def _transform(self, transform: Transform) -> Self:
+        matrix = transform.rows
         return self.__class__(
             self.x * matrix[0][0]
             + self.y * matrix[0][1]
@@ -112,12 +99,6 @@ class Vector(Transformable):
             + matrix[2][3],
         )
 
-    def _transform(self, matrix: Matrix) -> Self:
-        if len(matrix) == 3:
-            return self._transform_3x3(matrix)
-
-        return self._transform_4x4(matrix)
-
     def dot_product(self, other: Self) -> float:
         """Returns the dot product of two vectors"""
         return self.x * other.x + self.y * other.y + self.z * other.z
@@ -133,3 +114,13 @@ class Vector(Transformable):
     def reflect_vec(self, normal: Vector) -> Vector:
         """Returns a reflected vector"""
         return self - 2 * self.dot_product(normal) * normal
+
+
+def dot_product(a: Vector, b: Vector) -> float:
+    """Returns the dot product of two vectors"""
+    return a.x * b.x + a.y * b.y + a.z * b.z
+
+
+def cross_product(a: Vector, b: Vector) -> Vector:
+    """Returns the cross product of two vectors"""
+    return a.cross_product(b)
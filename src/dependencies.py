@@ -0,0 +1,152 @@
+"""Opt-in recording of what the rays of a render depended on.
+
+While `current` is set, which `recording` does for the duration of a block, the
+scalar engine reports every object a ray hit or was blocked by, and the segments
+rays travelled before hitting something, or escaping the scene:
+
+    with recording() as dependencies:
+        color = trace_ray(ray, scene)
+
+Edits to objects that no ray touched, placed away from every segment, can't change
+the colors that were traced, which is how `render_cache` tells which tiles to render
+again. When it is not set, the engine only pays for checking that `current` is None.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from contextlib import contextmanager
+from typing import Iterator
+
+import numpy as np
+
+from src.components.bounding_box import BoundingBox
+from src.components.objects_in_space import Object
+from src.components.point import Point
+from src.components.ray import Ray
+
+# Boxes are grown by this fraction of their largest coordinate before being tested
+# against segments, which are only stored in single precision.
+_MARGIN = 1e-4
+
+
+class RayDependencies:
+    """The objects and the segments of space that a set of rays depended on.
+
+    Attributes:
+        objects: The ids of the objects the rays hit or were blocked by.
+        segments: Seven floats per segment the rays travelled without hitting
+            anything: the start, the vector to the end, and the largest multiple of
+            that vector travelled, which is infinite for rays that escaped the scene.
+    """
+
+    def __init__(self):
+        self.objects: set[int] = set()
+        # Single precision halves the size of a record; `may_be_reached` makes up
+        # for the rounding.
+        self.segments = array("f")
+
+    def record_hit(self, obj: Object, start: Point, end: Point) -> None:
+        """A ray from `start` hit `obj` at `end`."""
+        self.objects.add(id(obj))
+        self.segments.extend(
+            (
+                start.x,
+                start.y,
+                start.z,
+                end.x - start.x,
+                end.y - start.y,
+                end.z - start.z,
+                1,
+            )
+        )
+
+    def record_escape(self, ray: Ray) -> None:
+        """A ray hit nothing."""
+        origin = ray.origin
+        direction = ray.direction
+        self.segments.extend(
+            (
+                origin.x,
+                origin.y,
+                origin.z,
+                direction.x,
+                direction.y,
+                direction.z,
+                math.inf,
+            )
+        )
+
+    def record_shadow(
+        self, start: Point, end: Point, blocker: Object | None = None
+    ) -> None:
+        """A shadow ray from `start` to the light at `end` was blocked, or not."""
+        if blocker is not None:
+            # Adding objects can't light up a point in shadow, only removing the
+            # blocker can.
+            self.objects.add(id(blocker))
+        else:
+            self.segments.extend(
+                (
+                    start.x,
+                    start.y,
+                    start.z,
+                    end.x - start.x,
+                    end.y - start.y,
+                    end.z - start.z,
+                    1,
+                )
+            )
+
+    def may_be_reached(self, box: BoundingBox | None) -> bool:
+        """Whether a segment the rays travelled may cross `box` (None if unbounded)."""
+        if box is None:
+            return True
+        if not self.segments:
+            return False
+
+        segments = np.frombuffer(self.segments, dtype=np.float32).reshape(-1, 7)
+        segments = segments.astype(np.float64)
+        starts, vectors, lengths = segments[:, :3], segments[:, 3:6], segments[:, 6]
+        bounds = np.array(box.as_tuple())
+        margin = _MARGIN * (1 + np.abs(bounds).max())
+        low = bounds[:3] - margin
+        high = bounds[3:] + margin
+
+        # The slab test of `Hierarchy`, for every segment at once.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t0 = (low - starts) / vectors
+            t1 = (high - starts) / vectors
+        parallel = vectors == 0
+        inside = (starts >= low) & (starts <= high)
+        t_near = np.where(
+            parallel, np.where(inside, -np.inf, np.inf), np.minimum(t0, t1)
+        )
+        t_far = np.where(
+            parallel, np.where(inside, np.inf, -np.inf), np.maximum(t0, t1)
+        )
+
+        enter = np.maximum(t_near.max(axis=1), 0)
+        leave = np.minimum(t_far.min(axis=1), lengths)
+        return bool((enter <= leave).any())
+
+
+# The dependencies being recorded, if any.
+current: RayDependencies | None = None
+
+
+@contextmanager
+def recording(
+    dependencies: RayDependencies | None = None,
+) -> Iterator[RayDependencies]:
+    """Record into `dependencies` (new ones by default) in this block."""
+    global current
+    if dependencies is None:
+        dependencies = RayDependencies()
+    previous = current
+    current = dependencies
+    try:
+        yield dependencies
+    finally:
+        current = previous
@@ -0,0 +1,48 @@
+"""Heatmaps of how much each pixel of a render cost."""
+
+import numpy as np
+
+from src.components.image import Image
+
+# What the cost of a pixel is measured in: intersection tests, or seconds.
+TESTS = "tests"
+TIME = "time"
+METRICS = (TESTS, TIME)
+
+# Costs at or above this percentile of the image map to the hottest color, so that a
+# handful of pathological pixels don't wash out the rest of the map.
+SATURATION_PERCENTILE = 99
+
+# Color ramp from cheap to expensive: black, blue, red, yellow, white.
+_RAMP_STOPS = np.array([0, 0.25, 0.5, 0.75, 1])
+_RAMP_COLORS = np.array(
+    [
+        [0, 0, 0],
+        [0, 0, 255],
+        [255, 0, 0],
+        [255, 255, 0],
+        [255, 255, 255],
+    ],
+    dtype=np.float64,
+)
+
+
+def saturation_cost(costs: np.ndarray) -> float:
+    """The cost that maps to the hottest color of the heatmap of `costs`."""
+    if not costs.size:
+        return 0.0
+    cost = float(np.percentile(costs, SATURATION_PERCENTILE))
+    return cost if cost > 0 else float(costs.max())
+
+
+def heatmap_image(costs: np.ndarray) -> Image:
+    """Map a (height, width) array of per-pixel costs to an image."""
+    height, width = costs.shape
+    saturation = saturation_cost(costs)
+    levels = np.clip(costs / saturation, 0, 1) if saturation > 0 else costs * 0
+
+    pixels = np.stack(
+        [np.interp(levels, _RAMP_STOPS, channel) for channel in _RAMP_COLORS.T],
+        axis=-1,
+    )
+    return Image(height, width, pixels)
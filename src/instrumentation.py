@@ -0,0 +1,124 @@
+"""Opt-in statistics about where render time goes.
+
+The engines only record anything while `current` is set, which `collecting` does
+for the duration of a block:
+
+    with collecting() as stats:
+        render_scene(scene)
+    print(stats.as_dict())
+
+When it is not set, instrumented code only pays for checking that `current` is
+None, so the hooks can stay in production renders.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# Kinds of rays, as counted by `RenderStats.count_ray`.
+CAMERA = "camera"
+REFLECTION = "reflection"
+REFRACTION = "refraction"
+INTERNAL_REFLECTION = "internal_reflection"
+SHADOW = "shadow"
+SECONDARY_KINDS = (REFLECTION, REFRACTION, INTERNAL_REFLECTION)
+
+# Kinds of scene queries, as counted by `RenderStats.count_query`.
+NEAREST = "nearest"
+OCCLUSION = "occlusion"
+
+# Phases, as timed by `RenderStats.add_time`. Times are exclusive: shading does not
+# include the shadow tests it makes.
+INTERSECTION = "intersection"
+SHADOWS = "shadows"
+SHADING = "shading"
+
+
+class RenderStats:
+    """Counters and timers filled in by the engines while a render is instrumented.
+
+    Args:
+        timing: Whether to time the phases of the render. Timing costs a clock read
+            per call, so it can be turned off when only the counts are needed.
+    """
+
+    def __init__(self, timing: bool = True):
+        self.timing = timing
+        self.rays: Counter[tuple[str, int]] = Counter()  # (kind, depth) -> rays
+        self.intersection_tests: Counter[str] = Counter()  # Primitive type -> tests
+        self.queries: Counter[tuple[str, bool]] = Counter()  # (kind, hit) -> queries
+        self.phase_times: Counter[str] = Counter()  # Phase -> seconds
+
+    def count_ray(self, kind: str, depth: int, count: int = 1) -> None:
+        self.rays[kind, depth] += count
+
+    def count_tests(self, primitive_type: str, count: int = 1) -> None:
+        self.intersection_tests[primitive_type] += count
+
+    def count_query(self, kind: str, hit: bool, count: int = 1) -> None:
+        self.queries[kind, hit] += count
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self.phase_times[phase] += seconds
+
+    def merge(self, other: RenderStats) -> None:
+        """Add the statistics of another render, e.g. of a pool worker."""
+        self.rays.update(other.rays)
+        self.intersection_tests.update(other.intersection_tests)
+        self.queries.update(other.queries)
+        self.phase_times.update(other.phase_times)
+
+    def total_tests(self) -> int:
+        return sum(self.intersection_tests.values())
+
+    def rays_of_kind(self, *kinds: str) -> int:
+        return sum(count for (kind, _), count in self.rays.items() if kind in kinds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """A JSON-serializable summary of the statistics."""
+        rays_by_depth: dict[str, dict[int, int]] = {}
+        for (kind, depth), count in sorted(self.rays.items()):
+            rays_by_depth.setdefault(kind, {})[depth] = count
+
+        queries = {}
+        for kind in sorted({kind for kind, _ in self.queries}):
+            hits = self.queries[kind, True]
+            misses = self.queries[kind, False]
+            queries[kind] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else None,
+            }
+
+        return {
+            "rays": {
+                CAMERA: self.rays_of_kind(CAMERA),
+                "secondary": self.rays_of_kind(*SECONDARY_KINDS),
+                SHADOW: self.rays_of_kind(SHADOW),
+                "total": sum(self.rays.values()),
+            },
+            "rays_by_depth": rays_by_depth,
+            "intersection_tests": dict(sorted(self.intersection_tests.items())),
+            "queries": queries,
+            "phase_times": dict(sorted(self.phase_times.items())),
+        }
+
+
+# The statistics being collected, if any.
+current: RenderStats | None = None
+
+
+@contextmanager
+def collecting(stats: RenderStats | None = None) -> Iterator[RenderStats]:
+    """Collect statistics into `stats` (a new RenderStats by default) in this block."""
+    global current
+    if stats is None:
+        stats = RenderStats()
+    previous = current
+    current = stats
+    try:
+        yield stats
+    finally:
+        current = previous
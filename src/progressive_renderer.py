@@ -0,0 +1,102 @@
+"""Progressive rendering, for interactive viewers.
+
+A frame is rendered in passes of increasing resolution: the first pass is cheap, so
+the viewer can show something right after the camera moves, and every later pass
+refines the picture until it is at full resolution. Once it is, nothing is rendered
+until the camera changes again.
+"""
+
+import dataclasses
+
+import numpy as np
+
+from src.components.camera import Camera
+from src.components.image import rgb_to_bytes
+from src.components.scene import Scene
+from src.scene_preparation import prepare
+from src.vectorized_engine import render_tile
+
+# Each pass divides the resolution by one of these factors, from coarse to fine.
+PREVIEW_SCALES = (8, 4, 2, 1)
+# Passes are rendered in bands of about this many rays, so that a viewer can handle
+# its input between bands and start over quickly when the camera moves.
+PIXELS_PER_STEP = 1 << 12
+
+
+class ProgressiveRenderer:
+    """Renders the frames of a scene whose camera can move, in passes.
+
+    Every call to `step` renders a band of the current pass into `frame`, on top of
+    the coarser passes. Passes are rendered in-process by the batched engine, and the
+    scene is prepared once, since only the camera changes between frames.
+    """
+
+    def __init__(
+        self,
+        scene: Scene,
+        scales: tuple[int, ...] = PREVIEW_SCALES,
+        pixels_per_step: int = PIXELS_PER_STEP,
+    ):
+        self.scene = prepare(scene, vectorized=True)
+        self.scales = scales
+        self.pixels_per_step = pixels_per_step
+        self.frame = np.zeros(
+            (scene.camera.vertical_resolution, scene.camera.horizontal_resolution, 3),
+            dtype=np.uint8,
+        )
+        self._pass = 0
+        self._row = 0
+
+    @property
+    def camera(self) -> Camera:
+        return self.scene.camera
+
+    @camera.setter
+    def camera(self, camera: Camera) -> None:
+        self.scene.camera = camera
+        self.invalidate()
+
+    @property
+    def done(self) -> bool:
+        """Whether the frame has been rendered at full resolution."""
+        return self._pass == len(self.scales)
+
+    def invalidate(self) -> None:
+        """Start rendering the frame again from the coarsest pass."""
+        self._pass = 0
+        self._row = 0
+
+    def step(self) -> bool:
+        """Render the next band of the current pass into `frame`.
+
+        Returns:
+            Whether `frame` changed, which is only False when it was already done.
+        """
+        if self.done:
+            return False
+
+        scale = self.scales[self._pass]
+        preview = self.scene.camera.scaled(scale)
+        rows = max(1, self.pixels_per_step // preview.horizontal_resolution)
+        y_start = self._row
+        y_end = min(y_start + rows, preview.vertical_resolution)
+
+        colors = render_tile(
+            dataclasses.replace(self.scene, camera=preview),
+            0,
+            y_start,
+            preview.horizontal_resolution,
+            y_end,
+            arrays=self.scene.arrays,
+        )
+        # Every preview pixel covers a scale x scale block of the frame.
+        band = rgb_to_bytes(colors).repeat(scale, axis=0).repeat(scale, axis=1)
+        target = self.frame[y_start * scale : y_end * scale]
+        target[...] = band[: len(target), : self.frame.shape[1]]
+
+        if y_end == preview.vertical_resolution:
+            self._pass += 1
+            self._row = 0
+        else:
+            self._row = y_end
+        return True
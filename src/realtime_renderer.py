@@ -1,11 +1,11 @@
 from argparse import ArgumentParser
 from pathlib import Path
 
-import jsonpickle
 import pygame as pg
 
 from src.components.scene import Scene
-from src.rendering_engine import render_scene
+from src.progressive_renderer import ProgressiveRenderer
+from src.scene_file import load_scene
 
 
 def main():
@@ -15,14 +15,16 @@ def main():
 
     args = ap.parse_args()
 
-    with open(args.scene, "r") as f:
-        scene: Scene = jsonpickle.decode(f.read())
+    scene: Scene = load_scene(args.scene)
+
+    renderer = ProgressiveRenderer(scene)
 
     pg.init()
     screen = pg.display.set_mode(
         (scene.camera.horizontal_resolution, scene.camera.vertical_resolution)
     )
     pg.display.set_caption("Ray Tracer")
+    clock = pg.time.Clock()
 
     exit_render = False
     while not exit_render:
@@ -30,35 +32,37 @@ def main():
             match event.type:
                 case pg.QUIT:
                     exit_render = True
-                    pg.quit()
 
                 case pg.KEYDOWN:
                     match event.key:
                         case pg.K_ESCAPE:
                             exit_render = True
-                            pg.quit()
 
                         case pg.K_w:
-                            scene.camera = scene.camera.move_relative(0, 0, 1)
+                            renderer.camera = renderer.camera.move_relative(0, 0, 1)
                         case pg.K_s:
-                            scene.camera = scene.camera.move_relative(0, 0, -1)
+                            renderer.camera = renderer.camera.move_relative(0, 0, -1)
                         case pg.K_a:
-                            scene.camera = scene.camera.move_relative(-1, 0, 0)
+                            renderer.camera = renderer.camera.move_relative(-1, 0, 0)
                         case pg.K_d:
-                            scene.camera = scene.camera.move_relative(1, 0, 0)
+                            renderer.camera = renderer.camera.move_relative(1, 0, 0)
                         case pg.K_UP:
-                            scene.camera = scene.camera.move_relative(0, 1, 0)
+                            renderer.camera = renderer.camera.move_relative(0, 1, 0)
                         case pg.K_DOWN:
-                            scene.camera = scene.camera.move_relative(0, -1, 0)
+                            renderer.camera = renderer.camera.move_relative(0, -1, 0)
 
-        img = render_scene(scene=scene, multithread=True)
-        px_array = pg.PixelArray(screen)
+        if exit_render:
+            break
 
-        for x in range(scene.camera.horizontal_resolution):
-            for y in range(scene.camera.vertical_resolution):
-                px_array[x, y] = img.get_pixel(x, y).as_rgb()
+        if renderer.step():
+            # Surfaces are indexed (x, y), the frame (y, x).
+            pg.surfarray.blit_array(screen, renderer.frame.swapaxes(0, 1))
+            pg.display.update()
+        else:
+            # The frame is done: wait for input without spinning.
+            clock.tick(60)
 
-        pg.display.update()
+    pg.quit()
 
 
 if __name__ == "__main__":
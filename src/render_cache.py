@@ -0,0 +1,312 @@
+"""Caching renders on disk, by the content of the scene.
+
+Scenes are identified by a hash of their content, not of their file: every object,
+light, setting and render option is hashed the way it would be pickled, so a scene
+decoded again from the same JSON, or saved in another format, has the same key.
+
+Two kinds of entries are kept in the cache directory:
+
+- Finished images, by the key of the whole scene. Rendering a scene that was
+  rendered before only writes the image file.
+- Tiles, by the key of everything but the objects (the camera, lights, settings and
+  options). Along with every tile, the objects its rays hit or were blocked by, and
+  the segments they travelled, are recorded (see `dependencies`). When the
+  objects change, only the tiles that touched an object that is gone, or that may
+  reach one that is new, are rendered again. Tiles are only recorded by the scalar
+  engine.
+
+Entries are files whose modification time is updated when they are used; when the
+cache grows over its size, the least recently used ones are deleted.
+
+Without a cache, `render_scene_to_file_incremental` keeps the tiles of the last
+render to an image next to it, so that rendering a scene again after editing some
+of its objects only renders the tiles the edit may change.
+"""
+
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+import numpy as np
+
+from src.components.image import open_image_writer, rgb_to_bytes
+from src.components.scene import Scene
+from src.dependencies import RayDependencies
+from src.rendering_engine import (
+    DEFAULT_TILE_SIZE,
+    RenderPool,
+    Tile,
+    _render_tile_recording,
+    split_into_tiles,
+)
+
+# Part of every key, so that entries of older versions of the cache are not used.
+CACHE_VERSION = 1
+DEFAULT_MAX_SIZE = 512 * 2**20
+
+IMAGE = "image"
+TILES = "tiles"
+
+# Added to the name of an image to get that of the tiles of incremental renders.
+SIDECAR_SUFFIX = ".tiles"
+
+
+def _update(digest, value) -> None:
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, (np.ndarray, np.generic)):
+        value = np.ascontiguousarray(value)
+        digest.update(f"ndarray:{value.dtype.str}:{value.shape};".encode())
+        digest.update(value.tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}:{len(value)};".encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)};".encode())
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+    else:
+        cls = type(value)
+        digest.update(f"{cls.__module__}.{cls.__qualname__};".encode())
+        # Derived data (caches, acceleration structures) is left out of the state.
+        _update(digest, value.__getstate__())
+
+
+def content_hash(*values) -> str:
+    """A stable hash of the content of values, such as objects of a scene."""
+    digest = hashlib.blake2b(digest_size=16)
+    _update(digest, values)
+    return digest.hexdigest()
+
+
+def frame_key(scene: Scene, **options) -> str:
+    """The key of everything that makes a render but the objects of the scene."""
+    values = {
+        field.name: getattr(scene, field.name)
+        for field in fields(scene)
+        if field.name != "objects"
+    }
+    return content_hash(CACHE_VERSION, values, options)
+
+
+@dataclass
+class TileRecord:
+    """The tiles of a render, and what their rays depended on.
+
+    Attributes:
+        frame: The `frame_key` of the render.
+        object_keys: The `content_hash` of every object of the scene rendered.
+        pixels: The image, as a (height, width, 3) array of bytes.
+        objects: The keys of the objects the rays of every tile touched.
+        dependencies: The rest of what the rays of every tile depended on.
+    """
+
+    frame: str
+    object_keys: list[str]
+    pixels: np.ndarray
+    objects: dict[Tile, frozenset[str]]
+    dependencies: dict[Tile, RayDependencies]
+
+    def dirty_tiles(self, scene: Scene, object_keys: list[str]) -> list[Tile]:
+        """The tiles that may look different with the objects of `scene`."""
+        previous = set(self.object_keys)
+        removed = previous - set(object_keys)
+        added = [
+            obj.get_bounding_box()
+            for obj, key in zip(scene.objects, object_keys)
+            if key not in previous
+        ]
+
+        dirty = []
+        for tile, dependencies in self.dependencies.items():
+            if self.objects[tile] & removed or any(
+                dependencies.may_be_reached(box) for box in added
+            ):
+                dirty.append(tile)
+        return dirty
+
+
+def _load(path: Path) -> object | None:
+    """Unpickle a file, or return None if it is missing."""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (EOFError, pickle.UnpicklingError):
+        # A partly written or corrupt file is as good as none.
+        path.unlink(missing_ok=True)
+        return None
+
+
+def _store(path: Path, value: object) -> None:
+    """Pickle to a file, which is replaced at once so it is never partly written."""
+    partial = path.with_name(path.name + ".partial")
+    with open(partial, "wb") as f:
+        pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(partial, path)
+
+
+class RenderCache:
+    """Images and tiles of renders, in a directory of at most `max_size` bytes."""
+
+    def __init__(self, directory: str | Path, max_size: int = DEFAULT_MAX_SIZE):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.directory / f"{key}.{kind}"
+
+    def load(self, kind: str, key: str) -> object | None:
+        """The entry of a kind with a key, or None if it is not in the cache."""
+        path = self._path(kind, key)
+        value = _load(path)
+        if value is not None:
+            # Mark it as recently used.
+            os.utime(path)
+        return value
+
+    def store(self, kind: str, key: str, value: object) -> None:
+        """Add an entry, and evict the least recently used ones if needed."""
+        _store(self._path(kind, key), value)
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until the cache fits its size."""
+        entries = []
+        for path in self.directory.glob("*.*"):
+            if path.suffix[1:] in (IMAGE, TILES):
+                stat = path.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries, key=lambda entry: entry[0]):
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+
+def render_tiles_again(
+    scene: Scene,
+    record: TileRecord | None,
+    frame: str,
+    object_keys: list[str],
+    workers: int | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    max_samples: int = 1,
+) -> tuple[TileRecord, int]:
+    """Render the tiles of a record that the objects of a scene may change.
+
+    Every tile is rendered if there's no record, or if it is of another frame. The
+    record is updated with the scene, whose `frame_key` and object keys are given,
+    and returned with the number of tiles rendered, on the scalar engine.
+    """
+    width = scene.camera.horizontal_resolution
+    height = scene.camera.vertical_resolution
+    if record is None or record.frame != frame:
+        pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        record = TileRecord(frame, object_keys, pixels, {}, {})
+        dirty = split_into_tiles(width, height, tile_size)
+    else:
+        dirty = record.dirty_tiles(scene, object_keys)
+
+    if dirty:
+        with RenderPool(workers, max_samples=max_samples) as pool:
+            tiles = pool.render_tiles(scene, _render_tile_recording, dirty)
+            for tile, (rgb, dependencies) in tiles:
+                x_start, y_start, x_end, y_end = tile
+                record.pixels[y_start:y_end, x_start:x_end] = rgb
+                # Objects are recorded by index, which only holds for this scene.
+                record.objects[tile] = frozenset(
+                    object_keys[index] for index in dependencies.objects
+                )
+                dependencies.objects.clear()
+                record.dependencies[tile] = dependencies
+
+    record.object_keys = object_keys
+    return record, len(dirty)
+
+
+def render_scene_to_file_cached(
+    scene: Scene,
+    filename: str | Path,
+    cache: RenderCache,
+    workers: int | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    vectorized: bool = False,
+    max_samples: int = 1,
+) -> int:
+    """Render a scene to a file as `render_scene_to_file` does, through a cache.
+
+    Returns the number of tiles that were rendered: none if the image was cached.
+    """
+    width = scene.camera.horizontal_resolution
+    height = scene.camera.vertical_resolution
+    frame = frame_key(
+        scene, vectorized=vectorized, max_samples=max_samples, tile_size=tile_size
+    )
+    object_keys = [content_hash(obj) for obj in scene.objects]
+    key = content_hash(frame, object_keys)
+
+    pixels = cache.load(IMAGE, key)
+    rendered = 0
+    if pixels is None and vectorized:
+        with RenderPool(workers, vectorized, max_samples) as pool:
+            pixels = rgb_to_bytes(pool.render(scene, tile_size).pixels)
+        rendered = len(split_into_tiles(width, height, tile_size))
+        cache.store(IMAGE, key, pixels)
+    elif pixels is None:
+        record, rendered = render_tiles_again(
+            scene,
+            cache.load(TILES, frame),
+            frame,
+            object_keys,
+            workers,
+            tile_size,
+            max_samples,
+        )
+        pixels = record.pixels
+        cache.store(TILES, frame, record)
+        cache.store(IMAGE, key, pixels)
+
+    with open_image_writer(filename, width, height) as writer:
+        writer.write_rows(pixels)
+    return rendered
+
+
+def render_scene_to_file_incremental(
+    scene: Scene,
+    filename: str | Path,
+    workers: int | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    max_samples: int = 1,
+) -> int:
+    """Render a scene to a file, only rendering the tiles changed since the last time.
+
+    The tiles of the last render to the file, and what their rays touched, are kept
+    next to it, in a file named after it with `SIDECAR_SUFFIX`. If the camera,
+    lights, settings and options are the same, only the tiles that an edit of the
+    objects may change are rendered; otherwise, every tile is. Returns the number
+    of tiles rendered, on the scalar engine.
+    """
+    sidecar = Path(f"{filename}{SIDECAR_SUFFIX}")
+    frame = frame_key(
+        scene, vectorized=False, max_samples=max_samples, tile_size=tile_size
+    )
+    object_keys = [content_hash(obj) for obj in scene.objects]
+    record, rendered = render_tiles_again(
+        scene, _load(sidecar), frame, object_keys, workers, tile_size, max_samples
+    )
+
+    width = scene.camera.horizontal_resolution
+    height = scene.camera.vertical_resolution
+    with open_image_writer(filename, width, height) as writer:
+        writer.write_rows(record.pixels)
+    _store(sidecar, record)
+    return rendered
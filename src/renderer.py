@@ -1,24 +1,147 @@
 from argparse import ArgumentParser
 from pathlib import Path
 
-import jsonpickle
-
-from src.rendering_engine import render_scene
+from src.heatmap import METRICS, TESTS
+from src.render_cache import (
+    DEFAULT_MAX_SIZE,
+    RenderCache,
+    render_scene_to_file_cached,
+    render_scene_to_file_incremental,
+)
+from src.rendering_engine import DEFAULT_TILE_SIZE, render_scene_to_file
+from src.scene_file import load_scene
 
 
 def main():
     ap = ArgumentParser()
 
     ap.add_argument("scene", help="The scene file", type=Path)
-    ap.add_argument("destination", help="The destination of the image file", type=Path)
+    ap.add_argument(
+        "destination",
+        help="The destination of the image file (PNG if it ends with .png, else PPM)",
+        type=Path,
+    )
+    ap.add_argument(
+        "--vectorized",
+        help="Render with the batched NumPy engine",
+        action="store_true",
+    )
+    ap.add_argument(
+        "-w",
+        "--workers",
+        help="Number of worker processes (default: number of CPUs)",
+        type=int,
+        default=None,
+    )
+    ap.add_argument(
+        "-t",
+        "--tile-size",
+        help="Side of the square tiles rendered by each worker task",
+        type=int,
+        default=DEFAULT_TILE_SIZE,
+    )
+
+    ap.add_argument(
+        "-s",
+        "--samples",
+        help="Maximum number of samples per pixel; above 1, edges are anti-aliased",
+        type=int,
+        default=1,
+    )
+    ap.add_argument(
+        "--max-depth",
+        help="Override the number of bounces reflected and transmitted rays may take",
+        type=int,
+    )
+    ap.add_argument(
+        "--min-weight",
+        help="Override the weight below which secondary rays are not traced",
+        type=float,
+    )
+
+    ap.add_argument(
+        "--cache",
+        help="Directory of a cache of renders; identical scenes are not rendered again, "
+        "and only the tiles an edit may change are",
+        type=Path,
+    )
+    ap.add_argument(
+        "--cache-size",
+        help="Size of the cache in megabytes; the least recently used renders are "
+        "evicted beyond it",
+        type=int,
+        default=DEFAULT_MAX_SIZE // 2**20,
+    )
+
+    ap.add_argument(
+        "--incremental",
+        help="Keep the tiles of the render next to the image, so that rendering to it "
+        "again after editing objects only renders the tiles the edit may change",
+        action="store_true",
+    )
+
+    ap.add_argument(
+        "--heatmap",
+        help="Also write a heatmap of the cost of every pixel to this image file",
+        type=Path,
+    )
+    ap.add_argument(
+        "--heatmap-metric",
+        help="What the heatmap shows: intersection tests or render time per pixel",
+        choices=METRICS,
+        default=TESTS,
+    )
 
     args = ap.parse_args()
 
-    with open(args.scene, "r") as f:
-        scene = jsonpickle.decode(f.read())
+    if args.heatmap and args.vectorized:
+        ap.error("--heatmap is measured on the scalar engine; drop --vectorized")
+    if args.heatmap and args.samples > 1:
+        ap.error("--heatmap is measured without anti-aliasing; drop --samples")
+    if args.heatmap and (args.cache or args.incremental):
+        ap.error("--heatmap renders are not cached; drop --cache and --incremental")
+    if args.incremental and args.vectorized:
+        ap.error("--incremental renders are recorded on the scalar engine")
+    if args.incremental and args.cache:
+        ap.error("--incremental renders don't go through the cache; drop --cache")
+
+    scene = load_scene(args.scene)
+    if args.max_depth is not None:
+        scene.max_depth = args.max_depth
+    if args.min_weight is not None:
+        scene.min_weight = args.min_weight
+
+    if args.incremental:
+        render_scene_to_file_incremental(
+            scene=scene,
+            filename=args.destination.absolute(),
+            workers=args.workers,
+            tile_size=args.tile_size,
+            max_samples=args.samples,
+        )
+        return
+    if args.cache:
+        render_scene_to_file_cached(
+            scene=scene,
+            filename=args.destination.absolute(),
+            cache=RenderCache(args.cache, args.cache_size * 2**20),
+            workers=args.workers,
+            tile_size=args.tile_size,
+            vectorized=args.vectorized,
+            max_samples=args.samples,
+        )
+        return
 
-    img = render_scene(scene=scene, multithread=True)
-    img.write_ppm(args.destination.absolute())
+    render_scene_to_file(
+        scene=scene,
+        filename=args.destination.absolute(),
+        workers=args.workers,
+        tile_size=args.tile_size,
+        vectorized=args.vectorized,
+        max_samples=args.samples,
+        heatmap=args.heatmap,
+        heatmap_metric=args.heatmap_metric,
+    )
 
 
 if __name__ == "__main__":
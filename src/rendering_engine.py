@@ -1,44 +1,91 @@
+import os
+import pickle
+from contextlib import nullcontext
+from functools import partial
 from math import sqrt
 from multiprocessing import Pool
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, Iterator, TypeVar
 
+import numpy as np
+
+from src import dependencies, instrumentation
+from src.antialiasing import render_antialiased
+from src.components.camera import Camera
 from src.components.color import Color
-from src.components.image import Image
+from src.components.image import (
+    Image,
+    colors_to_array,
+    open_image_writer,
+    rgb_to_bytes,
+)
 from src.components.objects_in_space import Object
 from src.components.point import Point
 from src.components.ray import Ray
 from src.components.scene import Scene
 from src.components.vector import Vector
+from src.dependencies import RayDependencies
+from src.heatmap import TESTS, TIME, heatmap_image
+from src.instrumentation import RenderStats, collecting
+from src.scene_preparation import PreparedScene, prepare
+from src.vectorized_engine import SceneArrays, render_scene_vectorized, render_tile
+
+# Channels of a `Color` are clamped to this value.
+MAX_COLOR = 255
 
 
 def find_nearest_intersection(
     scene: Scene, ray: Ray
 ) -> tuple[Point, Vector, Object] | tuple[None, None, None]:
     """Return the nearest intersection point, normal and object."""
-    closest_obj = None
-    closest_obj_distance = float("inf")
-    closest_obj_normal = None
+    stats = instrumentation.current
+    if stats is not None and stats.timing:
+        start = perf_counter()
 
-    for obj in scene.objects:
-        intersection_ditance, normal_at_position = obj.find_intersection(ray)
+    closest_obj_distance, closest_obj_normal, closest_obj = scene.bvh.find_nearest(ray)
 
-        if (
-            intersection_ditance is not None
-            and intersection_ditance < closest_obj_distance
-        ):
-            closest_obj = obj
-            closest_obj_distance = intersection_ditance
-            closest_obj_normal = normal_at_position
+    if stats is not None:
+        if stats.timing:
+            stats.add_time(instrumentation.INTERSECTION, perf_counter() - start)
+        stats.count_query(instrumentation.NEAREST, closest_obj is not None)
 
     if closest_obj is None or closest_obj_normal is None:
         return None, None, None
 
     return (
-        ray.origin + ray.direction * closest_obj_distance,
+        ray.origin.along(ray.direction, closest_obj_distance),
         closest_obj_normal,
         closest_obj,
     )
 
 
+def is_occluded(
+    scene: Scene, ray: Ray, max_distance: float, ignore: Object | None = None
+) -> bool:
+    """Return whether an object other than `ignore` blocks the ray before max_distance.
+
+    Unlike `find_nearest_intersection`, the search stops at the first blocking hit.
+    """
+    stats = instrumentation.current
+    recorded = dependencies.current
+    if stats is None and recorded is None:
+        return scene.bvh.find_any(ray, max_distance, ignore) is not None
+
+    if stats is not None and stats.timing:
+        start = perf_counter()
+    blocker = scene.bvh.find_any(ray, max_distance, ignore)
+    if stats is not None:
+        if stats.timing:
+            stats.add_time(instrumentation.SHADOWS, perf_counter() - start)
+        stats.count_query(instrumentation.OCCLUSION, blocker is not None)
+    if recorded is not None:
+        end = ray.origin.along(ray.direction, max_distance)
+        recorded.record_shadow(ray.origin, end, blocker)
+    return blocker is not None
+
+
 def color_at(
     object_hit: Object,
     hit_position: Point,
@@ -47,39 +94,68 @@ def color_at(
     spectator_position: Point | None = None,
 ) -> Color:
     """Return the color at the given hit position, according to Phong shading."""
+    stats = instrumentation.current
+    if stats is not None and stats.timing:
+        start = perf_counter()
+        shadows_time = stats.phase_times[instrumentation.SHADOWS]
+
     spectator_position = (
         spectator_position if spectator_position else scene.camera.position
     )
 
-    # Ambient
-    color = object_hit.material.get_ambient_component(scene_color=scene.ambient_color)
-    for light in scene.lights:
-        light_ray = Ray(hit_position, light.position - hit_position)
-        _, _, obj = find_nearest_intersection(scene, light_ray)
+    material = object_hit.material
+    to_spectator = (spectator_position - hit_position).normalized()
 
-        if obj is not None and obj != object_hit:
+    # Ambient
+    color = material.get_ambient_component(scene_color=scene.ambient_color)
+    for light, light_colors in zip(scene.lights, scene.get_light_colors(material)):
+        to_light = light.position - hit_position
+        light_distance = to_light.norm()
+        # The direction to the light is shared by the shadow ray and the shading.
+        to_light = to_light / light_distance
+        light_ray = Ray.from_normalized(hit_position, to_light)
+
+        # Only objects between the hit and the light can cast a shadow on it.
+        if is_occluded(scene, light_ray, light_distance, ignore=object_hit):
             continue
 
-        # Diffuse
-        color += object_hit.material.get_diffuse_component(
-            light=light,
-            hit_position=hit_position,
-            normal_at_position=normal_at_position,
+        # Diffuse and specular
+        diffuse, specular = material.get_light_components(
+            light_colors, normal_at_position, to_light, to_spectator
         )
+        color += diffuse
+        color += specular
 
-        # Specular
-        color += object_hit.material.get_specular_component(
-            light=light,
-            hit_position=hit_position,
-            normal_at_position=normal_at_position,
-            spectator_position=spectator_position,  # TODO: When reccursive ray-tracing is implemented, the spectator will change.
-        )
+    color = color * material.color
+
+    if stats is not None and stats.timing:
+        # Shadow tests are timed on their own.
+        shadows_time = stats.phase_times[instrumentation.SHADOWS] - shadows_time
+        stats.add_time(instrumentation.SHADING, perf_counter() - start - shadows_time)
 
-    return color * object_hit.material.color
+    return color
 
 
-def trace_ray(ray: Ray, scene: Scene, depth: int = 0) -> Color:
-    """Trace a ray and return the color that should be displayed, according to Phong shading."""
+def _can_contribute(color: Color, weight: float, scene: Scene) -> bool:
+    """Whether a secondary ray of `weight` can still visibly change `color`.
+
+    Colors only grow as rays are added to them, so once every channel of `color`
+    is saturated, no ray can change it.
+    """
+    return weight >= scene.min_weight and min(color.r, color.g, color.b) < MAX_COLOR
+
+
+def _shade_ray(
+    ray: Ray, scene: Scene, depth: int, weight: float
+) -> tuple[Color, list[tuple[Ray, float, float]]]:
+    """Shade the nearest hit of a ray.
+
+    Returns the color at the hit, without reflections or transmissions, and the
+    secondary rays it spawns as (ray, weight, coefficient) tuples, in the order
+    their colors are to be added to it.
+    """
+    stats = instrumentation.current
+
     (
         intersection_point,
         intersection_normal,
@@ -91,11 +167,17 @@ def trace_ray(ray: Ray, scene: Scene, depth: int = 0) -> Color:
         or intersection_normal is None
         or intersection_point is None
     ):  # Checking all three is surely redundant, but it's done for clarity and for Mypy to be happy.
-        return scene.background_color
+        if dependencies.current is not None:
+            dependencies.current.record_escape(ray)
+        return scene.background_color, []
+
+    if dependencies.current is not None:
+        dependencies.current.record_hit(intersected_obj, ray.origin, intersection_point)
 
-    color = Color(0, 0, 0)
+    if stats is not None:
+        stats.count_ray(instrumentation.SHADOW, depth, len(scene.lights))
 
-    color += color_at(
+    color = color_at(
         object_hit=intersected_obj,
         hit_position=intersection_point,
         normal_at_position=intersection_normal,
@@ -103,8 +185,8 @@ def trace_ray(ray: Ray, scene: Scene, depth: int = 0) -> Color:
         spectator_position=ray.origin,
     )
 
-    MAX_DEPTH = 5
-    if depth < MAX_DEPTH:
+    secondary_rays: list[tuple[Ray, float, float]] = []
+    if depth < scene.max_depth:
         material = intersected_obj.material
         normal = intersection_normal
         omega = -ray.direction
@@ -122,19 +204,26 @@ def trace_ray(ray: Ray, scene: Scene, depth: int = 0) -> Color:
             )
 
         # Reflection
-        if material.reflection_coefficient > 0:
+        reflection_weight = weight * material.reflection_coefficient
+        if material.reflection_coefficient > 0 and _can_contribute(
+            color, reflection_weight, scene
+        ):
             reflected_ray_pos = intersection_point + (normal * 0.01)
             reflected_ray_dir = ray.direction.reflect_vec(normal)
-            
+
             reflected_ray = Ray(reflected_ray_pos, reflected_ray_dir)
+            if stats is not None:
+                stats.count_ray(instrumentation.REFLECTION, depth + 1)
 
-            color += (
-                trace_ray(reflected_ray, scene, depth + 1)
-                * material.reflection_coefficient
+            secondary_rays.append(
+                (reflected_ray, reflection_weight, material.reflection_coefficient)
             )
 
         # Refraction / Transmission
-        if material.transmission_coefficient > 0:
+        transmission_weight = weight * material.transmission_coefficient
+        if material.transmission_coefficient > 0 and _can_contribute(
+            color, transmission_weight, scene
+        ):
             delta = 1 - (1 / relative_transmission_coeff**2) * (
                 1 - normal.dot_product(omega) ** 2
             )
@@ -147,23 +236,63 @@ def trace_ray(ray: Ray, scene: Scene, depth: int = 0) -> Color:
                     ray.direction - normal.dot_product(ray.direction) * normal
                 ) - normal * sqrt(delta)
                 reflected_ray_pos = intersection_point + (-normal * 0.01)
-                refracted_ray = Ray(reflected_ray_pos, refracted_ray_dir)
-
-                color += (
-                    trace_ray(refracted_ray, scene, depth + 1)
-                    * material.transmission_coefficient
-                )
+                transmitted_ray = Ray(reflected_ray_pos, refracted_ray_dir)
+                if stats is not None:
+                    stats.count_ray(instrumentation.REFRACTION, depth + 1)
             # If delta is negative, the ray is reflected. (Total internal reflection)
             else:
                 reflected_ray_dir = ray.direction.reflect_vec(normal)
                 reflected_ray_pos = intersection_point + (normal * 0.01)
-                reflected_ray = Ray(reflected_ray_pos, reflected_ray_dir)
-                color += (
-                    trace_ray(reflected_ray, scene, depth + 1)
-                    * material.transmission_coefficient
+                transmitted_ray = Ray(reflected_ray_pos, reflected_ray_dir)
+                if stats is not None:
+                    stats.count_ray(instrumentation.INTERNAL_REFLECTION, depth + 1)
+
+            secondary_rays.append(
+                (
+                    transmitted_ray,
+                    transmission_weight,
+                    material.transmission_coefficient,
                 )
+            )
 
-    return color
+    return color, secondary_rays
+
+
+def trace_ray(ray: Ray, scene: Scene, depth: int = 0, weight: float = 1) -> Color:
+    """Trace a ray and return the color that should be displayed, according to Phong shading.
+
+    `weight` is the product of the coefficients the color of the ray will be scaled
+    by before reaching the pixel. Secondary rays that would weigh less than
+    `scene.min_weight` are not traced.
+
+    Secondary rays are traced from a stack rather than by recursion. Every ray is
+    numbered when it is spawned, so rays always come after the ray that spawned them.
+    """
+    stats = instrumentation.current
+    if stats is not None and depth == 0:
+        stats.count_ray(instrumentation.CAMERA, depth)
+
+    # The color of every ray, and the (ray number, coefficient) of the rays it spawned.
+    colors: list[Color] = [scene.background_color]
+    spawned: list[list[tuple[int, float]]] = [[]]
+    pending: list[tuple[int, Ray, int, float]] = [(0, ray, depth, weight)]
+    while pending:
+        number, ray, depth, weight = pending.pop()
+        colors[number], secondary_rays = _shade_ray(ray, scene, depth, weight)
+        for secondary_ray, secondary_weight, coefficient in secondary_rays:
+            spawned[number].append((len(colors), coefficient))
+            pending.append((len(colors), secondary_ray, depth + 1, secondary_weight))
+            colors.append(scene.background_color)
+            spawned.append([])
+
+    # Add the color of every ray to that of the ray that spawned it, last rays first.
+    for number in reversed(range(len(colors))):
+        color = colors[number]
+        for child, coefficient in spawned[number]:
+            color += colors[child] * coefficient
+        colors[number] = color
+
+    return colors[0]
 
 
 def _render_ray(x: int, y: int, scene: Scene):
@@ -174,48 +303,439 @@ def _render_ray(x: int, y: int, scene: Scene):
     return color
 
 
-def render_scene_single_thread(scene: Scene) -> Image:
-    """Render a scene and return the image."""
-    pixels = []
+def _trace_samples(scene: Scene, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Trace rays through the given pixel coordinates and return their colors."""
+    colors = [
+        trace_ray(scene.camera.get_ray(x, y), scene)
+        for x, y in zip(xs.tolist(), ys.tolist())
+    ]
+    return colors_to_array([colors]).reshape(-1, 3)
+
+
+def _render_antialiased_tile(
+    scene: Scene, x_start: int, y_start: int, x_end: int, y_end: int, max_samples: int
+) -> np.ndarray:
+    """Render a tile with up to `max_samples` samples per pixel (see `antialiasing`)."""
+    return render_antialiased(
+        partial(_trace_samples, scene),
+        x_start,
+        y_start,
+        x_end,
+        y_end,
+        scene.camera.horizontal_resolution,
+        scene.camera.vertical_resolution,
+        max_samples,
+    )
+
+
+def render_scene_single_thread(scene: Scene, max_samples: int = 1) -> Image:
+    """Render a scene and return the image.
+
+    With `max_samples` above 1, edges are anti-aliased with up to that many samples
+    per pixel.
+    """
+    scene = prepare(scene)
+    width = scene.camera.horizontal_resolution
+    height = scene.camera.vertical_resolution
+    if max_samples > 1:
+        pixels = _render_antialiased_tile(scene, 0, 0, width, height, max_samples)
+        return Image(height, width, pixels)
+
+    image = Image(height, width)
     for y in range(scene.camera.vertical_resolution):
-        pixels.append(
-            [
-                _render_ray(x, y, scene)
-                for x in range(scene.camera.horizontal_resolution)
-            ]
-        )
+        for x in range(scene.camera.horizontal_resolution):
+            image.set_pixel(x, y, _render_ray(x, y, scene))
 
-    image = Image(
-        scene.camera.vertical_resolution, scene.camera.horizontal_resolution, pixels
-    )
     return image
 
 
-def render_scene_multi_threaded(scene: Scene) -> Image:
-    """Render a scene and return the image."""
-    pixels = []
-    with Pool() as p:
-        results = []
-        for y in range(scene.camera.vertical_resolution):
-            results.append(
-                p.starmap_async(
-                    _render_ray,
-                    [(x, y, scene) for x in range(scene.camera.horizontal_resolution)],
-                )
+DEFAULT_TILE_SIZE = 32
+
+Tile = tuple[int, int, int, int]
+T = TypeVar("T")
+
+# The scene a task renders: the version of the pool's scene, the file it was saved
+# to (None for the scene the pool was started with) and the camera.
+Frame = tuple[int, str | None, Camera]
+
+# State of a pool worker, set by `_init_worker` so that the scene is not pickled
+# again for every task. The scene is only replaced when a task has another version.
+_worker_scene: PreparedScene | None = None
+_worker_arrays: SceneArrays | None = None
+_worker_version = 0
+_worker_vectorized = False
+_worker_max_samples = 1
+# Whether the worker collects statistics for the parent, and if so, with timing.
+_worker_stats_timing: bool | None = None
+
+
+def split_into_tiles(width: int, height: int, tile_size: int) -> list[Tile]:
+    """Split an image into (x_start, y_start, x_end, y_end) tiles, row by row."""
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in range(0, height, tile_size)
+        for x in range(0, width, tile_size)
+    ]
+
+
+def _init_worker(
+    scene: PreparedScene, vectorized: bool, max_samples: int, stats_timing: bool | None
+) -> None:
+    global _worker_scene, _worker_arrays, _worker_vectorized
+    global _worker_max_samples, _worker_stats_timing
+    _worker_scene = scene
+    _worker_arrays = scene.arrays if vectorized else None
+    _worker_vectorized = vectorized
+    _worker_max_samples = max_samples
+    _worker_stats_timing = stats_timing
+
+
+def _use_frame(frame: Frame) -> None:
+    """Switch the worker to the scene and camera of a task."""
+    global _worker_scene, _worker_arrays, _worker_version
+    version, scene_file, camera = frame
+    if version != _worker_version and scene_file is not None:
+        with open(scene_file, "rb") as f:
+            _worker_scene = pickle.load(f)
+        _worker_arrays = _worker_scene.arrays if _worker_vectorized else None
+        _worker_version = version
+
+    if _worker_scene is not None:
+        _worker_scene.camera = camera
+
+
+def _render_tile(tile: Tile) -> tuple[Tile, np.ndarray]:
+    """Render a tile of the worker's scene and return its pixels, as in `Image`."""
+    if _worker_scene is None:
+        raise RuntimeError("The worker was not initialized with a scene.")
+
+    x_start, y_start, x_end, y_end = tile
+    if _worker_arrays is not None:
+        colors = render_tile(
+            _worker_scene,
+            *tile,
+            arrays=_worker_arrays,
+            max_samples=_worker_max_samples,
+        )
+        return tile, colors.astype(Image.DTYPE)
+    if _worker_max_samples > 1:
+        colors = _render_antialiased_tile(_worker_scene, *tile, _worker_max_samples)
+        return tile, colors.astype(Image.DTYPE)
+
+    image = Image(y_end - y_start, x_end - x_start)
+    for y in range(y_start, y_end):
+        for x in range(x_start, x_end):
+            image.set_pixel(x - x_start, y - y_start, _render_ray(x, y, _worker_scene))
+    return tile, image.pixels
+
+
+def _render_tile_rgb(tile: Tile) -> tuple[Tile, np.ndarray]:
+    """Render a tile of the worker's scene and return it as an array of bytes."""
+    tile, pixels = _render_tile(tile)
+    return tile, rgb_to_bytes(pixels)
+
+
+def _render_tile_recording(
+    tile: Tile,
+) -> tuple[Tile, tuple[np.ndarray, RayDependencies]]:
+    """Render a tile of the worker's scene as bytes, with what its rays depended on.
+
+    Objects are recorded by their index in the scene, as ids don't outlive the
+    worker. Dependencies are only recorded by the scalar engine.
+    """
+    with dependencies.recording() as recorded:
+        tile, pixels = _render_tile(tile)
+
+    indices = {id(obj): index for index, obj in enumerate(_worker_scene.objects)}
+    recorded.objects = {indices[obj] for obj in recorded.objects}
+    return tile, (rgb_to_bytes(pixels), recorded)
+
+
+def _run_task(
+    task: tuple[Callable[[Tile], tuple[Tile, T]], Tile, Frame],
+) -> tuple[Tile, T, RenderStats | None]:
+    """Run a tile rendering function, collecting statistics if the parent does."""
+    render, tile, frame = task
+    _use_frame(frame)
+    if _worker_stats_timing is None:
+        return (*render(tile), None)
+
+    with instrumentation.collecting(RenderStats(_worker_stats_timing)) as stats:
+        tile, result = render(tile)
+    return tile, result, stats
+
+
+def _render_tile_with_costs(
+    tile: Tile, metric: str
+) -> tuple[Tile, tuple[np.ndarray, np.ndarray]]:
+    """Render a tile of the worker's scene and measure what each pixel cost.
+
+    Returns the tile as an array of bytes, and a (height, width) array with the
+    intersection tests or the seconds that each pixel took, depending on `metric`.
+    Costs are measured on the scalar engine.
+    """
+    if _worker_scene is None:
+        raise RuntimeError("The worker was not initialized with a scene.")
+
+    x_start, y_start, x_end, y_end = tile
+    image = Image(y_end - y_start, x_end - x_start)
+    costs = np.zeros((y_end - y_start, x_end - x_start), dtype=np.float32)
+
+    # Intersection tests are counted by the instrumentation, which may already be on.
+    stats = instrumentation.current
+    counting = (
+        nullcontext(stats)
+        if stats is not None
+        else collecting(RenderStats(timing=False))
+    )
+    with counting as stats:
+        for y in range(y_start, y_end):
+            for x in range(x_start, x_end):
+                tests = stats.total_tests()
+                start = perf_counter()
+                color = _render_ray(x, y, _worker_scene)
+                if metric == TIME:
+                    cost = perf_counter() - start
+                else:
+                    cost = stats.total_tests() - tests
+
+                image.set_pixel(x - x_start, y - y_start, color)
+                costs[y - y_start, x - x_start] = cost
+
+    return tile, (rgb_to_bytes(image.pixels), costs)
+
+
+class RenderPool:
+    """A pool of processes rendering the tiles of scenes, kept across renders.
+
+    Workers keep the last scene they were sent, prepared. Rendering the same scene
+    again, even with another camera, neither prepares it again nor sends more than the
+    camera along with the tiles, so its objects and lights must not be modified in
+    between. Another scene is saved to a temporary file, which every worker loads once.
+
+    Args:
+        workers, vectorized, max_samples: As in `render_scene_multi_threaded`.
+    """
+
+    def __init__(
+        self, workers: int | None = None, vectorized: bool = False, max_samples: int = 1
+    ):
+        self.workers = workers
+        self.vectorized = vectorized
+        self.max_samples = max_samples
+        self._pool = None  # Started by the first render.
+        self._scene: PreparedScene | None = None
+        # The scene `_scene` was prepared from, kept so that its id isn't reused.
+        self._source: Scene | None = None
+        self._version = 0
+        self._scene_file: str | None = None
+        self._directory: TemporaryDirectory | None = None
+
+    def __enter__(self) -> "RenderPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the workers and delete the scene files."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+
+    def _send(self, scene: PreparedScene) -> Frame:
+        """Make the workers render `scene` from now on, and return its frame."""
+        if self._pool is None:
+            stats = instrumentation.current
+            timing = None if stats is None else stats.timing
+            initargs = (scene, self.vectorized, self.max_samples, timing)
+            self._pool = Pool(self.workers, initializer=_init_worker, initargs=initargs)
+        elif scene is not self._scene:
+            if self._directory is None:
+                self._directory = TemporaryDirectory()
+            # Tasks of the previous scene have all been run by now.
+            if self._scene_file is not None:
+                os.remove(self._scene_file)
+            self._version += 1
+            self._scene_file = os.path.join(
+                self._directory.name, f"scene-{self._version}.pickle"
             )
-        for result in results:
-            pixels.append(result.get())
+            with open(self._scene_file, "wb") as f:
+                pickle.dump(scene, f, pickle.HIGHEST_PROTOCOL)
+
+        self._scene = scene
+        return self._version, self._scene_file, scene.camera
+
+    def render_tiles(
+        self,
+        scene: Scene,
+        render: Callable[[Tile], tuple[Tile, T]],
+        tiles: list[Tile],
+    ) -> Iterator[tuple[Tile, T]]:
+        """Render some tiles of a scene, one task per tile.
+
+        Yields the tiles and results of `render` in the order of `tiles`, which must
+        all be consumed before rendering again. If statistics are being collected,
+        the workers collect them too, and they are merged into the current ones.
+        """
+        if scene is self._source:
+            prepared = self._scene
+            # Only the camera may have changed since.
+            prepared.camera = scene.camera
+        else:
+            prepared = prepare(scene, self.vectorized)
+        self._source = scene
+        frame = self._send(prepared)
+        tasks = [(render, tile, frame) for tile in tiles]
+
+        stats = instrumentation.current
+        for tile, result, tile_stats in self._pool.imap(_run_task, tasks):
+            if stats is not None and tile_stats is not None:
+                stats.merge(tile_stats)
+            yield tile, result
+
+    def render_bands(
+        self,
+        scene: Scene,
+        render: Callable[[Tile], tuple[Tile, T]],
+        tile_size: int = DEFAULT_TILE_SIZE,
+    ) -> Iterator[list[tuple[Tile, T]]]:
+        """Render all the tiles of a scene, as in `render_tiles`.
+
+        Yields, from top to bottom, the tiles and results of `render` for every band
+        of tiles that share the same rows, from left to right.
+        """
+        width = scene.camera.horizontal_resolution
+        height = scene.camera.vertical_resolution
+        tiles = split_into_tiles(width, height, tile_size)
+
+        # Tiles come back in order, so a band is complete with its rightmost tile.
+        band: list[tuple[Tile, T]] = []
+        for tile, result in self.render_tiles(scene, render, tiles):
+            band.append((tile, result))
+            if tile[2] == width:
+                yield band
+                band = []
+
+    def render(self, scene: Scene, tile_size: int = DEFAULT_TILE_SIZE) -> Image:
+        """Render a scene and return the image."""
+        image = Image(
+            scene.camera.vertical_resolution, scene.camera.horizontal_resolution
+        )
+        for band in self.render_bands(scene, _render_tile, tile_size):
+            for tile, pixels in band:
+                image.tile(*tile)[...] = pixels
 
-    image = Image(
-        scene.camera.vertical_resolution, scene.camera.horizontal_resolution, pixels
-    )
+        return image
 
-    return image
+    def render_to_file(
+        self, scene: Scene, filename: str | Path, tile_size: int = DEFAULT_TILE_SIZE
+    ) -> None:
+        """Render a scene and stream it to a PNG or PPM file, a band at a time."""
+        width = scene.camera.horizontal_resolution
+        height = scene.camera.vertical_resolution
+        with open_image_writer(filename, width, height) as writer:
+            for band in self.render_bands(scene, _render_tile_rgb, tile_size):
+                writer.write_rows(np.concatenate([rgb for _, rgb in band], axis=1))
 
 
-def render_scene(scene: Scene, multithread: bool = False) -> Image:
-    """Render a scene and return the image."""
+def render_scene_multi_threaded(
+    scene: Scene,
+    workers: int | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    vectorized: bool = False,
+    max_samples: int = 1,
+) -> Image:
+    """Render a scene on a pool of processes, one tile per task, and return the image.
+
+    Args:
+        workers: Number of processes. Defaults to the number of CPUs.
+        tile_size: Side of the square tiles the image is split into.
+        vectorized: Whether workers render their tiles with the batched NumPy engine.
+        max_samples: Maximum number of samples per pixel. Above 1, edges are
+            anti-aliased (see `antialiasing`).
+    """
+    with RenderPool(workers, vectorized, max_samples) as pool:
+        return pool.render(scene, tile_size)
+
+
+def render_scene_to_file(
+    scene: Scene,
+    filename: str | Path,
+    workers: int | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    vectorized: bool = False,
+    max_samples: int = 1,
+    heatmap: str | Path | None = None,
+    heatmap_metric: str = TESTS,
+) -> None:
+    """Render a scene on a pool of processes and stream it to a PNG or PPM file.
+
+    Rows are written as soon as a band of tiles is done, so only one band of the
+    image is ever held in memory. The arguments are as in
+    `render_scene_multi_threaded`.
+
+    If `heatmap` is given, a heatmap of the cost of every pixel, in intersection
+    tests or time (see `heatmap_metric`), is written there too. Costs are measured
+    on the scalar engine without anti-aliasing, so neither `vectorized` nor
+    `max_samples` can be set.
+    """
+    width = scene.camera.horizontal_resolution
+    height = scene.camera.vertical_resolution
+
+    if heatmap is None:
+        with RenderPool(workers, vectorized, max_samples) as pool:
+            pool.render_to_file(scene, filename, tile_size)
+        return
+
+    if vectorized:
+        raise ValueError("Heatmaps can only be rendered by the scalar engine.")
+    if max_samples > 1:
+        raise ValueError("Heatmaps can't be rendered with anti-aliasing.")
+    if heatmap_metric not in (TESTS, TIME):
+        raise ValueError(f"Unknown heatmap metric: {heatmap_metric}")
+
+    costs = np.zeros((height, width), dtype=np.float32)
+    render = partial(_render_tile_with_costs, metric=heatmap_metric)
+    pool = RenderPool(workers)
+    with pool, open_image_writer(filename, width, height) as writer:
+        for band in pool.render_bands(scene, render, tile_size):
+            writer.write_rows(np.concatenate([rgb for _, (rgb, _) in band], axis=1))
+            for (x_start, y_start, x_end, y_end), (_, tile_costs) in band:
+                costs[y_start:y_end, x_start:x_end] = tile_costs
+
+    heatmap_image(costs).write(heatmap)
+
+
+def render_scene(
+    scene: Scene,
+    multithread: bool = False,
+    vectorized: bool = False,
+    workers: int | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    max_samples: int = 1,
+) -> Image:
+    """Render a scene and return the image.
+
+    If `vectorized` is set, the scene is rendered by the batched NumPy engine instead.
+    `workers` and `tile_size` configure the process pool used when `multithread` is set.
+    With `max_samples` above 1, pixels along edges are supersampled with up to that
+    many rays (see `antialiasing`). The scene is compiled by `prepare` first; a
+    prepared scene can be passed to render it again without doing that work.
+    """
     if multithread:
-        return render_scene_multi_threaded(scene)
+        return render_scene_multi_threaded(
+            scene,
+            workers=workers,
+            tile_size=tile_size,
+            vectorized=vectorized,
+            max_samples=max_samples,
+        )
+    if vectorized:
+        prepared = prepare(scene, vectorized=True)
+        return render_scene_vectorized(prepared, max_samples, prepared.arrays)
     else:
-        return render_scene_single_thread(scene)
+        return render_scene_single_thread(scene, max_samples)
@@ -0,0 +1,26 @@
+from argparse import ArgumentParser
+from pathlib import Path
+
+from src.scene_file import BINARY_SUFFIX, load_scene, save_binary_scene
+
+
+def main():
+    ap = ArgumentParser(description="Convert a scene file to the binary format")
+
+    ap.add_argument("scene", help="The scene file (JSON or binary)", type=Path)
+    ap.add_argument(
+        "destination",
+        help=f"The destination of the binary scene file (default: the scene file "
+        f"with the {BINARY_SUFFIX} suffix)",
+        type=Path,
+        nargs="?",
+    )
+
+    args = ap.parse_args()
+
+    destination = args.destination or args.scene.with_suffix(BINARY_SUFFIX)
+    save_binary_scene(load_scene(args.scene), destination)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Loading and saving scene files.
+
+Scenes can be stored in two formats:
+
+- JSON, as written by `jsonpickle`. Every point becomes a nested JSON object, which
+  is easy to read and edit but slow and large for meshes.
+- A binary format: a small header, a JSON description of the scene and the raw
+  vertex, index and normal arrays of every triangle mesh. The arrays are memory-mapped
+  when the scene is loaded, so only the parts of a mesh that are used get read.
+
+Binary files start with `MAGIC`, followed by the format version and the size of the
+JSON description (little-endian uint32 and uint64). The description is the
+`jsonpickle` encoding of the scene, where meshes refer to their arrays by offset
+within the data section, which starts at the next multiple of `ALIGNMENT` bytes.
+"""
+
+import dataclasses
+import os
+import struct
+from pathlib import Path
+
+import jsonpickle
+import numpy as np
+
+from src.components.material import Material
+from src.components.objects_in_space import PackedTriangleMesh, TriangleMesh
+from src.components.scene import Scene
+
+MAGIC = b"GPSCENE\0"
+VERSION = 1
+ALIGNMENT = 64
+BINARY_SUFFIX = ".scene"
+
+_PREAMBLE = struct.Struct("<IQ")
+
+
+class _MeshRecord:
+    """Stand-in for a `PackedTriangleMesh` in the JSON description of a scene.
+
+    Each array is described by a dict with its offset in the data section, its
+    dtype and its shape.
+    """
+
+    def __init__(
+        self, material: Material, vertices: dict, indices: dict, normals: dict
+    ):
+        self.material = material
+        self.vertices = vertices
+        self.indices = indices
+        self.normals = normals
+
+    def restore(self, data: np.ndarray) -> PackedTriangleMesh:
+        def array(spec: dict) -> np.ndarray:
+            dtype = np.dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            size = dtype.itemsize * int(np.prod(shape))
+            start = spec["offset"]
+            return data[start : start + size].view(dtype).reshape(shape)
+
+        # The arrays were saved from a mesh, so there's nothing to validate or
+        # normalize: restore it the same way `pickle` would.
+        mesh = PackedTriangleMesh.__new__(PackedTriangleMesh)
+        mesh.__setstate__(
+            {
+                "material": self.material,
+                "vertices": array(self.vertices),
+                "indices": array(self.indices),
+                "normals": array(self.normals),
+            }
+        )
+        return mesh
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def is_binary_scene(path: Path) -> bool:
+    """Checks whether the file at path is a binary scene file."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load_scene(path: Path) -> Scene:
+    """Load a scene from either a binary or a JSON scene file."""
+    if not is_binary_scene(path):
+        with open(path, "r") as f:
+            return jsonpickle.decode(f.read())
+
+    with open(path, "rb") as f:
+        f.seek(len(MAGIC))
+        version, description_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if version != VERSION:
+            raise ValueError(f"Unsupported scene file version: {version}")
+        description = f.read(description_size).decode("utf-8")
+
+    data_start = _align(len(MAGIC) + _PREAMBLE.size + description_size)
+    data = np.memmap(path, dtype=np.uint8, mode="r")[data_start:]
+
+    scene: Scene = jsonpickle.decode(description)
+    scene.objects = [
+        obj.restore(data) if isinstance(obj, _MeshRecord) else obj
+        for obj in scene.objects
+    ]
+    return scene
+
+
+def save_binary_scene(scene: Scene, path: Path) -> None:
+    """Save a scene in the binary format.
+
+    Triangle meshes are stored packed, so they are loaded as `PackedTriangleMesh`.
+    """
+    buffers: list[tuple[int, np.ndarray]] = []
+    size = 0
+
+    def add_buffer(array: np.ndarray, dtype: str) -> dict:
+        nonlocal size
+        array = np.ascontiguousarray(array, dtype=dtype)
+        offset = _align(size)
+        buffers.append((offset, array))
+        size = offset + array.nbytes
+        return {"offset": offset, "dtype": dtype, "shape": list(array.shape)}
+
+    objects = []
+    for obj in scene.objects:
+        if type(obj) is TriangleMesh:
+            obj = PackedTriangleMesh.from_triangle_mesh(obj)
+        if isinstance(obj, PackedTriangleMesh):
+            obj = _MeshRecord(
+                obj.material,
+                add_buffer(obj.vertices, "<f8"),
+                add_buffer(obj.indices, "<i4"),
+                add_buffer(obj.normals, "<f8"),
+            )
+        objects.append(obj)
+
+    description = jsonpickle.encode(dataclasses.replace(scene, objects=objects))
+    description = description.encode("utf-8")
+
+    data_start = _align(len(MAGIC) + _PREAMBLE.size + len(description))
+    # The arrays may be mapped from the file being replaced, e.g. when a loaded scene
+    # is saved back, so it is only replaced once they have all been written.
+    partial = Path(f"{path}.partial")
+    with open(partial, "wb") as f:
+        f.write(MAGIC)
+        f.write(_PREAMBLE.pack(VERSION, len(description)))
+        f.write(description)
+        for offset, array in buffers:
+            f.seek(data_start + offset)
+            f.write(array.tobytes())
+    os.replace(partial, path)
+
+
+def save_scene(scene: Scene, path: Path) -> None:
+    """Save a scene, in the binary format if path ends with `BINARY_SUFFIX`."""
+    if Path(path).suffix == BINARY_SUFFIX:
+        save_binary_scene(scene, path)
+        return
+
+    with open(path, "w") as f:
+        f.write(jsonpickle.encode(scene))
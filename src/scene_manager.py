@@ -1,9 +1,8 @@
 from argparse import ArgumentParser
 from pathlib import Path
 
-import jsonpickle
-
 from src.components.scene import Scene
+from src.scene_file import load_scene, save_scene
 from src.ui.camera_ui import create_camera
 from src.ui.color_ui import create_color
 from src.ui.light_ui import create_lights
@@ -42,8 +41,7 @@ def main():
             background_color=background_color,
         )
     else:
-        with open(args.destination, "r") as f:
-            scene: Scene = jsonpickle.decode(f.read())
+        scene: Scene = load_scene(args.destination)
 
         objects = scene.objects
         for i, obj in enumerate(objects):
@@ -61,8 +59,7 @@ def main():
 
         objects[obj_index] = apply_transformation(obj)
 
-    with open(args.destination, "w") as f:
-        f.write(jsonpickle.encode(scene))
+    save_scene(scene, args.destination)
 
 
 if __name__ == "__main__":
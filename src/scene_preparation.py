@@ -0,0 +1,77 @@
+"""Compiling a scene into the form the engines render.
+
+Everything the engines derive from a scene and that doesn't change during a render
+(the acceleration structure over the flattened primitives, the per-primitive data
+used by intersections, the light colors of every material, the flat arrays of the
+batched engine) is computed once by `prepare`, instead of on first use by every
+render and every pool worker:
+
+    prepared = prepare(scene)
+    render_scene(prepared)
+    render_scene(prepared, vectorized=True)
+"""
+
+from dataclasses import dataclass, fields
+from functools import cached_property
+
+from src.components.scene import Scene
+from src.vectorized_engine import SceneArrays
+
+
+@dataclass
+class PreparedScene(Scene):
+    """A scene with its derived data computed ahead of the render, made by `prepare`.
+
+    It is a snapshot of the scene it was prepared from: its objects and lights must
+    not be modified, as nothing would be rebuilt. Its camera can be replaced, since
+    cameras are not part of the derived data.
+
+    Unlike a `Scene`, it is pickled with its acceleration structure, its arrays and
+    the derived data of its objects, so that pool workers don't build them again.
+    """
+
+    @cached_property
+    def arrays(self) -> SceneArrays:
+        """The scene packed for the batched engine, built on first use."""
+        return SceneArrays(self)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # Light colors are looked up by material id, which doesn't survive pickling.
+        state.pop("_light_colors", None)
+        # Objects leave their derived data out when pickled; it is kept here instead.
+        objects = {id(obj): obj for obj in [*self.objects, *self.bvh.primitives]}
+        state["_derived_states"] = [
+            (obj, obj.derived_state()) for obj in objects.values()
+        ]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        derived_states = state.pop("_derived_states", [])
+        super().__setstate__(state)
+        for obj, derived in derived_states:
+            obj.restore_derived_state(derived)
+
+
+def prepare(scene: Scene, vectorized: bool = False) -> PreparedScene:
+    """Compile a scene for rendering.
+
+    Composite objects (bezier surfaces, triangle meshes) are flattened into their
+    primitives by the acceleration structure, and the primitives precompute their
+    intersection data. If `vectorized` is set, the arrays of the batched engine are
+    built too. Preparing a prepared scene returns it as is.
+    """
+    if isinstance(scene, PreparedScene):
+        prepared = scene
+    else:
+        values = {field.name: getattr(scene, field.name) for field in fields(scene)}
+        prepared = PreparedScene(
+            **{**values, "objects": list(scene.objects), "lights": list(scene.lights)}
+        )
+        for primitive in prepared.bvh.primitives:
+            primitive.precompute()
+        prepared._light_colors
+
+    if vectorized:
+        prepared.arrays
+    return prepared
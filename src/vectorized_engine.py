@@ -0,0 +1,701 @@
+"""A batched alternative to `rendering_engine.trace_ray`.
+
+Whole tiles of rays are stored as NumPy arrays and intersected, shaded and bounced
+together, following the same Phong model (clamping included) as the scalar engine.
+"""
+
+from functools import partial
+from time import perf_counter
+
+import numpy as np
+
+from src import instrumentation
+from src.antialiasing import render_antialiased
+from src.components.camera import Camera
+from src.components.image import Image
+from src.components.objects_in_space import (
+    Instance,
+    PackedTriangleMesh,
+    Plane,
+    Sphere,
+    Triangle,
+)
+from src.components.scene import Scene
+
+EPSILON = 0.0001
+MAX_COLOR = 255
+
+# Upper bound on rays x primitives evaluated at once, to keep memory in check.
+_CHUNK_ELEMENTS = 1 << 18
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise dot product, summed in the same order as `Vector.dot_product`."""
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1] + a[..., 2] * b[..., 2]
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    """Normalizes rows, leaving null vectors untouched like `Vector.normalized`."""
+    norms = np.sqrt(_dot(vectors, vectors))
+    norms[norms == 0] = 1
+    return vectors / norms[..., None]
+
+
+def _as_array(vector) -> np.ndarray:
+    return np.array([vector.x, vector.y, vector.z], dtype=np.float64)
+
+
+class SceneArrays:
+    """The geometry, materials and lights of a scene packed into flat arrays."""
+
+    def __init__(self, scene: Scene):
+        self.background_color = _as_array(scene.background_color)
+        self.ambient_color = _as_array(scene.ambient_color)
+        self.light_positions = [_as_array(light.position) for light in scene.lights]
+        self.light_colors = [_as_array(light.color) for light in scene.lights]
+        self.max_depth = scene.max_depth
+        self.min_weight = scene.min_weight
+
+        def vectors(values) -> np.ndarray:
+            return np.array([_as_array(value) for value in values]).reshape(-1, 3)
+
+        # Objects are referred to by the index of their first occurrence in the scene.
+        owner_index: dict[int, int] = {}
+        for index, obj in enumerate(scene.objects):
+            owner_index.setdefault(id(obj), index)
+
+        materials = [obj.material for obj in scene.objects]
+        self.material_color = np.array(
+            [_as_array(material.color) for material in materials]
+        ).reshape(-1, 3)
+        self.diffusion = np.array([m.diffusion_coefficient for m in materials], float)
+        self.specular = np.array([m.specular_coefficient for m in materials], float)
+        self.ambient = np.array([m.ambient_coefficient for m in materials], float)
+        self.reflection = np.array([m.reflection_coefficient for m in materials], float)
+        self.transmission = np.array(
+            [m.transmission_coefficient for m in materials], float
+        )
+        self.rugosity = np.array([m.rugosity_coefficient for m in materials], float)
+
+        # The color of every light times the coefficients of every object's material.
+        self.diffuse_light_colors = [
+            np.minimum(self.diffusion[:, None] * color, MAX_COLOR)
+            for color in self.light_colors
+        ]
+        self.specular_light_colors = [
+            np.minimum(self.specular[:, None] * color, MAX_COLOR)
+            for color in self.light_colors
+        ]
+
+        spheres: list[tuple[int, int, Sphere]] = []
+        planes: list[tuple[int, int, Plane]] = []
+        # Triangles are gathered in blocks of (order, owner, vertex, edge1, edge2,
+        # normal) arrays, kept in scene order: loose triangles are grouped together,
+        # packed meshes contribute their arrays as they are.
+        triangle_blocks: list[tuple[np.ndarray, ...]] = []
+        triangles: list[tuple[int, int, Triangle]] = []
+
+        def flush_triangles() -> None:
+            if not triangles:
+                return
+            vertex0 = vectors(entry[2].points[0] for entry in triangles)
+            triangle_blocks.append(
+                (
+                    np.array([entry[0] for entry in triangles], dtype=np.int64),
+                    np.array([entry[1] for entry in triangles], dtype=np.int64),
+                    vertex0,
+                    vectors(entry[2].edges[0] for entry in triangles),
+                    vectors(entry[2].edges[1] for entry in triangles),
+                    vectors(entry[2].normal for entry in triangles),
+                )
+            )
+            triangles.clear()
+
+        order = 0
+        for obj in scene.objects:
+            owner = owner_index[id(obj)]
+            for primitive in obj.get_primitives():
+                if isinstance(primitive, Instance):
+                    # Rays are traced in world space here, so instances are expanded.
+                    primitive = primitive.to_mesh()
+                entry = (order, owner, primitive)
+                order += 1
+                if isinstance(primitive, Sphere):
+                    spheres.append(entry)  # type: ignore
+                elif isinstance(primitive, Plane):
+                    planes.append(entry)  # type: ignore
+                elif isinstance(primitive, Triangle):
+                    triangles.append(entry)  # type: ignore
+                elif isinstance(primitive, PackedTriangleMesh):
+                    flush_triangles()
+                    count = len(primitive)
+                    triangle_blocks.append(
+                        (
+                            np.arange(order - 1, order - 1 + count, dtype=np.int64),
+                            np.full(count, owner, dtype=np.int64),
+                            primitive.first_vertices,
+                            primitive.edge1,
+                            primitive.edge2,
+                            primitive.normals,
+                        )
+                    )
+                    order += count - 1
+                else:
+                    raise TypeError(
+                        f"{type(primitive).__name__} is not supported by the vectorized engine."
+                    )
+        flush_triangles()
+
+        self.sphere_order = np.array([entry[0] for entry in spheres], dtype=np.int64)
+        self.sphere_owner = np.array([entry[1] for entry in spheres], dtype=np.int64)
+        self.sphere_center = vectors(entry[2].center for entry in spheres)
+        self.sphere_radius = np.array([entry[2].radius for entry in spheres], float)
+
+        self.plane_order = np.array([entry[0] for entry in planes], dtype=np.int64)
+        self.plane_owner = np.array([entry[1] for entry in planes], dtype=np.int64)
+        self.plane_normal = vectors(entry[2].normal for entry in planes)
+        self.plane_point = vectors(entry[2].point for entry in planes)
+
+        if not triangle_blocks:
+            empty = np.zeros(0, dtype=np.int64)
+            triangle_blocks.append(
+                (empty, empty, *(np.zeros((0, 3)) for _ in range(4)))
+            )
+        (
+            self.triangle_order,
+            self.triangle_owner,
+            self.triangle_vertex,
+            self.triangle_edge1,
+            self.triangle_edge2,
+            self.triangle_normal,
+        ) = (np.concatenate(arrays) for arrays in zip(*triangle_blocks))
+
+
+def _sphere_distances(
+    arrays: SceneArrays, origins: np.ndarray, directions: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the (rays, spheres) hit distances and a mask of the valid ones."""
+    # Component-wise arithmetic on (rays, primitives) matrices; each row is a ray.
+    ox, oy, oz = (origins[:, axis, None] for axis in range(3))
+    dx, dy, dz = (directions[:, axis, None] for axis in range(3))
+    cx, cy, cz = arrays.sphere_center.T
+    ocx, ocy, ocz = ox - cx, oy - cy, oz - cz
+    a = dx * dx + dy * dy + dz * dz
+    b = 2 * (dx * ocx + dy * ocy + dz * ocz)
+    c = (ocx * ocx + ocy * ocy + ocz * ocz) - arrays.sphere_radius**2
+    discriminant = b**2 - 4 * a * c
+    root = np.sqrt(np.maximum(discriminant, 0))
+    near = (-b - root) / (2 * a)
+    far = (-b + root) / (2 * a)
+    distance = np.where(near > EPSILON, near, far)
+    return distance, (discriminant >= 0) & (distance > EPSILON)
+
+
+def _plane_distances(
+    arrays: SceneArrays, origins: np.ndarray, directions: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the (rays, planes) hit distances and a mask of the valid ones."""
+    ox, oy, oz = (origins[:, axis, None] for axis in range(3))
+    dx, dy, dz = (directions[:, axis, None] for axis in range(3))
+    nx, ny, nz = arrays.plane_normal.T
+    px, py, pz = arrays.plane_point.T
+    denominator = dx * nx + dy * ny + dz * nz
+    parallel = np.abs(denominator) < EPSILON
+    distance = (nx * (px - ox) + ny * (py - oy) + nz * (pz - oz)) / np.where(
+        parallel, 1, denominator
+    )
+    return distance, ~parallel & (distance > EPSILON)
+
+
+def _triangle_distances(
+    arrays: SceneArrays, origins: np.ndarray, directions: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the (rays, triangles) hit distances and a mask of the valid ones."""
+    ox, oy, oz = (origins[:, axis, None] for axis in range(3))
+    dx, dy, dz = (directions[:, axis, None] for axis in range(3))
+    e1x, e1y, e1z = arrays.triangle_edge1.T
+    e2x, e2y, e2z = arrays.triangle_edge2.T
+    vx, vy, vz = arrays.triangle_vertex.T
+
+    hx = dy * e2z - dz * e2y
+    hy = dz * e2x - dx * e2z
+    hz = dx * e2y - dy * e2x
+    a = e1x * hx + e1y * hy + e1z * hz
+    parallel = (a > -EPSILON) & (a < EPSILON)
+    f = 1 / np.where(parallel, 1, a)
+
+    sx, sy, sz = ox - vx, oy - vy, oz - vz
+    u = f * (sx * hx + sy * hy + sz * hz)
+    qx = sy * e1z - sz * e1y
+    qy = sz * e1x - sx * e1z
+    qz = sx * e1y - sy * e1x
+    v = f * (dx * qx + dy * qy + dz * qz)
+    distance = f * (e2x * qx + e2y * qy + e2z * qz)
+    valid = (
+        ~parallel & (u >= 0) & (u <= 1) & (v >= 0) & (u + v <= 1) & (distance > EPSILON)
+    )
+    return distance, valid
+
+
+def _nearest_in_chunk(
+    arrays: SceneArrays, origins: np.ndarray, directions: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    count = len(origins)
+    best_distance = np.full(count, np.inf)
+    best_order = np.full(count, np.iinfo(np.int64).max)
+    best_owner = np.full(count, -1, dtype=np.int64)
+    best_normal = np.zeros((count, 3))
+
+    def merge(distance, valid, order, owner, normal):
+        index = np.argmin(np.where(valid, distance, np.inf), axis=1)
+        rows = np.arange(count)
+        distance = distance[rows, index]
+        hit = valid[rows, index]
+        order = order[index]
+        # Ties are won by the primitive that comes first in the scene, as in the
+        # linear scan of the scalar engine.
+        better = hit & (
+            (distance < best_distance)
+            | ((distance == best_distance) & (order < best_order))
+        )
+        best_distance[better] = distance[better]
+        best_order[better] = order[better]
+        best_owner[better] = owner[index][better]
+        best_normal[better] = normal(index[better], better, distance[better])
+
+    if len(arrays.sphere_order):
+
+        def sphere_normal(index, mask, t):
+            points = origins[mask] + t[:, None] * directions[mask]
+            return _normalized(points - arrays.sphere_center[index])
+
+        merge(
+            *_sphere_distances(arrays, origins, directions),
+            arrays.sphere_order,
+            arrays.sphere_owner,
+            sphere_normal,
+        )
+
+    if len(arrays.plane_order):
+        merge(
+            *_plane_distances(arrays, origins, directions),
+            arrays.plane_order,
+            arrays.plane_owner,
+            lambda index, mask, t: arrays.plane_normal[index],
+        )
+
+    if len(arrays.triangle_order):
+        merge(
+            *_triangle_distances(arrays, origins, directions),
+            arrays.triangle_order,
+            arrays.triangle_owner,
+            lambda index, mask, t: arrays.triangle_normal[index],
+        )
+
+    return best_distance, best_normal, best_owner
+
+
+def _chunk_size(arrays: SceneArrays) -> int:
+    primitives = max(
+        1,
+        len(arrays.sphere_order) + len(arrays.plane_order) + len(arrays.triangle_order),
+    )
+    return max(1, _CHUNK_ELEMENTS // primitives)
+
+
+def _primitive_groups(arrays: SceneArrays) -> tuple[tuple[str, np.ndarray], ...]:
+    """The primitive types of the scene, named as in the scalar engine, and owners."""
+    return (
+        ("Sphere", arrays.sphere_owner),
+        ("Plane", arrays.plane_owner),
+        ("Triangle", arrays.triangle_owner),
+    )
+
+
+def find_nearest_intersections(
+    arrays: SceneArrays, origins: np.ndarray, directions: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the distance, normal and owner index of the nearest hit of each ray.
+
+    Rays that hit nothing get an infinite distance and an owner of -1.
+    """
+    stats = instrumentation.current
+    if stats is not None:
+        start_time = perf_counter()
+    chunk = _chunk_size(arrays)
+
+    distances, normals, owners = [], [], []
+    for start in range(0, len(origins), chunk):
+        distance, normal, owner = _nearest_in_chunk(
+            arrays, origins[start : start + chunk], directions[start : start + chunk]
+        )
+        distances.append(distance)
+        normals.append(normal)
+        owners.append(owner)
+
+    if not distances:
+        return np.zeros(0), np.zeros((0, 3)), np.zeros(0, dtype=np.int64)
+
+    owner = np.concatenate(owners)
+    if stats is not None:
+        for name, primitives in _primitive_groups(arrays):
+            stats.count_tests(name, len(origins) * len(primitives))
+        hits = int(np.count_nonzero(owner != -1))
+        stats.count_query(instrumentation.NEAREST, True, hits)
+        stats.count_query(instrumentation.NEAREST, False, len(owner) - hits)
+        if stats.timing:
+            stats.add_time(instrumentation.INTERSECTION, perf_counter() - start_time)
+
+    return np.concatenate(distances), np.concatenate(normals), owner
+
+
+def find_occluded(
+    arrays: SceneArrays,
+    origins: np.ndarray,
+    directions: np.ndarray,
+    max_distances: np.ndarray,
+    ignore: np.ndarray,
+) -> np.ndarray:
+    """Batched version of `rendering_engine.is_occluded`.
+
+    Return whether each ray hits a primitive closer than its max distance whose owner
+    is not the matching entry of `ignore`. Rays are dropped as soon as they are found
+    to be blocked, so later primitive groups are only tested against the rest.
+    """
+    stats = instrumentation.current
+    if stats is not None:
+        start_time = perf_counter()
+
+    blocked = np.zeros(len(origins), dtype=bool)
+    groups = zip(
+        _primitive_groups(arrays),
+        (_sphere_distances, _plane_distances, _triangle_distances),
+    )
+    chunk = _chunk_size(arrays)
+    for (name, owner), distances in groups:
+        if not len(owner):
+            continue
+        pending = np.flatnonzero(~blocked)
+        if stats is not None:
+            stats.count_tests(name, len(pending) * len(owner))
+        for start in range(0, len(pending), chunk):
+            rays = pending[start : start + chunk]
+            distance, valid = distances(arrays, origins[rays], directions[rays])
+            valid &= distance < max_distances[rays, None]
+            valid &= owner != ignore[rays, None]
+            blocked[rays] = valid.any(axis=1)
+
+    if stats is not None:
+        occluded = int(np.count_nonzero(blocked))
+        stats.count_query(instrumentation.OCCLUSION, True, occluded)
+        stats.count_query(instrumentation.OCCLUSION, False, len(blocked) - occluded)
+        if stats.timing:
+            stats.add_time(instrumentation.SHADOWS, perf_counter() - start_time)
+    return blocked
+
+
+def colors_at(
+    arrays: SceneArrays,
+    owners: np.ndarray,
+    hit_positions: np.ndarray,
+    normals: np.ndarray,
+    spectator_positions: np.ndarray,
+) -> np.ndarray:
+    """Batched version of `rendering_engine.color_at`."""
+    stats = instrumentation.current
+    if stats is not None and stats.timing:
+        start_time = perf_counter()
+        shadows_time = stats.phase_times[instrumentation.SHADOWS]
+
+    color = np.minimum(arrays.ambient[owners, None] * arrays.ambient_color, MAX_COLOR)
+    rugosity = arrays.rugosity[owners]
+    to_spectator = _normalized(spectator_positions - hit_positions)
+
+    for light_position, diffuse_light_color, specular_light_color in zip(
+        arrays.light_positions,
+        arrays.diffuse_light_colors,
+        arrays.specular_light_colors,
+    ):
+        to_light = light_position - hit_positions
+        light_distance = np.sqrt(_dot(to_light, to_light))
+        to_light = _normalized(to_light)
+
+        # Only objects between the hit and the light can cast a shadow on it.
+        lit = ~find_occluded(arrays, hit_positions, to_light, light_distance, owners)
+        lit = lit[:, None]
+
+        # Diffuse
+        light_dot = _dot(normals, to_light)
+        diffuse = np.minimum(
+            diffuse_light_color[owners] * np.maximum(light_dot, 0)[:, None],
+            MAX_COLOR,
+        )
+        color = np.where(lit, np.minimum(color + diffuse, MAX_COLOR), color)
+
+        # Specular
+        reflection_vector = 2 * normals * light_dot[:, None] - to_light
+        highlight = np.maximum(_dot(reflection_vector, to_spectator), 0) ** rugosity
+        specular_color = np.minimum(
+            specular_light_color[owners] * highlight[:, None],
+            MAX_COLOR,
+        )
+        color = np.where(lit, np.minimum(color + specular_color, MAX_COLOR), color)
+
+    color = np.minimum(color * arrays.material_color[owners], MAX_COLOR)
+
+    if stats is not None and stats.timing:
+        # Shadow tests are timed on their own.
+        shadows_time = stats.phase_times[instrumentation.SHADOWS] - shadows_time
+        stats.add_time(
+            instrumentation.SHADING, perf_counter() - start_time - shadows_time
+        )
+
+    return color
+
+
+def _reflect(directions: np.ndarray, normals: np.ndarray) -> np.ndarray:
+    return directions - 2 * _dot(directions, normals)[:, None] * normals
+
+
+def _can_contribute(
+    colors: np.ndarray, weights: np.ndarray, min_weight: float
+) -> np.ndarray:
+    """Batched version of `rendering_engine._can_contribute`."""
+    return (weights >= min_weight) & (colors.min(axis=1) < MAX_COLOR)
+
+
+def _secondary_rays(
+    arrays: SceneArrays,
+    owner: np.ndarray,
+    points: np.ndarray,
+    directions: np.ndarray,
+    normal: np.ndarray,
+    weights: np.ndarray,
+    colors: np.ndarray,
+    depth: int,
+) -> list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """The reflected and transmitted rays spawned by hits of rays at `depth`.
+
+    Returns a (mask, coefficients, origins, directions, weights) tuple per kind of
+    ray that was spawned, in the order the colors of those rays are to be added: the
+    mask selects the hits that spawned the rays, whose colors are scaled by the
+    coefficients.
+    """
+    stats = instrumentation.current
+    branches = []
+
+    omega = -directions
+    transmission = arrays.transmission[owner]
+    relative_transmission = transmission.copy()
+
+    # If the ray is inside the object, the normal and the coefficient are inverted.
+    inside = _dot(normal, omega) < 0
+    normal = np.where(inside[:, None], -normal, normal)
+    relative_transmission = np.where(
+        inside & (relative_transmission != 0),
+        1 / np.where(relative_transmission == 0, 1, relative_transmission),
+        relative_transmission,
+    )
+
+    # Reflection
+    reflection = arrays.reflection[owner]
+    reflection_weights = weights * reflection
+    reflects = (reflection > 0) & _can_contribute(
+        colors, reflection_weights, arrays.min_weight
+    )
+    if reflects.any():
+        if stats is not None:
+            reflected_rays = int(np.count_nonzero(reflects))
+            stats.count_ray(instrumentation.REFLECTION, depth + 1, reflected_rays)
+        branches.append(
+            (
+                reflects,
+                reflection[reflects],
+                points[reflects] + normal[reflects] * 0.01,
+                _normalized(_reflect(directions[reflects], normal[reflects])),
+                reflection_weights[reflects],
+            )
+        )
+
+    # Refraction / Transmission
+    transmission_weights = weights * transmission
+    transmits = (transmission > 0) & _can_contribute(
+        colors, transmission_weights, arrays.min_weight
+    )
+    if transmits.any():
+        t_normal = normal[transmits]
+        t_directions = directions[transmits]
+        t_relative = relative_transmission[transmits]
+        cosine = _dot(t_normal, omega[transmits])
+        delta = 1 - (1 / t_relative**2) * (1 - cosine**2)
+        refracts = delta >= 0
+        if stats is not None:
+            refracted_rays = int(np.count_nonzero(refracts))
+            stats.count_ray(instrumentation.REFRACTION, depth + 1, refracted_rays)
+            stats.count_ray(
+                instrumentation.INTERNAL_REFLECTION,
+                depth + 1,
+                len(refracts) - refracted_rays,
+            )
+
+        refracted = (1 / t_relative)[:, None] * (
+            t_directions - _dot(t_normal, t_directions)[:, None] * t_normal
+        ) - t_normal * np.sqrt(np.maximum(delta, 0))[:, None]
+        # If delta is negative, the ray is reflected. (Total internal reflection)
+        child_directions = np.where(
+            refracts[:, None], refracted, _reflect(t_directions, t_normal)
+        )
+        child_origins = points[transmits] + np.where(
+            refracts[:, None], -t_normal * 0.01, t_normal * 0.01
+        )
+        branches.append(
+            (
+                transmits,
+                transmission[transmits],
+                child_origins,
+                _normalized(child_directions),
+                transmission_weights[transmits],
+            )
+        )
+
+    return branches
+
+
+def trace_rays(
+    arrays: SceneArrays,
+    origins: np.ndarray,
+    directions: np.ndarray,
+    depth: int = 0,
+    weights: np.ndarray | None = None,
+) -> np.ndarray:
+    """Batched version of `rendering_engine.trace_ray`. Directions must be normalized.
+
+    `weights` are those of the rays, all 1 by default.
+
+    Rays are traced one generation at a time: all the rays spawned by the hits of a
+    generation, reflected or transmitted, are intersected and shaded together.
+    """
+    stats = instrumentation.current
+    if stats is not None and depth == 0:
+        stats.count_ray(instrumentation.CAMERA, depth, len(origins))
+    if weights is None:
+        weights = np.ones(len(origins))
+
+    # The colors of every generation, and how the next generation was spawned from it:
+    # a (parents, coefficients) pair per kind of ray, in the order of the next
+    # generation's rays.
+    generations: list[tuple[np.ndarray, list[tuple[np.ndarray, np.ndarray]]]] = []
+    while True:
+        colors = np.empty((len(origins), 3))
+        colors[:] = arrays.background_color
+        spawned: list[tuple[np.ndarray, np.ndarray]] = []
+        generations.append((colors, spawned))
+
+        distance, normal, owner = find_nearest_intersections(
+            arrays, origins, directions
+        )
+        hit = owner != -1
+        if not hit.any():
+            break
+
+        hits = np.flatnonzero(hit)
+        origins = origins[hit]
+        directions = directions[hit]
+        normal = normal[hit]
+        owner = owner[hit]
+        points = origins + directions * distance[hit][:, None]
+
+        if stats is not None:
+            stats.count_ray(
+                instrumentation.SHADOW,
+                depth,
+                len(points) * len(arrays.light_positions),
+            )
+        local = colors_at(arrays, owner, points, normal, origins)
+        colors[hit] = local
+
+        if depth >= arrays.max_depth:
+            break
+        branches = _secondary_rays(
+            arrays, owner, points, directions, normal, weights[hit], local, depth
+        )
+        if not branches:
+            break
+
+        for mask, coefficients, _, _, _ in branches:
+            spawned.append((hits[mask], coefficients))
+        origins = np.concatenate([branch[2] for branch in branches])
+        directions = np.concatenate([branch[3] for branch in branches])
+        weights = np.concatenate([branch[4] for branch in branches])
+        depth += 1
+
+    # Add the colors of every generation to those of the rays that spawned them, from
+    # the last generation up, clamping like `Color` does.
+    children = np.empty((0, 3))
+    for colors, spawned in reversed(generations):
+        start = 0
+        for parents, coefficients in spawned:
+            child = children[start : start + len(parents)]
+            start += len(parents)
+            contribution = np.minimum(child * coefficients[:, None], MAX_COLOR)
+            colors[parents] = np.minimum(colors[parents] + contribution, MAX_COLOR)
+        children = colors
+
+    return children
+
+
+def trace_samples(
+    arrays: SceneArrays, camera: Camera, xs: np.ndarray, ys: np.ndarray
+) -> np.ndarray:
+    """Trace rays through the given pixel coordinates and return their colors."""
+    return trace_rays(arrays, *camera.get_ray_arrays(xs, ys))
+
+
+def render_tile(
+    scene: Scene,
+    x_start: int,
+    y_start: int,
+    x_end: int,
+    y_end: int,
+    arrays: SceneArrays | None = None,
+    max_samples: int = 1,
+) -> np.ndarray:
+    """Render a rectangular tile and return its colors as a (height, width, 3) array.
+
+    With `max_samples` above 1, edges are anti-aliased with up to that many samples
+    per pixel (see `antialiasing`).
+    """
+    arrays = arrays if arrays is not None else SceneArrays(scene)
+    if max_samples > 1:
+        return render_antialiased(
+            partial(trace_samples, arrays, scene.camera),
+            x_start,
+            y_start,
+            x_end,
+            y_end,
+            scene.camera.horizontal_resolution,
+            scene.camera.vertical_resolution,
+            max_samples,
+        )
+
+    origins, directions = scene.camera.get_tile_ray_arrays(
+        x_start, y_start, x_end, y_end
+    )
+    colors = trace_rays(arrays, origins, directions)
+    return colors.reshape(y_end - y_start, x_end - x_start, 3)
+
+
+def render_scene_vectorized(
+    scene: Scene, max_samples: int = 1, arrays: SceneArrays | None = None
+) -> Image:
+    """Render a scene with the batched engine and return the image.
+
+    The scene is packed into arrays unless they are given.
+    """
+    width = scene.camera.horizontal_resolution
+    height = scene.camera.vertical_resolution
+    return Image(
+        height,
+        width,
+        render_tile(scene, 0, 0, width, height, arrays=arrays, max_samples=max_samples),
+    )
@@ -0,0 +1,60 @@
+import pytest
+
+from src.benchmarks import runner
+from src.benchmarks.runner import run_benchmarks, run_case, run_case_in_subprocess
+from src.benchmarks.scenes import mesh_scene, spheres_scene
+
+
+class TestScenes:
+    def test_synthetic_scene_sizes(self):
+        assert len(spheres_scene(10).objects) == 11
+        assert len(mesh_scene(200).objects[0]) == 200
+
+
+class TestRunner:
+    def test_run_case_counts_rays(self):
+        result = run_case("deep", "single", scale=50)
+
+        assert (result["width"], result["height"]) == (10, 10)
+        assert result["rays"]["camera"] == 100
+        assert result["rays"]["secondary"] > 0
+        assert result["rays"]["shadow"] > 0
+        assert result["wall_time"] > 0
+
+    def test_modes_count_the_same_rays(self):
+        report = run_benchmarks(
+            ["two_balls"], ["single", "multi", "vectorized"], scale=50, workers=2
+        )
+
+        single, multi, vectorized = report["results"]
+        assert multi["rays"] == single["rays"]
+        assert vectorized["rays"] == single["rays"]
+        assert vectorized["rays_per_second"] > 0
+
+    def test_modes_count_the_same_rays_of_deep_scenes(self):
+        # Mirrors and glass send reflected and refracted rays in every mode.
+        report = run_benchmarks(["deep"], list(runner.MODES), scale=50, workers=2)
+
+        single, multi, vectorized = report["results"]
+        assert single["rays"]["secondary"] > 0
+        assert multi["rays"] == single["rays"]
+        assert vectorized["rays"] == single["rays"]
+
+    def test_failed_cases_report_their_error(self):
+        with pytest.raises(RuntimeError, match="Unknown scene 'missing'"):
+            run_case_in_subprocess("missing", "single")
+
+    def test_multi_mode_without_resource(self, monkeypatch):
+        monkeypatch.setattr(runner, "resource", None)
+        result = run_case("two_balls", "multi", scale=50, workers=1)
+
+        assert result["peak_memory_kib"] is None
+        assert result["peak_worker_memory_kib"] is None
+
+    def test_peak_memory_is_in_kib_on_macos(self, monkeypatch):
+        resource = pytest.importorskip("resource")
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        monkeypatch.setattr(runner.sys, "platform", "darwin")
+
+        # macOS reports bytes; the current peak can only have grown since.
+        assert peak // 1024 <= runner._peak_memory_kib() < peak
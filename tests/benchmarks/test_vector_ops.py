@@ -0,0 +1,9 @@
+from src.benchmarks.vector_ops import run_vector_benchmarks
+
+
+class TestVectorOps:
+    def test_every_operation_is_timed(self):
+        report = run_vector_benchmarks(number=10)
+
+        assert "vector + vector" in report
+        assert all(nanoseconds > 0 for nanoseconds in report.values())
@@ -0,0 +1,94 @@
+import random
+
+from src.components.bvh import BVH
+from src.components.color import Color
+from src.components.material import Material
+from src.components.objects_in_space import Plane, Sphere, Triangle, TriangleMesh
+from src.components.point import Point
+from src.components.ray import Ray
+from src.components.vector import Vector
+
+
+def make_material() -> Material:
+    return Material(
+        color=Color.from_hex("#FFFFFF"),
+        diffusion_coefficient=0.7,
+        specular_coefficient=0.2,
+        ambient_coefficient=0.1,
+        reflection_coefficient=0,
+        transmission_coefficient=0,
+        rugosity_coefficient=10,
+    )
+
+
+def linear_nearest(objects, ray):
+    closest = (None, None)
+    for obj in objects:
+        distance, _ = obj.find_intersection(ray)
+        if distance is not None and (closest[0] is None or distance < closest[0]):
+            closest = (distance, obj)
+    return closest
+
+
+class TestBVH:
+    def test_flattens_meshes(self):
+        material = make_material()
+        triangles = [
+            Triangle(
+                material,
+                (Point(i, 0, 5), Point(i + 1, 0, 5), Point(i, 1, 5)),
+                Vector(0, 0, -1),
+            )
+            for i in range(10)
+        ]
+        mesh = TriangleMesh(material, triangles)
+        plane = Plane(material, Vector(0, 1, 0), Point(0, -1, 0))
+
+        bvh = BVH([mesh, plane])
+
+        assert len(bvh) == 11
+        assert bvh.unbounded == [10]
+
+        distance, normal, obj = bvh.find_nearest(
+            Ray(Point(3.25, 0.25, 0), Vector(0, 0, 1))
+        )
+        assert distance == 5
+        assert normal == Vector(0, 0, -1)
+        assert obj is mesh
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(42)
+        material = make_material()
+        objects = [
+            Sphere(
+                material,
+                rng.uniform(0.2, 1.5),
+                Point(rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(5, 30)),
+            )
+            for _ in range(60)
+        ]
+        bvh = BVH(objects)
+
+        for _ in range(200):
+            ray = Ray(
+                Point(0, 0, 0),
+                Vector(rng.uniform(-0.5, 0.5), rng.uniform(-0.5, 0.5), 1),
+            )
+            expected_distance, expected_obj = linear_nearest(objects, ray)
+            distance, _, obj = bvh.find_nearest(ray)
+
+            assert distance == expected_distance
+            assert obj is expected_obj
+
+    def test_find_any(self):
+        material = make_material()
+        near = Sphere(material, 1, Point(0, 0, 5))
+        far = Sphere(material, 1, Point(0, 0, 20))
+        bvh = BVH([near, far])
+        ray = Ray(Point(0, 0, 0), Vector(0, 0, 1))
+
+        assert bvh.find_any(ray) is not None
+        assert bvh.find_any(ray, max_distance=3) is None
+        assert bvh.find_any(ray, max_distance=10, ignore=near) is None
+        assert bvh.find_any(ray, ignore=near) is far
+        assert bvh.find_any(Ray(Point(0, 0, 0), Vector(0, 1, 0))) is None
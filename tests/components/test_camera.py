@@ -1,3 +1,5 @@
+import jsonpickle
+
 from src.components.camera import *
 from src.components.point import *
 from src.components.vector import *
@@ -63,3 +65,50 @@ class TestCamera:
         rays = [ray for ray in cam.get_rays()]
         assert len(rays) == 4
         assert Vector(0, 0, 90).normalized() in [ray.direction for ray in rays]
+
+    def test_camera_scaled(self):
+        location = Point(0, 0, 0)
+        look_at = Point(0, 0, 1)
+        v_up = Vector(0, 1, 0)
+
+        cam = Camera(location, look_at, v_up, 90, 20, 40)
+        preview = cam.scaled(4)
+
+        assert preview.vertical_resolution == 5
+        assert preview.horizontal_resolution == 10
+        assert preview.distance_from_screen == 22.5
+        # The corner of the screen is seen under the same angle.
+        assert (
+            abs(cam.get_ray(0, 0).direction - preview.get_ray(0, 0).direction) < 1e-12
+        )
+        assert cam.scaled(3).vertical_resolution == 7
+
+    def test_camera_ray_arrays(self):
+        cam = Camera(Point(10, 8, 3), Point(3, 4, 2), Vector(0, 1, 0), 9, 4, 6)
+
+        origins, directions = cam.get_tile_ray_arrays(1, 2, 5, 4)
+
+        assert origins.shape == directions.shape == (8, 3)
+        rays = [cam.get_ray(i, j) for j in range(2, 4) for i in range(1, 5)]
+        for origin, direction, ray in zip(origins, directions, rays):
+            assert Point(*origin) == ray.origin
+            assert abs(Vector(*direction) - ray.direction) < 1e-12
+
+    def test_camera_row_major_iter(self):
+        cam = Camera(Point(0, 0, 0), Point(0, 0, 1), Vector(0, 1, 0), 90, 2, 3)
+
+        directions = [ray.direction for ray in cam.get_rays(row_major=True)]
+        rows = list(cam.get_ray_rows())
+
+        assert directions == [
+            cam.get_ray(i, j).direction for j in range(2) for i in range(3)
+        ]
+        assert len(rows) == 2
+        assert all(row_directions.shape == (3, 3) for _, row_directions in rows)
+
+    def test_camera_basis_is_not_serialized(self):
+        cam = Camera(Point(0, 0, 0), Point(0, 0, 1), Vector(0, 1, 0), 90, 2, 2)
+        cam.get_ray(0, 0)
+
+        assert "_basis" not in jsonpickle.encode(cam)
+        assert jsonpickle.decode(jsonpickle.encode(cam)).v_u == cam.v_u
@@ -16,4 +16,4 @@ class TestColor:
 
     def test_as_rgb(self):
         color = Color.from_hex("#ffffff")
-        assert color.as_rgb() == (255, 255, 255)
\ No newline at end of file
+        assert color.as_rgb() == (255, 255, 255)
@@ -1,5 +1,11 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
 from src.components.color import Color
-from src.components.image import Image
+from src.components.image import Image, PNGWriter, PPMWriter, open_image_writer
 
 
 class TestImage:
@@ -7,6 +13,26 @@ class TestImage:
         img = Image(10, 10)
         assert img.get_pixel(0, 0) == Color(0, 0, 0)
 
+    def test_image_from_colors(self):
+        img = Image(1, 2, [[Color(1, 2, 3), Color(4, 5, 6)]])
+
+        assert img.get_pixel(1, 0) == Color(4, 5, 6)
+        assert img.pixels.dtype == np.float32
+        assert img.pixels.nbytes == 2 * 12
+
+    def test_image_views(self):
+        img = Image(4, 5)
+
+        img.tile(1, 2, 3, 4)[...] = 7
+        img.channel(2)[0] = 9
+        img.row(3)[4] = (1, 2, 3)
+
+        assert img.get_pixel(2, 3) == Color(7, 7, 7)
+        assert img.get_pixel(0, 2) == Color(0, 0, 0)
+        assert img.get_pixel(4, 0) == Color(0, 0, 9)
+        assert img.get_pixel(4, 3) == Color(1, 2, 3)
+        assert np.shares_memory(img.tile(0, 0, 2, 2), img.pixels)
+
     def test_image_write_ppm(self, tmp_path):
         file = tmp_path / "test.ppm"
         filename = file.as_posix()
@@ -20,3 +46,57 @@ class TestImage:
         assert img_lines[0] == "P3 10 10 255"
         assert img_lines[1] == "255 255 255"
         assert img_lines[2] == "0 0 0"
+
+    def test_image_write_binary_ppm(self, tmp_path):
+        file = tmp_path / "test.ppm"
+
+        img = Image(2, 3)
+        img.set_pixel(1, 0, Color(255, 128.9, 0))
+        img.write_ppm(file, binary=True)
+
+        data = file.read_bytes()
+        assert data.startswith(b"P6 3 2 255\n")
+        assert data[len(b"P6 3 2 255\n") :] == bytes([0, 0, 0, 255, 128, 0] + [0] * 12)
+
+    def test_image_write_png(self, tmp_path):
+        file = tmp_path / "test.png"
+
+        img = Image(2, 3)
+        img.set_pixel(2, 1, Color(10, 20, 30))
+        img.write_png(file)
+
+        data = file.read_bytes()
+        assert data.startswith(PNGWriter.SIGNATURE)
+        width, height = struct.unpack(">II", data[16:24])
+        assert (width, height) == (3, 2)
+
+        # The compressed stream may be split across several IDAT chunks.
+        compressed = b""
+        offset = len(PNGWriter.SIGNATURE)
+        while offset < len(data):
+            (length,) = struct.unpack(">I", data[offset : offset + 4])
+            if data[offset + 4 : offset + 8] == b"IDAT":
+                compressed += data[offset + 8 : offset + 8 + length]
+            offset += 12 + length
+        scanlines = zlib.decompress(compressed)
+        assert scanlines == bytes([0] + [0] * 9 + [0] + [0] * 6 + [10, 20, 30])
+        assert data.endswith(b"IEND\xaeB`\x82")
+
+
+class TestImageWriter:
+    def test_rows_are_streamed(self, tmp_path):
+        file = tmp_path / "test.ppm"
+        rows = np.arange(4 * 2 * 3, dtype=np.uint8).reshape(4, 2, 3)
+
+        with PPMWriter(file, 2, 4) as writer:
+            writer.write_rows(rows[:3])
+            writer.write_rows(rows[3:])
+
+        assert file.read_bytes() == b"P6 2 4 255\n" + rows.tobytes()
+
+    def test_missing_rows_are_an_error(self, tmp_path):
+        writer = open_image_writer(tmp_path / "test.png", 2, 4)
+        writer.write_rows(np.zeros((3, 2, 3), dtype=np.uint8))
+
+        with pytest.raises(ValueError):
+            writer.close()
@@ -0,0 +1,39 @@
+from src.components.color import Color
+from src.components.light import Light
+from src.components.material import Material
+from src.components.point import Point
+from src.components.vector import Vector
+from tests.scenes import make_scene
+
+
+class TestMaterial:
+    def test_light_components_match_components(self):
+        material = Material(Color(1, 0.5, 0.2), 0.8, 0.5, 0.2, 0, 0, 50)
+        light = Light(Point(5, 5, 0), Color(150, 150, 150))
+        hit_position = Point(0.5, -1, 3)
+        normal = Vector(0.2, 1, -0.3).normalized()
+        spectator = Point(0, 0, 0)
+
+        diffuse, specular = material.get_light_components(
+            material.get_light_colors(light),
+            normal,
+            (light.position - hit_position).normalized(),
+            (spectator - hit_position).normalized(),
+        )
+
+        assert diffuse == material.get_diffuse_component(light, normal, hit_position)
+        assert specular == material.get_specular_component(
+            light, normal, hit_position, spectator
+        )
+
+    def test_scene_light_colors(self):
+        scene = make_scene()
+        material = scene.objects[0].material
+        other = Material(Color(1, 1, 1), 0.1, 0.2, 0.3, 0, 0, 1)
+
+        expected = [material.get_light_colors(light) for light in scene.lights]
+        assert scene.get_light_colors(material) == expected
+        assert scene.get_light_colors(other) == [
+            other.get_light_colors(light) for light in scene.lights
+        ]
+        assert "_light_colors" not in scene.__getstate__()
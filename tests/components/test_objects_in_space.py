@@ -1,9 +1,24 @@
-from src.components.objects_in_space import Sphere
+import pickle
+
+import numpy as np
+import pytest
+
+from src.components.bounding_box import BoundingBox
+from src.components.objects_in_space import (
+    BezierSurface,
+    Instance,
+    PackedTriangleMesh,
+    Sphere,
+    Triangle,
+    TriangleMesh,
+)
 from src.components.material import Material
 from src.components.color import Color
 from src.components.point import Point
 from src.components.vector import Vector
 from src.components.ray import Ray
+from src.components.transformations import Transform
+from src.instrumentation import RenderStats, collecting
 
 
 class TestSphere:
@@ -45,3 +60,171 @@ class TestSphere:
         ray = Ray(origin=Point(0, 0, 0), direction=Vector(0, 0, 1))
 
         assert sphere.find_intersection(ray) == (1, Vector(0, 0, 1))
+
+
+class TestPackedTriangleMesh:
+    def make_mesh(self) -> TriangleMesh:
+        material = Material(
+            color=Color.from_hex("#FFFFFF"),
+            diffusion_coefficient=0.7,
+            specular_coefficient=0.2,
+            ambient_coefficient=0.1,
+            reflection_coefficient=0,
+            transmission_coefficient=0,
+            rugosity_coefficient=10,
+        )
+        points = [Point(0, 0, 5), Point(2, 0, 5), Point(0, 2, 5), Point(2, 2, 6)]
+        return TriangleMesh(
+            material,
+            [
+                Triangle(material, (points[0], points[1], points[2]), Vector(0, 0, -1)),
+                Triangle(material, (points[1], points[3], points[2]), Vector(1, 1, -4)),
+            ],
+        )
+
+    def test_from_triangle_mesh(self):
+        packed = PackedTriangleMesh.from_triangle_mesh(self.make_mesh())
+
+        assert len(packed) == 2
+        assert packed.vertices.shape == (4, 3)
+        assert packed.indices.tolist() == [[0, 1, 2], [1, 3, 2]]
+        assert packed.edge1.tolist() == [[2, 0, 0], [0, 2, 1]]
+
+    def test_find_intersection_matches_triangle_mesh(self):
+        mesh = self.make_mesh()
+        packed = PackedTriangleMesh.from_triangle_mesh(mesh)
+
+        for x, y in [(0.5, 0.5), (1.5, 1.5), (1.9, 0.2), (3, 3)]:
+            ray = Ray(Point(x, y, 0), Vector(0, 0, 1))
+            assert packed.find_intersection(ray) == mesh.find_intersection(ray)
+
+    def test_find_intersections(self):
+        packed = PackedTriangleMesh.from_triangle_mesh(self.make_mesh())
+        origins = np.array([[0.5, 0.5, 0], [3, 3, 0]], dtype=float)
+        directions = np.array([[0, 0, 1], [0, 0, 1]], dtype=float)
+
+        distances, faces = packed.find_intersections(origins, directions)
+
+        assert distances.tolist() == [5, np.inf]
+        assert faces.tolist() == [0, -1]
+
+    def test_transform(self):
+        packed = PackedTriangleMesh.from_triangle_mesh(self.make_mesh())
+        moved = packed.translate(Vector(1, 2, 3)).scale(Vector(2, 1, 1))
+
+        assert moved.vertices[0].tolist() == [2, 2, 8]
+        assert moved.normals[0].tolist() == [0, 0, -1]
+        assert moved.get_bounding_box() == BoundingBox(Point(2, 2, 8), Point(6, 4, 9))
+
+    def test_pickle(self):
+        packed = PackedTriangleMesh.from_triangle_mesh(self.make_mesh())
+        restored = pickle.loads(pickle.dumps(packed))
+
+        assert (restored.edge2 == packed.edge2).all()
+        assert restored.find_intersection(Ray(Point(0.5, 0.5, 0), Vector(0, 0, 1))) == (
+            5,
+            Vector(0, 0, -1),
+        )
+
+
+class TestBezierSurface:
+    @staticmethod
+    def make_surface(K1: int = 3, K2: int = 4) -> BezierSurface:
+        material = Material(Color(1, 1, 1), 0.5, 0.5, 0.5, 0, 0, 10)
+        points = [
+            [Point(0, 0, 5), Point(1, 0, 6), Point(2, 0, 5)],
+            [Point(0, 2, 5), Point(1, 2, 6), Point(2, 2, 5)],
+        ]
+        return BezierSurface(material, points, K1, K2)
+
+    def test_tessellation(self):
+        mesh = self.make_surface().malha
+
+        assert len(mesh) == 2 * 2 * 3
+        # Each curve is sampled from its last control point to its first one, so the
+        # first vertex is the last point of the last curve.
+        assert mesh.vertices[0].tolist() == [2, 2, 5]
+        assert mesh.vertices[1].tolist() == pytest.approx([2, 4 / 3, 5])
+        assert mesh.vertices[4 * 1 + 0].tolist() == [1, 2, 5.5]
+        assert mesh.indices[:2].tolist() == [[1, 0, 4], [1, 5, 4]]
+        assert np.allclose(np.abs(mesh.normals[:, 1]), 0)
+
+    def test_is_tessellated_on_first_use(self):
+        surface = self.make_surface()
+
+        assert "malha" not in surface.__dict__
+        distance, _ = surface.find_intersection(Ray(Point(1, 1, 0), Vector(0, 0, 1)))
+        assert distance == pytest.approx(5.5)
+        assert "malha" in surface.__dict__
+
+    def test_triangle_tests_grow_with_tessellation(self):
+        ray = Ray(Point(1, 1, 0), Vector(0, 0, 1))
+        counts = []
+        for K in (5, 60):
+            with collecting(RenderStats(timing=False)) as stats:
+                self.make_surface(K, K).find_intersection(ray)
+            counts.append(stats.intersection_tests["Triangle"])
+
+        assert 0 < counts[0] < counts[1]
+
+    def test_tessellation_is_shared(self):
+        first, second = self.make_surface(), self.make_surface()
+
+        assert np.shares_memory(first.malha.vertices, second.malha.vertices)
+        assert not np.shares_memory(
+            self.make_surface(K2=5).malha.vertices, first.malha.vertices
+        )
+
+    def test_pickle(self):
+        surface = self.make_surface()
+        surface.malha
+        restored = pickle.loads(pickle.dumps(surface))
+
+        assert "malha" not in restored.__dict__
+        assert (restored.malha.vertices == surface.malha.vertices).all()
+
+
+class TestInstance:
+    @staticmethod
+    def make_instance() -> Instance:
+        mesh = TestPackedTriangleMesh().make_mesh()
+        return Instance(
+            mesh,
+            Transform.translation(Vector(1, 0, 2)).then(
+                Transform.scaling(Vector(1, 2, 1))
+            ),
+        )
+
+    def test_find_intersection_matches_transformed_mesh(self):
+        instance = self.make_instance()
+        moved = instance.geometry.transform(instance.to_world)
+
+        for x, y in [(1.5, 0.5), (2.5, 3), (2.9, 0.4), (5, 5)]:
+            ray = Ray(Point(x, y, 0), Vector(0, 0.1, 1))
+            distance, normal = instance.find_intersection(ray)
+            expected_distance, expected_normal = moved.find_intersection(ray)
+            if expected_distance is None:
+                assert distance is None
+                continue
+            assert distance == pytest.approx(expected_distance)
+            assert normal.dot_product(expected_normal) == pytest.approx(1)
+
+    def test_get_bounding_box(self):
+        box = self.make_instance().get_bounding_box()
+
+        assert box == BoundingBox(Point(1, 0, 7), Point(3, 4, 8))
+
+    def test_geometry_is_shared(self):
+        instance = self.make_instance()
+        copy = instance.translate(Vector(5, 0, 0))
+
+        assert copy.surface is instance.surface
+        assert copy.get_bounding_box() == BoundingBox(Point(6, 0, 7), Point(8, 4, 8))
+
+    def test_only_meshes_can_be_instanced(self):
+        sphere = Sphere(
+            TestPackedTriangleMesh().make_mesh().material, 1, Point(0, 0, 0)
+        )
+
+        with pytest.raises(TypeError):
+            Instance(sphere, Transform.identity())  # type: ignore
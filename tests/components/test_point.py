@@ -1,3 +1,5 @@
+import pytest
+
 from src.components.point import *
 
 
@@ -7,7 +9,7 @@ class TestPoint:
         assert point.x == 1
         assert point.y == 2
         assert point.z == 3
-    
+
     def test_add(self):
         point1 = Point(1, 2, 3)
         point2 = Point(4, 5, 6)
@@ -15,7 +17,7 @@ class TestPoint:
         assert point3.x == 5
         assert point3.y == 7
         assert point3.z == 9
-        
+
     def test_sub(self):
         point1 = Point(1, 2, 3)
         point2 = Point(4, 5, 6)
@@ -23,17 +25,39 @@ class TestPoint:
         assert point3.x == -3
         assert point3.y == -3
         assert point3.z == -3
-        
+
     def test_mul(self):
         point = Point(1, 2, 3)
         point = point * 2
         assert point.x == 2
         assert point.y == 4
         assert point.z == 6
-        
+
     def test_neg(self):
         point = Point(1, 2, 3)
         point = -point
         assert point.x == -1
         assert point.y == -2
-        assert point.z == -3
\ No newline at end of file
+        assert point.z == -3
+
+    def test_along(self):
+        point = Point(1, 2, 3)
+        direction = Vector(1, 0, -1)
+        assert point.along(direction, 2) == point + direction * 2
+
+    def test_difference_dot(self):
+        point1 = Point(1, 2, 3)
+        point2 = Point(4, 6, 8)
+        vector = Vector(1, -1, 2)
+        assert point1.difference_dot(point2, vector) == (
+            (point1 - point2).dot_product(vector)
+        )
+
+    def test_vector_plus_point(self):
+        point = Vector(1, 1, 1) + Point(1, 2, 3)
+        assert isinstance(point, Point)
+        assert point == Point(2, 3, 4)
+
+    def test_slots(self):
+        with pytest.raises(AttributeError):
+            Point(1, 2, 3).w = 4
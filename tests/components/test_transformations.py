@@ -0,0 +1,127 @@
+import math
+import pickle
+
+import numpy as np
+import pytest
+
+from src.components.color import Color
+from src.components.material import Material
+from src.components.objects_in_space import Plane, Triangle, TriangleMesh
+from src.components.point import Point
+from src.components.transformations import Transform
+from src.components.vector import Vector
+from src.rendering_engine import render_scene
+from tests.scenes import make_scene
+
+
+def make_mesh() -> TriangleMesh:
+    material = Material(Color(1, 1, 1), 0.5, 0.5, 0.5, 0, 0, 10)
+    return TriangleMesh(
+        material,
+        [
+            Triangle(
+                material,
+                (Point(0, 0, 0), Point(1, 0, 0), Point(0, 1, 1)),
+                Vector(0, -1, 1),
+            )
+        ],
+    )
+
+
+class TestTransform:
+    def test_composition_order(self):
+        translation = Transform.translation(Vector(1, 0, 0))
+        scaling = Transform.scaling(Vector(2, 2, 2))
+        point = np.array([1.0, 1, 1])
+
+        assert (translation @ scaling).apply_to_points(point).tolist() == [3, 2, 2]
+        assert translation.then(scaling).apply_to_points(point).tolist() == [4, 2, 2]
+
+    def test_from_matrix(self):
+        transform = Transform.from_matrix([[0, -1, 0], [1, 0, 0], [0, 0, 1]])
+
+        assert transform.rows[3] == [0, 0, 0, 1]
+        assert Point(1, 2, 3).transform(transform) == Point(-2, 1, 3)
+
+    def test_rotation(self):
+        rotation = Transform.rotation(Point(1, 0, 0), Vector(0, 0, 1), math.pi / 2)
+        rotated = rotation.apply_to_points(np.array([2.0, 0, 0]))
+
+        assert rotated.tolist() == pytest.approx([1, 1, 0])
+
+    def test_normals_use_inverse_transpose(self):
+        scaling = Transform.scaling(Vector(2, 1, 1))
+        normal = scaling.apply_to_normal(Vector(1, 1, 0)).normalized()
+
+        # The plane x + y = 0 becomes x / 2 + y = 0.
+        assert normal == Vector(1, 2, 0).normalized()
+
+    def test_singular_transforms(self):
+        flatten = Transform.scaling(Vector(1, 0, 1))
+
+        # Normals of surfaces flattened onto themselves are kept.
+        normal = flatten.apply_to_normal(Vector(0, 2, 0))
+        assert normal.normalized() == Vector(0, 1, 0)
+        assert flatten.apply_to_normal(Vector(1, 0, 0)) == Vector(0, 0, 0)
+        assert flatten.inverse.apply_to_points(np.array([2.0, 3, 4])).tolist() == [
+            2,
+            0,
+            4,
+        ]
+
+    def test_cofactors_match_the_inverse_transpose(self):
+        transform = Transform.from_matrix([[2, 1, 0], [0, 3, 1], [1, 0, 4]])
+        linear = transform.matrix[:3, :3]
+        a, b, c = linear.T
+        cofactors = np.column_stack((np.cross(b, c), np.cross(c, a), np.cross(a, b)))
+
+        assert np.allclose(cofactors / np.linalg.det(linear), transform.normal_matrix)
+
+    def test_pickle(self):
+        transform = Transform.translation(Vector(1, 2, 3))
+        transform.normal_matrix
+
+        restored = pickle.loads(pickle.dumps(transform))
+        assert (restored.matrix == transform.matrix).all()
+
+
+class TestTransformable:
+    def test_plane_normal_is_not_translated(self):
+        material = Material(Color(1, 1, 1), 0.5, 0.5, 0.5, 0, 0, 10)
+        plane = Plane(material, Vector(0, 1, 0), Point(0, 0, 0))
+        moved = plane.translate(Vector(1, 2, 3))
+
+        assert moved.normal == Vector(0, 1, 0)
+        assert moved.point == Point(1, 2, 3)
+
+    def test_mesh_transforms_are_composed(self):
+        mesh = make_mesh()
+        moved = mesh.translate(Vector(1, 0, 0)).scale(Vector(2, 1, 1))
+
+        assert "triangles" not in moved.__dict__
+        triangle = moved.triangles[0]
+        assert triangle.points == (Point(2, 0, 0), Point(4, 0, 0), Point(2, 1, 1))
+        normal = mesh.triangles[0].normal
+        assert triangle.normal.dot_product(normal) == pytest.approx(1)
+
+    def test_mesh_normals_follow_scaling(self):
+        moved = make_mesh().scale(Vector(1, 1, 2))
+        triangle = moved.triangles[0]
+        edge1, edge2 = triangle.edges
+
+        assert triangle.normal.dot_product(edge1) == pytest.approx(0)
+        assert triangle.normal.dot_product(edge2) == pytest.approx(0)
+
+    def test_scenes_can_be_flattened(self):
+        scene = make_scene()
+        scene.objects = [obj.scale(Vector(1, 0, 1)) for obj in scene.objects]
+
+        render_scene(scene)
+        render_scene(scene, vectorized=True)
+
+    def test_pickled_mesh_is_transformed(self):
+        moved = make_mesh().translate(Vector(0, 0, 1))
+        restored = pickle.loads(pickle.dumps(moved))
+
+        assert "_pending" not in restored.__dict__
+        assert restored.triangles[0].points[0] == Point(0, 0, 1)
@@ -2,6 +2,7 @@ import math
 
 import pytest
 
+from src.components.color import Color
 from src.components.vector import *
 
 
@@ -94,6 +95,11 @@ class TestVector:
         with pytest.raises(ValueError):
             v1.transform(m5)
 
+    def test_vector_add_color(self):
+        with pytest.raises(TypeError):
+            Vector(1, 2, 3) + Color(1, 2, 3)
+        assert isinstance(Color(1, 2, 3) + Color(1, 2, 3), Color)
+
 
 class TestVectorOperations:
     def test_dot_product(self):
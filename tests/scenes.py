@@ -0,0 +1,50 @@
+"""Small scenes shared by the rendering tests."""
+
+from src.components.camera import Camera
+from src.components.color import Color
+from src.components.light import Light
+from src.components.material import Material
+from src.components.objects_in_space import Plane, Sphere, Triangle, TriangleMesh
+from src.components.point import Point
+from src.components.scene import Scene
+from src.components.vector import Vector
+
+
+def make_scene() -> Scene:
+    def material(color: Color, reflection: float = 0, transmission: float = 0):
+        return Material(
+            color=color,
+            diffusion_coefficient=0.8,
+            specular_coefficient=0.5,
+            ambient_coefficient=0.2,
+            reflection_coefficient=reflection,
+            transmission_coefficient=transmission,
+            rugosity_coefficient=50,
+        )
+
+    mesh_material = material(Color(1, 1, 0))
+    mesh = TriangleMesh(
+        mesh_material,
+        [
+            Triangle(
+                mesh_material,
+                (Point(-4, -2, 12), Point(-1, -2, 12), Point(-2.5, 2, 12)),
+                Vector(0, 0, -1),
+            )
+        ],
+    )
+    return Scene(
+        camera=Camera(Point(0, 0, 0), Point(0, 0, 1), Vector(0, 1, 0), 12, 24, 24),
+        objects=[
+            Sphere(material(Color(1, 0, 0), reflection=0.5), 2, Point(1.5, 0, 10)),
+            Sphere(material(Color(0, 1, 0), transmission=1.5), 1, Point(-1, 1, 6)),
+            Plane(material(Color(0, 0, 1)), Vector(0, 1, 0), Point(0, -2, 0)),
+            mesh,
+        ],
+        lights=[
+            Light(Point(5, 5, 0), Color(150, 150, 150)),
+            Light(Point(-5, 5, 5), Color(100, 100, 100)),
+        ],
+        ambient_color=Color(50, 50, 50),
+        background_color=Color(10, 10, 10),
+    )
@@ -0,0 +1,121 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from src import rendering_engine
+from src.animation import (
+    CameraKeyframe,
+    ObjectKeyframe,
+    Timeline,
+    frame_scenes,
+    keyframe_at,
+    render_animation,
+)
+from src.components.point import Point
+from src.components.vector import Vector
+from src.rendering_engine import RenderPool, render_scene
+from tests.scenes import make_scene
+
+TIMELINE = {
+    "frames": 4,
+    "camera": [
+        {"frame": 0, "position": [0, 0, 0], "look_at": [0, 0, 1]},
+        {"frame": 3, "position": [1, 1, 0], "look_at": [0, 0, 5]},
+    ],
+    "objects": {"0": [{"frame": 2}, {"frame": 3, "translation": [0, 1, 0]}]},
+}
+
+
+class TestKeyframes:
+    def test_interpolation(self):
+        keyframes = [
+            CameraKeyframe(0, (0, 0, 0), (0, 0, 1)),
+            CameraKeyframe(4, (4, 2, 0), (0, 0, 1)),
+        ]
+
+        assert keyframe_at(keyframes, 1).position == (1, 0.5, 0)
+        assert keyframe_at(keyframes, 1).look_at == (0, 0, 1)
+        assert keyframe_at(keyframes, 9) is keyframes[-1]
+
+    def test_object_transform(self):
+        keyframe = ObjectKeyframe(0, (1, 0, 0), (0, 0, 1), 90, (2, 2, 2))
+        moved = Point(1, 0, 0).transform(keyframe.to_transform())
+
+        assert [moved.x, moved.y, moved.z] == pytest.approx([1, 2, 0])
+
+
+class TestTimeline:
+    def test_from_dict(self):
+        timeline = Timeline.from_dict(TIMELINE)
+
+        assert timeline.frames == 4
+        assert timeline.camera[1].position == (1, 1, 0)
+        assert timeline.objects[0][1].translation == (0, 1, 0)
+
+    def test_camera_keeps_resolution(self):
+        scene = make_scene()
+        camera = Timeline.from_dict(TIMELINE).camera_at(scene.camera, 3)
+
+        assert camera.position == Point(1, 1, 0)
+        assert camera.horizontal_resolution == scene.camera.horizontal_resolution
+
+
+class TestFrameScenes:
+    def test_scene_is_prepared_again_only_when_objects_move(self):
+        scene = make_scene()
+        frames = [
+            (frame, prepared, prepared.camera.position)
+            for frame, prepared in frame_scenes(scene, Timeline.from_dict(TIMELINE))
+        ]
+
+        assert [frame for frame, _, _ in frames] == [0, 1, 2, 3]
+        assert frames[0][1] is frames[1][1] is frames[2][1]
+        assert frames[3][1] is not frames[2][1]
+        assert frames[3][1].objects[0].center == Point(1.5, 1, 10)
+        assert frames[1][2] == Point(1 / 3, 1 / 3, 0)
+        # The scene itself is left as is.
+        assert scene.objects[0].center == Point(1.5, 0, 10)
+
+
+class TestRenderAnimation:
+    def test_frames_match_single_renders(self, tmp_path):
+        scene = make_scene()
+        timeline = Timeline.from_dict(TIMELINE)
+        files = render_animation(
+            scene, timeline, str(tmp_path / "frames" / "%02d.ppm"), workers=2
+        )
+
+        assert [file.name for file in files] == ["00.ppm", "01.ppm", "02.ppm", "03.ppm"]
+        for frame, prepared in frame_scenes(scene, timeline):
+            expected = tmp_path / "expected.ppm"
+            render_scene(prepared).write_ppm(expected, binary=True)
+            assert files[frame].read_bytes() == expected.read_bytes()
+
+    def test_pool_renders_successive_scenes(self):
+        scene = make_scene()
+        moved = dataclasses.replace(
+            scene,
+            objects=[scene.objects[0].translate(Vector(0, 1, 0)), *scene.objects[1:]],
+        )
+
+        with RenderPool(workers=2) as pool:
+            images = [pool.render(scene).pixels, pool.render(moved).pixels]
+
+        assert np.array_equal(images[0], render_scene(scene).pixels)
+        assert np.array_equal(images[1], render_scene(moved).pixels)
+
+    def test_pool_prepares_a_scene_once(self, monkeypatch):
+        scene = make_scene()
+        with RenderPool(workers=2) as pool:
+            first = pool.render(scene).pixels
+            scene.camera = scene.camera.move_relative(0.5, 0, 0)
+            with monkeypatch.context() as patch:
+                patch.setattr(rendering_engine, "prepare", pytest.fail)
+                moved = pool.render(scene).pixels
+
+            # No scene file was written: only the camera was sent.
+            assert pool._version == 0
+
+        assert np.array_equal(first, render_scene(make_scene()).pixels)
+        assert np.array_equal(moved, render_scene(scene).pixels)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from src.antialiasing import find_edges, sample_offsets
+from src.rendering_engine import render_scene
+from tests.scenes import make_scene
+
+
+class TestAntialiasing:
+    def test_sample_offsets(self):
+        offsets = sample_offsets(8)
+
+        assert offsets.shape == (8, 2)
+        assert (offsets[0] == 0).all()
+        assert (offsets >= -0.5).all() and (offsets < 0.5).all()
+        assert len({tuple(offset) for offset in offsets.tolist()}) == 8
+
+    def test_find_edges(self):
+        colors = np.zeros((4, 5, 3))
+        colors[:, 3:] = 100
+
+        edges = find_edges(colors)
+
+        assert edges[:, 2:4].all()
+        assert not edges[:, :2].any() and not edges[:, 4].any()
+
+    def test_only_edges_are_supersampled(self):
+        scene = make_scene()
+        aliased = render_scene(scene).pixels
+        antialiased = render_scene(scene, max_samples=8).pixels
+
+        changed = (antialiased != aliased).any(axis=-1)
+        assert changed.any()
+        assert not changed[~find_edges(aliased)].any()
+
+    def test_engines_and_tiles_agree(self):
+        scene = make_scene()
+        expected = render_scene(scene, max_samples=8).pixels
+
+        vectorized = render_scene(scene, vectorized=True, max_samples=8).pixels
+        multi = render_scene(scene, multithread=True, tile_size=7, max_samples=8)
+
+        assert np.abs(vectorized - expected).max() < 1e-3
+        assert (multi.pixels == expected).all()
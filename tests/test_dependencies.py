@@ -0,0 +1,50 @@
+from src.components.bounding_box import BoundingBox
+from src.components.point import Point
+from src.components.ray import Ray
+from src.components.vector import Vector
+from src.dependencies import RayDependencies, recording
+from src.rendering_engine import trace_ray
+from src.scene_preparation import prepare
+from tests.scenes import make_scene
+
+
+def box(minimum: tuple, maximum: tuple) -> BoundingBox:
+    return BoundingBox(Point(*minimum), Point(*maximum))
+
+
+class TestRayDependencies:
+    def test_hits_and_shadows_are_recorded(self):
+        scene = prepare(make_scene())
+        with recording() as recorded:
+            trace_ray(Ray(Point(0, 0, 0), Vector(0.15, 0, 1)), scene)
+
+        red_sphere = scene.objects[0]
+        assert id(red_sphere) in recorded.objects
+        # The ray from the camera, and the shadow rays that reached a light.
+        assert len(recorded.segments) % 7 == 0
+        assert len(recorded.segments) >= 7
+
+    def test_segments_are_tested_exactly(self):
+        dependencies = RayDependencies()
+        dependencies.record_shadow(Point(0, 0, 0), Point(10, 10, 0))
+
+        assert dependencies.may_be_reached(box((4, 4, -1), (6, 6, 1)))
+        # Inside the bounding box of the segment, but away from it.
+        assert not dependencies.may_be_reached(box((7, 1, -1), (9, 3, 1)))
+        assert not dependencies.may_be_reached(box((11, 11, -1), (12, 12, 1)))
+        assert dependencies.may_be_reached(None)
+
+    def test_escaped_rays_are_infinite(self):
+        dependencies = RayDependencies()
+        dependencies.record_escape(Ray(Point(0, 0, 0), Vector(0, 0, 1)))
+
+        assert dependencies.may_be_reached(box((-1, -1, 1e6), (1, 1, 1e6 + 1)))
+        assert not dependencies.may_be_reached(box((-1, -1, -3), (1, 1, -2)))
+
+    def test_blocked_shadow_rays_only_record_the_blocker(self):
+        dependencies = RayDependencies()
+        blocker = object()
+        dependencies.record_shadow(Point(0, 0, 0), Point(10, 0, 0), blocker)
+
+        assert dependencies.objects == {id(blocker)}
+        assert not dependencies.may_be_reached(box((4, -1, -1), (6, 1, 1)))
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from src.components.color import Color
+from src.heatmap import heatmap_image, saturation_cost
+from src.rendering_engine import render_scene_to_file
+from tests.scenes import make_scene
+
+
+class TestHeatmap:
+    def test_ramp(self):
+        costs = np.array([[0, 50, 100]], dtype=np.float32)
+        image = heatmap_image(costs)
+
+        assert saturation_cost(costs) == 99
+        assert image.get_pixel(0, 0) == Color(0, 0, 0)
+        assert image.get_pixel(2, 0) == Color(255, 255, 255)
+        middle = image.get_pixel(1, 0)
+        assert middle.x > 0 and middle.z < 255
+
+    def test_no_cost(self):
+        image = heatmap_image(np.zeros((2, 2)))
+
+        assert image.get_pixel(1, 1) == Color(0, 0, 0)
+
+    def test_render_with_heatmap(self, tmp_path):
+        scene = make_scene()
+        render_scene_to_file(
+            scene, tmp_path / "scene.ppm", workers=2, heatmap=tmp_path / "heat.ppm"
+        )
+
+        header = b"P6 24 24 255\n"
+        data = (tmp_path / "heat.ppm").read_bytes()
+        assert data.startswith(header)
+        pixels = np.frombuffer(data[len(header) :], dtype=np.uint8)
+        # Every ray is tested against the plane, at least.
+        assert pixels.reshape(24, 24, 3).any(axis=2).all()
+
+    def test_heatmap_needs_scalar_engine(self, tmp_path):
+        with pytest.raises(ValueError):
+            render_scene_to_file(
+                make_scene(),
+                tmp_path / "scene.ppm",
+                vectorized=True,
+                heatmap=tmp_path / "heat.ppm",
+            )
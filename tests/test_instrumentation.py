@@ -0,0 +1,74 @@
+import json
+
+from src import instrumentation
+from src.benchmarks.scenes import mesh_scene
+from src.instrumentation import RenderStats, collecting
+from src.rendering_engine import render_scene
+from tests.scenes import make_scene
+
+
+class TestInstrumentation:
+    def test_disabled_by_default(self):
+        assert instrumentation.current is None
+
+        with collecting() as stats:
+            assert instrumentation.current is stats
+
+        assert instrumentation.current is None
+
+    def test_scalar_render(self):
+        scene = make_scene()
+        with collecting() as stats:
+            render_scene(scene)
+        summary = stats.as_dict()
+
+        assert summary["rays"]["camera"] == 24 * 24
+        assert summary["rays"]["secondary"] > 0
+        assert summary["rays_by_depth"]["shadow"][0] <= 2 * 24 * 24
+        assert set(summary["intersection_tests"]) == {"Plane", "Sphere", "Triangle"}
+        nearest = summary["queries"]["nearest"]
+        assert nearest["hits"] + nearest["misses"] == stats.rays_of_kind(
+            "camera", "reflection", "refraction", "internal_reflection"
+        )
+        assert set(summary["phase_times"]) == {"intersection", "shading", "shadows"}
+
+    def test_workers_are_aggregated(self):
+        scene = make_scene()
+        with collecting(RenderStats(timing=False)) as single:
+            render_scene(scene)
+        with collecting(RenderStats(timing=False)) as multi:
+            render_scene(scene, multithread=True, workers=2, tile_size=7)
+
+        assert multi.rays == single.rays
+        assert multi.intersection_tests == single.intersection_tests
+        assert multi.queries == single.queries
+        assert not multi.phase_times
+
+    def test_vectorized_counts_the_same_rays(self):
+        scene = make_scene()
+        with collecting() as scalar:
+            render_scene(scene)
+        with collecting() as vectorized:
+            render_scene(scene, vectorized=True)
+
+        assert vectorized.rays == scalar.rays
+        assert vectorized.queries == scalar.queries
+
+    def test_vectorized_summary_is_json(self):
+        # The scene has a reflective sphere and a glass one.
+        with collecting() as stats:
+            render_scene(make_scene(), vectorized=True)
+        summary = json.loads(json.dumps(stats.as_dict()))
+
+        assert summary["rays_by_depth"]["reflection"]["1"] > 0
+        assert summary["rays_by_depth"]["refraction"]["1"] > 0
+
+    def test_triangles_of_packed_meshes_are_counted(self):
+        scene = mesh_scene(2000)
+        scene.camera = scene.camera.scaled(20)
+        with collecting(RenderStats(timing=False)) as stats:
+            render_scene(scene)
+
+        tests = stats.intersection_tests
+        # Every call into the mesh tests at least a leaf of its triangles.
+        assert tests["Triangle"] > tests["PackedTriangleMesh"] > 0
@@ -0,0 +1,37 @@
+from src.components.image import rgb_to_bytes
+from src.progressive_renderer import ProgressiveRenderer
+from src.vectorized_engine import render_tile
+from tests.scenes import make_scene
+
+
+class TestProgressiveRenderer:
+    def test_first_pass_is_coarse(self):
+        renderer = ProgressiveRenderer(make_scene(), scales=(4, 1))
+
+        assert renderer.step()
+
+        block = renderer.frame[4:8, 8:12]
+        assert (block == block[0, 0]).all()
+
+    def test_refines_to_full_resolution(self):
+        scene = make_scene()
+        renderer = ProgressiveRenderer(scene, scales=(8, 2, 1), pixels_per_step=100)
+
+        steps = 0
+        while renderer.step():
+            steps += 1
+
+        assert renderer.done
+        assert steps > 3
+        expected = rgb_to_bytes(render_tile(scene, 0, 0, 24, 24))
+        assert (renderer.frame == expected).all()
+
+    def test_moving_the_camera_starts_over(self):
+        renderer = ProgressiveRenderer(make_scene(), scales=(2, 1))
+        while renderer.step():
+            pass
+
+        renderer.camera = renderer.camera.move_relative(1, 0, 0)
+
+        assert not renderer.done
+        assert renderer.step()
@@ -0,0 +1,154 @@
+import os
+
+import jsonpickle
+
+from src.components.objects_in_space import Sphere
+from src.components.point import Point
+from src.components.vector import Vector
+from src.render_cache import (
+    IMAGE,
+    SIDECAR_SUFFIX,
+    RenderCache,
+    content_hash,
+    frame_key,
+    render_scene_to_file_cached,
+    render_scene_to_file_incremental,
+)
+from src.rendering_engine import render_scene, split_into_tiles
+from src.scene_preparation import prepare
+from tests.scenes import make_scene
+
+
+def render_both(scene, cache, tmp_path) -> tuple[int, bool]:
+    """Render through the cache and without it, and compare the images."""
+    cached = tmp_path / "cached.ppm"
+    rendered = render_scene_to_file_cached(scene, cached, cache, workers=1, tile_size=8)
+
+    expected = tmp_path / "expected.ppm"
+    render_scene(scene).write_ppm(expected, binary=True)
+    return rendered, cached.read_bytes() == expected.read_bytes()
+
+
+class TestContentHash:
+    def test_is_stable_across_decoding(self):
+        scene = make_scene()
+        decoded = jsonpickle.decode(jsonpickle.encode(scene))
+
+        assert [content_hash(obj) for obj in decoded.objects] == [
+            content_hash(obj) for obj in scene.objects
+        ]
+        assert frame_key(decoded) == frame_key(scene)
+
+    def test_ignores_derived_data(self):
+        scene = make_scene()
+        keys = [content_hash(obj) for obj in scene.objects]
+        prepared = prepare(scene, vectorized=True)
+
+        assert [content_hash(obj) for obj in prepared.objects] == keys
+        assert frame_key(prepared) == frame_key(scene)
+
+    def test_changes_with_content_and_options(self):
+        scene = make_scene()
+        moved = scene.objects[0].translate(Vector(0, 0, 1e-9))
+
+        assert content_hash(moved) != content_hash(scene.objects[0])
+        assert frame_key(scene, max_samples=1) != frame_key(scene, max_samples=4)
+
+
+class TestRenderCache:
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        cache = RenderCache(tmp_path, max_size=2500)
+        for age, key in enumerate("ab"):
+            cache.store(IMAGE, key, b"x" * 1000)
+            # Order the entries whatever the resolution of the clock.
+            os.utime(cache._path(IMAGE, key), ns=(age, age))
+
+        cache.load(IMAGE, "a")
+        cache.store(IMAGE, "c", b"x" * 1000)
+
+        assert cache.load(IMAGE, "b") is None
+        assert cache.load(IMAGE, "a") is not None
+        assert cache.load(IMAGE, "c") is not None
+
+    def test_corrupt_entries_are_ignored(self, tmp_path):
+        cache = RenderCache(tmp_path)
+        cache._path(IMAGE, "a").write_bytes(b"\x80")
+
+        assert cache.load(IMAGE, "a") is None
+
+
+class TestCachedRender:
+    def test_identical_scene_is_not_rendered_again(self, tmp_path):
+        cache = RenderCache(tmp_path / "cache")
+
+        assert render_both(make_scene(), cache, tmp_path) == (9, True)
+        assert render_both(make_scene(), cache, tmp_path) == (0, True)
+
+    def test_only_tiles_touching_an_edit_are_rendered(self, tmp_path):
+        cache = RenderCache(tmp_path / "cache")
+        render_both(make_scene(), cache, tmp_path)
+
+        scene = make_scene()
+        scene.objects[0] = scene.objects[0].translate(Vector(0.3, 0.2, 0))
+        rendered, same = render_both(scene, cache, tmp_path)
+
+        assert same
+        assert 0 < rendered < 9
+
+    def test_added_objects_are_rendered(self, tmp_path):
+        cache = RenderCache(tmp_path / "cache")
+        render_both(make_scene(), cache, tmp_path)
+
+        scene = make_scene()
+        material = scene.objects[0].material
+        scene.objects.append(Sphere(material, 0.5, Point(3, 1.5, 8)))
+        rendered, same = render_both(scene, cache, tmp_path)
+
+        assert same
+        assert 0 < rendered < 9
+
+    def test_other_cameras_are_rendered(self, tmp_path):
+        cache = RenderCache(tmp_path / "cache")
+        render_both(make_scene(), cache, tmp_path)
+
+        scene = make_scene()
+        scene.camera = scene.camera.move_relative(0.5, 0, 0)
+
+        assert render_both(scene, cache, tmp_path) == (9, True)
+
+    def test_vectorized_renders_are_cached(self, tmp_path):
+        cache = RenderCache(tmp_path / "cache")
+        file = tmp_path / "scene.ppm"
+        for rendered in (9, 0):
+            assert rendered == render_scene_to_file_cached(
+                make_scene(), file, cache, workers=1, tile_size=8, vectorized=True
+            )
+
+
+class TestIncrementalRender:
+    def test_edits_only_render_the_tiles_they_change(self, tmp_path):
+        file = tmp_path / "scene.ppm"
+        scene = make_scene()
+        assert (
+            render_scene_to_file_incremental(scene, file, workers=1, tile_size=8) == 9
+        )
+        assert (tmp_path / f"scene.ppm{SIDECAR_SUFFIX}").exists()
+
+        scene.objects[1] = scene.objects[1].translate(Vector(0.2, 0, 0))
+        rendered = render_scene_to_file_incremental(scene, file, workers=1, tile_size=8)
+
+        expected = tmp_path / "expected.ppm"
+        render_scene(scene).write_ppm(expected, binary=True)
+        assert file.read_bytes() == expected.read_bytes()
+        assert 0 < rendered < 9
+        assert (
+            render_scene_to_file_incremental(scene, file, workers=1, tile_size=8) == 0
+        )
+
+    def test_other_options_render_every_tile(self, tmp_path):
+        file = tmp_path / "scene.ppm"
+        render_scene_to_file_incremental(make_scene(), file, workers=1, tile_size=8)
+
+        assert render_scene_to_file_incremental(
+            make_scene(), file, workers=1, tile_size=12
+        ) == len(split_into_tiles(24, 24, 12))
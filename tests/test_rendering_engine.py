@@ -0,0 +1,113 @@
+import sys
+
+from src.components.color import Color
+from src.components.material import Material
+from src.components.objects_in_space import Plane
+from src.components.point import Point
+from src.components.ray import Ray
+from src.components.scene import Scene
+from src.components.vector import Vector
+from src.instrumentation import REFLECTION, REFRACTION, SECONDARY_KINDS, collecting
+from src.rendering_engine import (
+    is_occluded,
+    render_scene,
+    render_scene_to_file,
+    split_into_tiles,
+    trace_ray,
+)
+from tests.scenes import make_scene
+
+
+class TestOcclusion:
+    def test_blocked_before_max_distance(self):
+        scene = make_scene()
+        ray = Ray(Point(1.5, 0, 0), Vector(0, 0, 1))
+
+        assert is_occluded(scene, ray, 20)
+        # The red sphere starts at z = 8.
+        assert not is_occluded(scene, ray, 7.9)
+
+    def test_ignored_object_does_not_block(self):
+        scene = make_scene()
+        ray = Ray(Point(1.5, 0, 0), Vector(0, 0, 1))
+
+        assert not is_occluded(scene, ray, 20, ignore=scene.objects[0])
+
+
+class TestTiles:
+    def test_split_into_tiles(self):
+        tiles = split_into_tiles(5, 3, 2)
+
+        assert tiles == [
+            (0, 0, 2, 2),
+            (2, 0, 4, 2),
+            (4, 0, 5, 2),
+            (0, 2, 2, 3),
+            (2, 2, 4, 3),
+            (4, 2, 5, 3),
+        ]
+
+
+class TestRenderScene:
+    def test_multi_threaded_matches_single_thread(self):
+        scene = make_scene()
+        single = render_scene(scene)
+        multi = render_scene(scene, multithread=True, workers=2, tile_size=7)
+
+        for y in range(scene.camera.vertical_resolution):
+            for x in range(scene.camera.horizontal_resolution):
+                assert multi.get_pixel(x, y) == single.get_pixel(x, y)
+
+    def test_render_to_file_matches_render(self, tmp_path):
+        scene = make_scene()
+        file = tmp_path / "scene.ppm"
+        render_scene_to_file(scene, file, workers=2, tile_size=7)
+
+        expected = tmp_path / "expected.ppm"
+        render_scene(scene).write_ppm(expected, binary=True)
+        assert file.read_bytes() == expected.read_bytes()
+
+
+class TestSecondaryRays:
+    def test_max_depth(self):
+        scene = make_scene()
+        scene.max_depth = 1
+        with collecting() as stats:
+            render_scene(scene)
+
+        assert stats.rays_of_kind(*SECONDARY_KINDS)
+        assert max(depth for _, depth in stats.rays) == 1
+
+    def test_rays_below_min_weight_are_not_traced(self):
+        scene = make_scene()
+        with collecting() as default:
+            render_scene(scene)
+
+        # The red sphere reflects half of the light, the green one transmits more.
+        scene.min_weight = 0.6
+        with collecting() as stats:
+            render_scene(scene)
+
+        assert default.rays[REFLECTION, 1]
+        assert not stats.rays[REFLECTION, 1]
+        assert stats.rays_of_kind(REFRACTION)
+
+    def test_deep_ray_trees_do_not_recurse(self):
+        # A ray bouncing between two facing black mirrors never adds any color.
+        mirror = Material(Color(0, 0, 0), 0, 0, 0, 1, 0, 1)
+        scene = Scene(
+            camera=make_scene().camera,
+            objects=[
+                Plane(mirror, Vector(0, 0, 1), Point(0, 0, -1)),
+                Plane(mirror, Vector(0, 0, -1), Point(0, 0, 1)),
+            ],
+            lights=[],
+            ambient_color=Color(50, 50, 50),
+            background_color=Color(10, 10, 10),
+            max_depth=sys.getrecursionlimit() + 1,
+        )
+        with collecting() as stats:
+            color = trace_ray(Ray(Point(0, 0, 0), Vector(0, 0, 1)), scene)
+
+        assert color == Color(0, 0, 0)
+        assert stats.rays[REFLECTION, scene.max_depth] == 1
@@ -0,0 +1,81 @@
+import numpy as np
+
+from src.components.objects_in_space import PackedTriangleMesh, TriangleMesh
+from src.rendering_engine import render_scene
+from src.scene_file import is_binary_scene, load_scene, save_scene
+from tests.scenes import make_scene
+
+
+class TestSceneFile:
+    def test_json_round_trip(self, tmp_path):
+        path = tmp_path / "scene.json"
+        save_scene(make_scene(), path)
+
+        assert not is_binary_scene(path)
+        assert isinstance(load_scene(path).objects[3], TriangleMesh)
+
+    def test_binary_round_trip(self, tmp_path):
+        scene = make_scene()
+        path = tmp_path / "scene.scene"
+        save_scene(scene, path)
+
+        loaded = load_scene(path)
+        mesh = loaded.objects[3]
+
+        assert is_binary_scene(path)
+        assert isinstance(mesh, PackedTriangleMesh)
+        assert vars(mesh.material) == vars(scene.objects[3].material)
+        packed = PackedTriangleMesh.from_triangle_mesh(scene.objects[3])
+        assert np.array_equal(mesh.vertices, packed.vertices)
+        assert np.array_equal(mesh.indices, packed.indices)
+        assert np.array_equal(mesh.normals, packed.normals)
+        assert vars(loaded.camera) == vars(scene.camera)
+        assert [vars(light) for light in loaded.lights] == [
+            vars(light) for light in scene.lights
+        ]
+
+    def test_binary_scene_renders_the_same(self, tmp_path):
+        scene = make_scene()
+        path = tmp_path / "scene.scene"
+        save_scene(scene, path)
+
+        expected = render_scene(scene)
+        image = render_scene(load_scene(path))
+
+        for y in range(scene.camera.vertical_resolution):
+            for x in range(scene.camera.horizontal_resolution):
+                expected_pixel = expected.get_pixel(x, y)
+                pixel = image.get_pixel(x, y)
+                assert abs(pixel - expected_pixel) < 1e-9
+
+    def test_meshes_are_memory_mapped(self, tmp_path):
+        scene = make_scene()
+        mesh = PackedTriangleMesh(
+            scene.objects[0].material,
+            np.arange(36, dtype=np.float64).reshape(12, 3),
+            np.arange(12).reshape(4, 3),
+        )
+        scene.objects = [mesh]
+        path = tmp_path / "mesh.scene"
+        save_scene(scene, path)
+
+        loaded = load_scene(path).objects[0]
+
+        assert isinstance(loaded.vertices.base, np.memmap)
+        assert np.array_equal(loaded.vertices, mesh.vertices)
+        assert np.array_equal(loaded.edge1, mesh.edge1)
+
+    def test_binary_scene_can_be_saved_over_itself(self, tmp_path):
+        path = tmp_path / "scene.scene"
+        save_scene(make_scene(), path)
+        loaded = load_scene(path)
+        mesh = loaded.objects[3]
+
+        # The arrays of the mesh are mapped from the file being written.
+        save_scene(loaded, path)
+        saved = load_scene(path).objects[3]
+
+        assert mesh.vertices.any()
+        assert np.array_equal(saved.vertices, mesh.vertices)
+        assert np.array_equal(saved.indices, mesh.indices)
+        assert np.array_equal(saved.normals, mesh.normals)
@@ -0,0 +1,85 @@
+import pickle
+
+import numpy as np
+
+from src.components import objects_in_space
+from src.components.objects_in_space import BezierSurface, Sphere, Triangle
+from src.components.point import Point
+from src.components.vector import Vector
+from src.rendering_engine import render_scene
+from src.scene_preparation import PreparedScene, prepare
+from tests.scenes import make_scene
+
+
+class TestPrepare:
+    def test_derived_data_is_computed(self):
+        scene = make_scene()
+        prepared = prepare(scene, vectorized=True)
+
+        assert isinstance(prepared, PreparedScene)
+        assert {"bvh", "_light_colors", "arrays"} <= prepared.__dict__.keys()
+        # The mesh is flattened into its triangle.
+        assert len(prepared.bvh) == 4
+        assert "edges" in prepared.bvh.primitives[3].__dict__
+
+    def test_preparing_twice_returns_the_same_scene(self):
+        prepared = prepare(make_scene())
+
+        assert prepare(prepared) is prepared
+        assert prepare(prepared, vectorized=True) is prepared
+
+    def test_is_a_snapshot_of_the_scene(self):
+        scene = make_scene()
+        prepared = prepare(scene)
+        scene.objects.append(Sphere(scene.objects[0].material, 1, Point(0, 0, 5)))
+
+        assert len(prepared.objects) == 4
+
+    def test_pickles_with_acceleration_structure(self):
+        prepared = prepare(make_scene(), vectorized=True)
+        copy = pickle.loads(pickle.dumps(prepared))
+
+        assert {"bvh", "arrays"} <= copy.__dict__.keys()
+        assert "_light_colors" not in copy.__dict__
+        assert np.array_equal(render_scene(copy).pixels, render_scene(prepared).pixels)
+
+    def test_pickles_with_derived_data_of_objects(self, monkeypatch):
+        scene = make_scene()
+        mesh = scene.objects[3]
+        scene.objects += [
+            mesh.packed.translate(Vector(0, 0, 1)),
+            BezierSurface(
+                mesh.material,
+                [[Point(-1, -1, 9), Point(0, 0, 8)], [Point(1, -1, 9), Point(1, 1, 9)]],
+                4,
+                4,
+            ),
+        ]
+        prepared = prepare(scene)
+        data = pickle.dumps(prepared)
+
+        def build_again(*args):
+            raise AssertionError("The hierarchy was built again.")
+
+        monkeypatch.setattr(objects_in_space, "Hierarchy", build_again)
+        copy = pickle.loads(data)
+        packed, surface = copy.objects[4], copy.objects[5]
+
+        assert packed._hierarchy is not None and packed._edges is not None
+        assert packed._leaf_faces.tolist() == list(packed._hierarchy.leaf_items)
+        assert surface.__dict__["malha"]._hierarchy is not None
+        triangles = [p for p in copy.bvh.primitives if isinstance(p, Triangle)]
+        assert triangles and "edges" in triangles[0].__dict__
+        assert np.array_equal(render_scene(copy).pixels, render_scene(prepared).pixels)
+        # Objects pickled on their own still leave their derived data out.
+        assert pickle.loads(pickle.dumps(packed))._hierarchy is None
+
+    def test_renders_like_the_scene(self):
+        scene = make_scene()
+        prepared = prepare(scene)
+
+        for vectorized in (False, True):
+            assert np.array_equal(
+                render_scene(prepared, vectorized=vectorized).pixels,
+                render_scene(scene, vectorized=vectorized).pixels,
+            )
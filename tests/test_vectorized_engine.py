@@ -0,0 +1,83 @@
+import numpy as np
+
+from src.components.objects_in_space import Instance
+from src.components.point import Point
+from src.components.ray import Ray
+from src.components.transformations import Transform
+from src.components.vector import Vector
+from src.instrumentation import collecting
+from src.rendering_engine import is_occluded, render_scene
+from src.vectorized_engine import SceneArrays, find_occluded, render_tile
+from tests.scenes import make_scene
+
+
+class TestVectorizedEngine:
+    def test_matches_scalar_engine(self):
+        scene = make_scene()
+        image = render_scene(scene)
+        colors = render_tile(scene, 0, 0, 24, 24)
+
+        for y in range(24):
+            for x in range(24):
+                expected = image.get_pixel(x, y)
+                for actual, wanted in zip(
+                    colors[y, x], (expected.x, expected.y, expected.z)
+                ):
+                    # Images store their pixels as float32.
+                    assert abs(actual - wanted) < 1e-4
+
+    def test_ray_weights_match_scalar_engine(self):
+        scene = make_scene()
+        scene.max_depth = 3
+        scene.min_weight = 0.6
+        with collecting() as scalar:
+            render_scene(scene)
+        with collecting() as vectorized:
+            render_scene(scene, vectorized=True)
+
+        assert vectorized.rays == scalar.rays
+
+    def test_tile_is_part_of_frame(self):
+        scene = make_scene()
+        frame = render_tile(scene, 0, 0, 24, 24)
+        tile = render_tile(scene, 8, 4, 16, 20)
+
+        assert tile.shape == (16, 8, 3)
+        assert (tile == frame[4:20, 8:16]).all()
+
+    def test_occlusion_matches_scalar_engine(self):
+        scene = make_scene()
+        arrays = SceneArrays(scene)
+        origins = np.array([[1.5, 0, 0], [1.5, 0, 0], [1.5, 0, 0], [-1, 5, 6]])
+        directions = np.array([[0, 0, 1], [0, 0, 1], [0, 0, 1], [0, -1, 0]])
+        max_distances = np.array([20, 7.9, 20, 3.5])
+        ignore = np.array([-1, -1, 0, -1])
+
+        blocked = find_occluded(arrays, origins, directions, max_distances, ignore)
+
+        expected = [
+            is_occluded(
+                scene,
+                Ray(Point(*origin), Vector(*direction)),
+                distance,
+                None if owner == -1 else scene.objects[owner],
+            )
+            for origin, direction, distance, owner in zip(
+                origins.tolist(), directions.tolist(), max_distances, ignore
+            )
+        ]
+        assert blocked.tolist() == expected == [True, False, False, True]
+
+    def test_instances_match_scalar_engine(self):
+        scene = make_scene()
+        mesh = scene.objects.pop()
+        scene.objects += [
+            Instance(mesh, Transform.translation(Vector(dx, 0, 0)))
+            for dx in (0, 2.5, 5)
+        ]
+
+        expected = render_scene(scene).pixels
+        colors = render_tile(scene, 0, 0, 24, 24)
+
+        # Instances are intersected in world space here, so hits differ by rounding.
+        assert np.abs(colors - expected).max() < 1e-3